@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+全量数据导出
+
+快照和历史数据都以生成器的形式逐条读取（底层是按批读取的MongoDB游标），
+每攒够一批就编码为 NDJSON 或 CSV 发送给客户端，内存占用与导出总量无关。
+安装 pyarrow 后还可以导出 Parquet：按行组写入临时文件，写完后再分块发送（Parquet的元数据在文件末尾，无法边写边发）。
+"""
+
+import csv
+import io
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List
+
+from python.api.serialization import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PARQUET_ENABLED = True
+except ImportError:
+    PARQUET_ENABLED = False
+
+# 导出配置
+EXPORT_CONFIG = {
+    "rows_per_chunk": 200,  # NDJSON/CSV 每次发送的行数
+    "parquet_row_group_size": 10000,  # Parquet 每个行组的行数
+    "file_chunk_size": 64 * 1024,  # 发送 Parquet 文件时每块的字节数
+    "list_separator": "/",  # CSV 中多值字段（类型、导演、演员等）的分隔符
+}
+
+# 各数据集导出的字段（顺序即CSV的列顺序）
+EXPORT_FIELDS = {
+    "items": [
+        "id",
+        "title",
+        "url",
+        "cover",
+        "rate",
+        "description",
+        "category",
+        "area",
+        "directors",
+        "actors",
+        "slices",
+        "year",
+        "episodes",
+        "rating_count",
+        "update_time",
+    ],
+    "history": ["id", "title", "date", "rating", "rank"],
+}
+
+# 各导出格式的响应类型和文件扩展名
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    将行按固定数量分组
+    """
+    chunk: List[Any] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    将数据编码为 NDJSON（每行一个JSON对象）
+
+    :param rows: 数据生成器
+    :return: 字节块生成器
+    """
+    for chunk in _chunked(rows, EXPORT_CONFIG["rows_per_chunk"]):
+        yield b"".join(dumps(row) + b"\n" for row in chunk)
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[bytes]:
+    """
+    将数据编码为CSV，多值字段用分隔符拼接
+
+    :param rows: 数据生成器
+    :param fields: 列名
+    :return: 字节块生成器，第一块为带BOM的表头（便于Excel识别UTF-8）
+    """
+    separator = EXPORT_CONFIG["list_separator"]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    for chunk in _chunked(rows, EXPORT_CONFIG["rows_per_chunk"]):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in chunk:
+            writer.writerow(
+                [
+                    separator.join(value) if isinstance(value, list) else ("" if value is None else value)
+                    for value in (row.get(field) for field in fields)
+                ]
+            )
+        yield buffer.getvalue().encode("utf-8")
+
+
+def parquet_schema(dataset: str) -> "pa.Schema":
+    """
+    获取数据集的Parquet表结构
+    """
+    if dataset == "history":
+        return pa.schema(
+            [
+                ("id", pa.string()),
+                ("title", pa.string()),
+                ("date", pa.string()),
+                ("rating", pa.float64()),
+                ("rank", pa.int32()),
+            ]
+        )
+    strings = pa.list_(pa.string())
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("title", pa.string()),
+            ("url", pa.string()),
+            ("cover", pa.string()),
+            ("rate", pa.float64()),
+            ("description", pa.string()),
+            ("category", strings),
+            ("area", pa.string()),
+            ("directors", strings),
+            ("actors", strings),
+            ("slices", strings),
+            ("year", pa.int32()),
+            ("episodes", pa.int32()),
+            ("rating_count", pa.int64()),
+            ("update_time", pa.string()),
+        ]
+    )
+
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], dataset: str) -> Iterator[bytes]:
+    """
+    将数据按行组写入临时Parquet文件，写完后分块读出，发送结束后删除临时文件
+
+    :param rows: 数据生成器
+    :param dataset: 数据集名称（items/history）
+    :return: 字节块生成器
+    """
+    schema = parquet_schema(dataset)
+    fd, path = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    try:
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in _chunked(rows, EXPORT_CONFIG["parquet_row_group_size"]):
+                writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(EXPORT_CONFIG["file_chunk_size"])
+                if not block:
+                    break
+                yield block
+    finally:
+        os.remove(path)
+
+
+def encode_rows(rows: Iterable[Dict[str, Any]], dataset: str, fmt: str) -> Iterator[bytes]:
+    """
+    按导出格式编码数据
+
+    :param rows: 数据生成器
+    :param dataset: 数据集名称（items/history）
+    :param fmt: 导出格式（ndjson/csv/parquet）
+    :return: 字节块生成器
+    """
+    if fmt == "csv":
+        return iter_csv(rows, EXPORT_FIELDS[dataset])
+    if fmt == "parquet":
+        return iter_parquet(rows, dataset)
+    return iter_ndjson(rows)
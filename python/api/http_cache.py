@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+API响应的HTTP缓存与压缩
+
+数据接口的响应只会在出现新快照（或当天快照被更新）时变化，因此用快照版本号加请求路径和查询参数生成ETag，
+客户端带 If-None-Match 重复请求时不需要计算响应体即可返回304。
+Cache-Control 的有效期不超过下一次计划爬取的时间。
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware  # 安装 brotli-asgi 后启用brotli，不支持的客户端退回gzip
+
+    BROTLI_ENABLED = True
+except ImportError:
+    BROTLI_ENABLED = False
+
+# HTTP缓存配置
+HTTP_CACHE_CONFIG = {
+    "crawl_times": ["03:00"],  # 每天计划爬取的时间（服务器本地时间，与定时任务保持一致）
+    "crawl_duration": 30 * 60,  # 一次爬取预计耗时（秒），期间数据随时可能更新
+    "max_age_cap": 3600,  # 浏览器缓存时间上限（秒），过期后用ETag重新验证
+    "compress_minimum_size": 1000,  # 小于该字节数的响应不压缩
+}
+
+
+def make_etag(version: str, path: str, query_items: List[tuple]) -> str:
+    """
+    由快照版本号、请求路径和查询参数生成弱ETag（压缩前后的响应视为等价）
+
+    :param version: 快照版本标识
+    :param path: 请求路径
+    :param query_items: 查询参数键值对列表
+    :return: ETag，如 W/"3f2a..."
+    """
+    key = "\n".join([version, path] + [f"{k}={v}" for k, v in sorted(query_items)])
+    return 'W/"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    判断 If-None-Match 请求头是否与ETag匹配（弱比较）
+
+    :param if_none_match: If-None-Match 请求头
+    :param etag: 当前ETag
+    :return: 是否匹配
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def seconds_until_next_crawl(now: Optional[datetime] = None) -> int:
+    """
+    计算距离下一次计划爬取的秒数；正在爬取的时间段内返回0
+
+    :param now: 当前时间，默认本地时间
+    :return: 秒数
+    """
+    now = now or datetime.now()
+    candidates = []
+    for value in HTTP_CACHE_CONFIG["crawl_times"]:
+        hour, minute = (int(part) for part in value.split(":"))
+        start = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        end = start + timedelta(seconds=HTTP_CACHE_CONFIG["crawl_duration"])
+        if start <= now < end:
+            return 0
+        if start <= now:
+            start += timedelta(days=1)
+        candidates.append((start - now).total_seconds())
+    return int(min(candidates)) if candidates else 0
+
+
+def cache_headers(etag: str, now: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    数据接口响应的缓存头
+
+    :param etag: 当前ETag
+    :param now: 当前时间，默认本地时间
+    :return: 响应头字典
+    """
+    max_age = min(HTTP_CACHE_CONFIG["max_age_cap"], seconds_until_next_crawl(now))
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}, must-revalidate"}
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, skip_prefixes: tuple = ()):
+        """
+        响应压缩中间件：可用时使用brotli，否则使用gzip；指定前缀的路径（如图片代理）不压缩
+
+        :param app: ASGI应用
+        :param skip_prefixes: 不压缩的路径前缀
+        """
+        self.app = app
+        self.skip_prefixes = skip_prefixes
+        minimum_size = HTTP_CACHE_CONFIG["compress_minimum_size"]
+        if BROTLI_ENABLED:
+            self.compressed = BrotliMiddleware(app, minimum_size=minimum_size)
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].startswith(self.skip_prefixes):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图片代理的磁盘LRU缓存
+
+以图片URL的哈希作为键，将封面图片保存在本地目录中，总大小超过上限时淘汰最久未使用的条目。
+条目的内容哈希作为ETag返回给浏览器，重复请求无需访问豆瓣图片服务器。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class CachedImage:
+    def __init__(self, key: str, path: str, content_type: str, etag: str, size: int):
+        """
+        一条已缓存的图片
+
+        :param key: 缓存键（URL哈希）
+        :param path: 图片文件路径
+        :param content_type: 图片MIME类型
+        :param etag: 基于内容哈希的ETag
+        :param size: 文件大小（字节）
+        """
+        self.key = key
+        self.path = path
+        self.content_type = content_type
+        self.etag = etag
+        self.size = size
+
+
+class ImageCacheWriter:
+    def __init__(self, cache: "ImageDiskCache", url: str):
+        """
+        边下载边写入临时文件，下载完成后再提交到缓存
+
+        :param cache: 所属的缓存
+        :param url: 图片URL
+        """
+        self.cache = cache
+        self.url = url
+        self._hash = hashlib.sha1()
+        self._size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self._size += len(chunk)
+
+    def commit(self, content_type: str) -> Optional[CachedImage]:
+        """
+        下载完成，将临时文件移入缓存
+
+        :param content_type: 图片MIME类型
+        :return: 缓存条目，图片超过单条上限时返回None
+        """
+        self._file.close()
+        if self._size == 0 or self._size > self.cache.max_entry_bytes:
+            self.discard()
+            return None
+        etag = f'"{self._hash.hexdigest()}"'
+        entry = self.cache.store(self.url, self._tmp_path, content_type, etag, self._size)
+        self._tmp_path = None
+        return entry
+
+    def discard(self) -> None:
+        """
+        放弃写入（下载失败或客户端中断时），已提交时为空操作
+        """
+        if not self._file.closed:
+            self._file.close()
+        if self._tmp_path and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._tmp_path = None
+
+
+class ImageDiskCache:
+    def __init__(self, directory: str, max_bytes: int, max_entry_bytes: int = 10 * 1024 * 1024):
+        """
+        初始化磁盘缓存，并从已有文件恢复缓存索引
+
+        :param directory: 缓存目录
+        :param max_bytes: 缓存总大小上限（字节）
+        :param max_entry_bytes: 单张图片大小上限（字节）
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def key_of(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self) -> None:
+        """
+        扫描缓存目录，按修改时间恢复LRU顺序，并清理残留的临时文件
+        """
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".part"):
+                os.remove(entry.path)
+                continue
+            if not entry.name.endswith(".json"):
+                continue
+            key = entry.name[: -len(".json")]
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                stat = os.stat(self._data_path(key))
+            except (OSError, ValueError):
+                continue
+            image = CachedImage(
+                key, self._data_path(key), meta["content_type"], meta["etag"], stat.st_size
+            )
+            found.append((stat.st_mtime, image))
+
+        found.sort(key=lambda pair: pair[0])
+        for _, image in found:
+            self._entries[image.key] = image
+            self.total_bytes += image.size
+        self._evict()
+
+    def get(self, url: str) -> Optional[CachedImage]:
+        """
+        查找已缓存的图片
+
+        :param url: 图片URL
+        :return: 缓存条目或None
+        """
+        key = self.key_of(url)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def writer(self, url: str) -> ImageCacheWriter:
+        """
+        创建写入器，用于在转发图片的同时写入缓存
+
+        :param url: 图片URL
+        :return: 缓存写入器
+        """
+        return ImageCacheWriter(self, url)
+
+    def store(self, url: str, tmp_path: str, content_type: str, etag: str, size: int) -> CachedImage:
+        """
+        将已下载完成的临时文件移入缓存
+
+        :return: 缓存条目
+        """
+        key = self.key_of(url)
+        image = CachedImage(key, self._data_path(key), content_type, etag, size)
+        with open(self._meta_path(key), "w", encoding="utf-8") as f:
+            json.dump({"url": url, "content_type": content_type, "etag": etag}, f)
+        os.replace(tmp_path, image.path)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            self._entries[key] = image
+            self.total_bytes += size
+            self._evict()
+        return image
+
+    def _evict(self) -> None:
+        """
+        淘汰最久未使用的条目，直到总大小不超过上限
+        """
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, image = self._entries.popitem(last=False)
+            self.total_bytes -= image.size
+            self.evictions += 1
+            for path in (image.path, self._meta_path(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        :return: 缓存统计字典
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
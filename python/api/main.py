@@ -8,26 +8,134 @@
 import sys
 import os
 import time
+from contextlib import asynccontextmanager
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
-from fastapi import FastAPI, HTTPException, Query, Depends, Response
+from fastapi import FastAPI, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import httpx
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime
+from datetime import date, datetime
 
 # 添加项目根目录到系统路径，以便导入MongoDB模块
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 # 导入MongoDB查询模块
-from python.mongodb.select_douban_hot import query_mongo
+from python.mongodb.select_douban_hot import CONFIG as MONGO_CONFIG
+from python.mongodb.async_select_douban_hot import async_query_mongo, shutdown_executor
+from python.mongodb import mongo_pool
+from python.mongodb.snapshot_cache import get_cache_stats
+from python.api.image_cache import ImageDiskCache
+from python.api.http_cache import CompressionMiddleware, cache_headers, etag_matches, make_etag
+from python.api.serialization import FastJSONResponse, PayloadCache, bytes_response, dumps
+from python.api.export import EXPORT_FORMATS, PARQUET_ENABLED, encode_rows
+
+# 图片代理配置
+PROXY_CONFIG = {
+    "cache_dir": os.path.join(os.path.dirname(__file__), ".image_cache"),  # 封面缓存目录
+    "cache_max_bytes": 512 * 1024 * 1024,  # 封面缓存总大小上限
+    "max_connections": 100,  # 上游最大连接数
+    "max_keepalive_connections": 20,  # 上游保持的空闲长连接数
+    "keepalive_expiry": 30,  # 空闲长连接保留时间（秒）
+    "timeout": 10,  # 上游请求超时（秒）
+    "cache_flush_bytes": 256 * 1024,  # 写入封面缓存时攒够多少字节再交给线程池写盘
+    "browser_max_age": 7 * 24 * 3600,  # 浏览器缓存时间（秒）
+}
+
+# 按快照版本缓存的已序列化响应体总大小上限
+PAYLOAD_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 豆瓣图片服务器要求的请求头
+PROXY_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:139.0) Gecko/20100101 Firefox/139.0",
+    "Referer": "https://movie.douban.com/",
+}
+
+try:
+    import h2  # noqa: F401  安装 httpx[http2] 后启用HTTP/2
+
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期：启动时创建共享的MongoDB连接池和图片代理HTTP客户端，关闭时释放
+    """
+    mongo_pool.init_client(MONGO_CONFIG)
+    # 图片代理共享的上游HTTP客户端（连接复用）与封面磁盘缓存
+    app.state.http_client = httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        timeout=PROXY_CONFIG["timeout"],
+        limits=httpx.Limits(
+            max_connections=PROXY_CONFIG["max_connections"],
+            max_keepalive_connections=PROXY_CONFIG["max_keepalive_connections"],
+            keepalive_expiry=PROXY_CONFIG["keepalive_expiry"],
+        ),
+        headers=PROXY_HEADERS,
+        follow_redirects=True,
+    )
+    app.state.image_cache = ImageDiskCache(
+        PROXY_CONFIG["cache_dir"], PROXY_CONFIG["cache_max_bytes"]
+    )
+    # 统计数据与列表的已序列化响应体
+    app.state.payload_cache = PayloadCache(PAYLOAD_CACHE_MAX_BYTES)
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+        shutdown_executor()
+        mongo_pool.close_client()
+
 
 # 创建FastAPI应用
 app = FastAPI(
     title="豆瓣电视剧数据分析API",
     description="提供豆瓣热门电视剧数据查询和统计分析的API",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """
+    数据接口的条件请求：ETag由快照版本号和查询参数生成，匹配 If-None-Match 时直接返回304，不计算响应体
+    """
+    if request.method != "GET" or not request.url.path.startswith("/api/douban/"):
+        return await call_next(request)
+
+    client = mongo_pool.get_client()
+    db = async_query_mongo(MONGO_CONFIG, client) if client is not None else None
+    if db is None:
+        return await call_next(request)
+    try:
+        version = await db.get_version()
+    except Exception as e:
+        print(f"获取快照版本失败，跳过HTTP缓存: {e}")
+        version = None
+    finally:
+        db.close()
+    if version is None:
+        return await call_next(request)
+    # 供接口按快照版本缓存序列化后的响应体
+    request.state.snapshot_version = version
+
+    etag = make_etag(version, request.url.path, request.query_params.multi_items())
+    headers = cache_headers(etag)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
+
 # 添加CORS中间件，允许跨域请求
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +150,9 @@ app.add_middleware(
     allow_headers=["*"],  # 允许所有HTTP头
 )
 
+# 响应压缩（图片代理返回的是已压缩的图片；导出是流式下载，Parquet本身已压缩，均不再压缩）
+app.add_middleware(CompressionMiddleware, skip_prefixes=("/api/proxy/", "/api/douban/export"))
+
 
 # 模型定义
 class ResponseModel(BaseModel):
@@ -50,9 +161,10 @@ class ResponseModel(BaseModel):
     data: Any = None
 
 
-# 依赖项：获取MongoDB连接
-def get_db():
-    db = query_mongo()
+# 依赖项：获取基于共享连接池的异步MongoDB查询实例（查询在线程池中执行，不阻塞事件循环）
+async def get_db():
+    client = mongo_pool.get_client()
+    db = async_query_mongo(MONGO_CONFIG, client) if client is not None else None
     if not db:
         raise HTTPException(status_code=500, detail="无法连接到MongoDB数据库")
     try:
@@ -77,8 +189,50 @@ async def root():
     }
 
 
+@app.get("/api/health", response_model=ResponseModel)
+def health(request: Request):
+    """
+    健康检查，返回MongoDB连通性、连接池统计、快照缓存与封面缓存命中统计
+    """
+    mongodb_ok = mongo_pool.ping()
+    return {
+        "code": 200 if mongodb_ok else 503,
+        "message": "服务正常" if mongodb_ok else "MongoDB不可用",
+        "data": {
+            "mongodb": "ok" if mongodb_ok else "unavailable",
+            "pool": mongo_pool.get_pool_stats(),
+            "snapshot_cache": get_cache_stats(),
+            "image_cache": request.app.state.image_cache.stats(),
+            "payload_cache": request.app.state.payload_cache.stats(),
+        },
+    }
+
+
+async def cached_payload(request: Request, build) -> Response:
+    """
+    按快照版本缓存序列化后的响应体：同一快照内相同的请求只计算和序列化一次
+
+    :param request: 当前请求，快照版本由 conditional_get 中间件写入 request.state
+    :param build: 计算响应内容的协程函数
+    :return: JSON响应
+    """
+    version = getattr(request.state, "snapshot_version", None)
+    cache = request.app.state.payload_cache
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    if version is not None:
+        body = cache.get(key, version)
+        if body is not None:
+            return bytes_response(body)
+
+    body = dumps(await build())
+    if version is not None:
+        cache.put(key, version, body)
+    return bytes_response(body)
+
+
 @app.get("/api/douban/hot-tv", response_model=ResponseModel)
 async def get_hot_tv(
+    request: Request,
     db=Depends(get_db),
     keyword: Optional[str] = Query(None, description="标题关键词"),
     category: Optional[str] = Query(None, description="类型"),
@@ -86,156 +240,206 @@ async def get_hot_tv(
     year: Optional[int] = Query(None, description="年份"),
     min_rate: Optional[float] = Query(None, description="最低评分"),
     max_rate: Optional[float] = Query(None, description="最高评分"),
-    page: int = Query(1, description="页码"),
-    page_size: int = Query(10, description="每页数量"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(10, ge=1, description="每页数量"),
     sort_by: str = Query("rate", description="排序字段"),
     sort_order: str = Query("desc", description="排序方向"),
+    cursor: Optional[str] = Query(None, description="分页游标，提供时忽略页码"),
 ):
     """
     获取热门电视剧列表，支持过滤、排序和分页
     """
     try:
-        # 获取最新数据
-        all_data = db.get_latest_data()
-
-        # 过滤数据
-        filtered_data = all_data
-
-        # 按关键词过滤
-        if keyword:
-            filtered_data = [
-                tv for tv in filtered_data if keyword.lower() in tv["title"].lower()
-            ]
-
-        # 按类型过滤
-        if category:
-            filtered_data = [tv for tv in filtered_data if category in tv["category"]]
-
-        # 按地区过滤
-        if area:
-            filtered_data = [tv for tv in filtered_data if area == tv["area"]]
-
-        # 按年份过滤
-        if year:
-            filtered_data = [tv for tv in filtered_data if tv["year"] == year]
-
-        # 按评分区间过滤
-        if min_rate is not None:
-            filtered_data = [
-                tv for tv in filtered_data if float(tv["rate"]) >= min_rate
-            ]
-        if max_rate is not None:
-            filtered_data = [
-                tv for tv in filtered_data if float(tv["rate"]) <= max_rate
-            ]
-
-        # 排序
-        reverse = sort_order.lower() == "desc"
-        if sort_by == "rate":
-            filtered_data.sort(
-                key=lambda x: (
-                    float(x["rate"])
-                    if isinstance(x["rate"], (int, float, str))
-                    and str(x["rate"]).replace(".", "", 1).isdigit()
-                    else 0
-                ),
-                reverse=reverse,
-            )
-        elif sort_by == "year":
-            filtered_data.sort(key=lambda x: x["year"], reverse=reverse)
-        elif sort_by == "title":
-            filtered_data.sort(key=lambda x: x["title"], reverse=reverse)
-
-        # 计算总数
-        total_count = len(filtered_data)
-
-        # 分页
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_data = filtered_data[start_idx:end_idx]
+        # 通过快照索引过滤，并从预先排好的序列中只取出当前页
+        filters = {
+            "keyword": keyword,
+            "category": category,
+            "area": area,
+            "year": year,
+            "min_rate": min_rate,
+            "max_rate": max_rate,
+        }
+
+        async def build():
+            result = await db.page_tv(filters, sort_by, sort_order, page, page_size, cursor)
+            return {
+                "code": 200,
+                "message": "获取热门电视剧列表成功",
+                "data": {
+                    "total": result["total"],
+                    "page": page,
+                    "page_size": page_size,
+                    "items": result["items"],
+                    "next_cursor": result["next_cursor"],
+                },
+            }
+
+        if cursor:
+            # 游标分页的每一页都不同，不缓存
+            return await build()
+        return await cached_payload(request, build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取热门电视剧列表失败: {str(e)}")
+
+
+@app.get("/api/douban/search", response_model=ResponseModel)
+async def search_tv(
+    request: Request,
+    db=Depends(get_db),
+    q: str = Query(..., min_length=1, max_length=100, description="查询文本，匹配标题、导演和演员"),
+    limit: int = Query(10, ge=1, le=50, description="返回数量"),
+):
+    """
+    搜索电视剧，按相关度排序，用于首页搜索框的输入联想
+    """
+
+    async def build():
+        result = await db.search_tv(q, limit)
+        return {
+            "code": 200,
+            "message": "搜索电视剧成功",
+            "data": {"total": result["total"], "items": result["items"]},
+        }
+
+    try:
+        return await cached_payload(request, build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"搜索电视剧失败: {str(e)}")
+
+
+def format_stats(stats: Dict[str, int], sort_keys: bool = False) -> List[Dict[str, Any]]:
+    """
+    将统计字典转换为前端所需的 [{name, value}] 格式
+    """
+    items = sorted(stats.items()) if sort_keys else stats.items()
+    return [{"name": key, "value": value} for key, value in items]
+
 
+@app.get("/api/douban/stats", response_model=ResponseModel)
+async def get_all_stats(request: Request, db=Depends(get_db)):
+    """
+    一次性获取评分、类型、地区和年份统计数据
+    """
+
+    async def build():
+        all_stats = await db.get_all_stats()
         return {
             "code": 200,
-            "message": "获取热门电视剧列表成功",
+            "message": "获取统计数据成功",
             "data": {
-                "total": total_count,
-                "page": page,
-                "page_size": page_size,
-                "items": paginated_data,
+                "rate": format_stats(all_stats.get("rate", {})),
+                "category": format_stats(all_stats.get("category", {})),
+                "area": format_stats(all_stats.get("area", {})),
+                "year": format_stats(all_stats.get("year", {}), sort_keys=True),
             },
         }
+
+    try:
+        return await cached_payload(request, build)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取热门电视剧列表失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取统计数据失败: {str(e)}")
+
+
+@app.get("/api/douban/top", response_model=ResponseModel)
+async def get_top(
+    request: Request,
+    db=Depends(get_db),
+    list_name: str = Query(
+        "rated", alias="list", pattern="^(rated|popular)$", description="榜单：rated 或 popular"
+    ),
+):
+    """
+    获取评分最高或热度最高的电视剧榜单
+    """
+
+    async def build():
+        items = await db.get_top(list_name)
+        return {"code": 200, "message": "获取榜单成功", "data": items}
+
+    try:
+        return await cached_payload(request, build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取榜单失败: {str(e)}")
 
 
 @app.get("/api/douban/rate-stats", response_model=ResponseModel)
-async def get_rate_stats(db=Depends(get_db)):
+async def get_rate_stats(request: Request, db=Depends(get_db)):
     """
     获取评分统计数据
     """
-    try:
-        rate_stats = db.get_rate_stats()
+
+    async def build():
+        rate_stats = await db.get_rate_stats()
 
         # 转换为前端所需格式
-        formatted_stats = [
-            {"name": key, "value": value} for key, value in rate_stats.items()
-        ]
+        formatted_stats = format_stats(rate_stats)
 
         return {"code": 200, "message": "获取评分统计数据成功", "data": formatted_stats}
+
+    try:
+        return await cached_payload(request, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取评分统计数据失败: {str(e)}")
 
 
 @app.get("/api/douban/category-stats", response_model=ResponseModel)
-async def get_category_stats(db=Depends(get_db)):
+async def get_category_stats(request: Request, db=Depends(get_db)):
     """
     获取类型统计数据
     """
-    try:
-        category_stats = db.get_category_stats()
+
+    async def build():
+        category_stats = await db.get_category_stats()
 
         # 转换为前端所需格式
-        formatted_stats = [
-            {"name": key, "value": value} for key, value in category_stats.items()
-        ]
+        formatted_stats = format_stats(category_stats)
 
         return {"code": 200, "message": "获取类型统计数据成功", "data": formatted_stats}
+
+    try:
+        return await cached_payload(request, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取类型统计数据失败: {str(e)}")
 
 
 @app.get("/api/douban/area-stats", response_model=ResponseModel)
-async def get_area_stats(db=Depends(get_db)):
+async def get_area_stats(request: Request, db=Depends(get_db)):
     """
     获取地区统计数据
     """
-    try:
-        area_stats = db.get_area_stats()
+
+    async def build():
+        area_stats = await db.get_area_stats()
 
         # 转换为前端所需格式
-        formatted_stats = [
-            {"name": key, "value": value} for key, value in area_stats.items()
-        ]
+        formatted_stats = format_stats(area_stats)
 
         return {"code": 200, "message": "获取地区统计数据成功", "data": formatted_stats}
+
+    try:
+        return await cached_payload(request, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取地区统计数据失败: {str(e)}")
 
 
 @app.get("/api/douban/year-stats", response_model=ResponseModel)
-async def get_year_stats(db=Depends(get_db)):
+async def get_year_stats(request: Request, db=Depends(get_db)):
     """
     获取年份统计数据
     """
-    try:
-        year_stats = db.get_year_stats()
+
+    async def build():
+        year_stats = await db.get_year_stats()
 
         # 转换为前端所需格式
-        formatted_stats = [
-            {"name": key, "value": value} for key, value in sorted(year_stats.items())
-        ]
+        formatted_stats = format_stats(year_stats, sort_keys=True)
 
         return {"code": 200, "message": "获取年份统计数据成功", "data": formatted_stats}
+
+    try:
+        return await cached_payload(request, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取年份统计数据失败: {str(e)}")
 
@@ -246,7 +450,7 @@ async def get_tv_detail(url: str, db=Depends(get_db)):
     获取单个电视剧详情
     """
     try:
-        tv_detail = db.get_tv_by_url(url)
+        tv_detail = await db.get_tv_by_url(url)
 
         if not tv_detail:
             return {"code": 404, "message": "未找到指定电视剧", "data": None}
@@ -256,28 +460,185 @@ async def get_tv_detail(url: str, db=Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"获取电视剧详情失败: {str(e)}")
 
 
+@app.get("/api/douban/tv/{tv_id}", response_model=ResponseModel)
+async def get_tv_by_id(tv_id: str, db=Depends(get_db)):
+    """
+    根据豆瓣条目id获取单个电视剧详情（快照已缓存时无需访问MongoDB）
+    """
+    try:
+        tv_detail = await db.get_tv_by_id(tv_id)
+
+        if not tv_detail:
+            return {"code": 404, "message": "未找到指定电视剧", "data": None}
+
+        return {"code": 200, "message": "获取电视剧详情成功", "data": tv_detail}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取电视剧详情失败: {str(e)}")
+
+
+@app.get("/api/douban/tv/{tv_id}/history", response_model=ResponseModel)
+async def get_tv_history(
+    tv_id: str,
+    db=Depends(get_db),
+    days: Optional[int] = Query(None, ge=1, description="最近多少天，不提供则返回全部"),
+):
+    """
+    获取某部剧的评分与排名走势
+    """
+    try:
+        points = await db.get_tv_history(tv_id, days)
+
+        if not points:
+            return {"code": 404, "message": "未找到该电视剧的历史数据", "data": None}
+
+        return {"code": 200, "message": "获取历史走势成功", "data": {"id": tv_id, "points": points}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取历史走势失败: {str(e)}")
+
+
+@app.get("/api/douban/movers", response_model=ResponseModel)
+async def get_movers(
+    db=Depends(get_db),
+    days: int = Query(7, ge=2, le=366, description="统计窗口天数"),
+    by: str = Query("rating", pattern="^(rating|rank)$", description="比较指标：rating 或 rank"),
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+):
+    """
+    获取一段时间内评分或排名变化最大的剧
+    """
+    try:
+        movers = await db.get_movers(days, by, limit)
+
+        return {"code": 200, "message": "获取变化最大的电视剧成功", "data": movers}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取变化最大的电视剧失败: {str(e)}")
+
+
+@app.get("/api/douban/snapshots", response_model=ResponseModel)
+async def list_snapshots(
+    db=Depends(get_db),
+    limit: int = Query(30, ge=1, le=1000, description="返回数量"),
+):
+    """
+    按时间倒序列出已保存的快照（可用于导出指定快照）
+    """
+    try:
+        snapshots = await db.list_snapshots(limit)
+
+        return {"code": 200, "message": "获取快照列表成功", "data": snapshots}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取快照列表失败: {str(e)}")
+
+
+@app.get("/api/douban/export")
+async def export_data(
+    db=Depends(get_db),
+    dataset: str = Query("items", pattern="^(items|history)$", description="数据集：items 或 history"),
+    fmt: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv|parquet)$", description="格式：ndjson、csv 或 parquet"
+    ),
+    snapshot_id: Optional[str] = Query(None, description="导出的快照id，不提供则为最新快照"),
+    start: Optional[date] = Query(None, description="历史数据的起始日期"),
+    end: Optional[date] = Query(None, description="历史数据的结束日期"),
+    batch_size: Optional[int] = Query(None, ge=100, le=10000, description="游标每批读取的文档数"),
+):
+    """
+    流式导出一个快照的全部电视剧数据或全部评分与排名历史
+
+    数据逐批从MongoDB游标读取并编码后发送，不经过内存快照缓存
+    """
+    if fmt == "parquet" and not PARQUET_ENABLED:
+        raise HTTPException(status_code=501, detail="导出Parquet需要安装 pyarrow")
+    media_type, extension = EXPORT_FORMATS[fmt]
+
+    try:
+        if dataset == "items":
+            header = await db.get_header(snapshot_id)
+            if header is None:
+                raise HTTPException(status_code=404, detail="未找到指定快照")
+            rows = db.iter_snapshot_items(header, batch_size)
+            filename = f"{header['_id']}.{extension}"
+        else:
+            rows = db.iter_history(start, end, batch_size)
+            filename = f"douban_hot_tv_history.{extension}"
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"导出数据失败: {str(e)}")
+
+    return StreamingResponse(
+        encode_rows(rows, dataset, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def image_cache_headers(etag: Optional[str] = None) -> Dict[str, str]:
+    """
+    图片代理响应的浏览器缓存头
+    """
+    headers = {"Cache-Control": f"public, max-age={PROXY_CONFIG['browser_max_age']}"}
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+
 @app.get("/api/proxy/image")
-async def proxy_image(url: str):
+async def proxy_image(url: str, request: Request):
     """
     图片代理接口，解决跨域问题
+
+    已缓存的封面直接从磁盘返回；未缓存时通过共享连接逐块转发上游响应，同时写入磁盘缓存
     """
+    image_cache: ImageDiskCache = request.app.state.image_cache
+    cached = image_cache.get(url)
+    if cached is not None:
+        headers = image_cache_headers(cached.etag)
+        if request.headers.get("if-none-match") == cached.etag:
+            return Response(status_code=304, headers=headers)
+        return FileResponse(cached.path, media_type=cached.content_type, headers=headers)
+
+    client: httpx.AsyncClient = request.app.state.http_client
     try:
-        async with httpx.AsyncClient() as client:
-            # 添加豆瓣网站常用的请求头
-            headers = {
-                "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:139.0) Gecko/20100101 Firefox/139.0",
-                "Referer": "https://movie.douban.com/",
-            }
-            response = await client.get(url, headers=headers, follow_redirects=True)
-
-            # 返回图片内容
-            return Response(
-                content=response.content,
-                media_type=response.headers.get("content-type", "image/jpeg"),
-            )
+        upstream = await client.send(client.build_request("GET", url), stream=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取图片失败: {str(e)}")
 
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        raise HTTPException(
+            status_code=upstream.status_code if upstream.status_code < 500 else 502,
+            detail=f"获取图片失败，上游状态码: {upstream.status_code}",
+        )
+
+    content_type = upstream.headers.get("content-type", "image/jpeg")
+    writer = await run_in_threadpool(image_cache.writer, url)
+
+    flush_bytes = PROXY_CONFIG["cache_flush_bytes"]
+
+    async def stream_body():
+        # 磁盘写入在线程池中进行，不阻塞事件循环；数据块先攒在内存中，减少线程切换次数
+        pending: List[bytes] = []
+        pending_size = 0
+        try:
+            async for chunk in upstream.aiter_bytes():
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= flush_bytes:
+                    await run_in_threadpool(writer.write, b"".join(pending))
+                    pending, pending_size = [], 0
+                yield chunk
+            if pending:
+                await run_in_threadpool(writer.write, b"".join(pending))
+            await run_in_threadpool(writer.commit, content_type)
+        finally:
+            writer.discard()
+            await upstream.aclose()
+
+    return StreamingResponse(
+        stream_body(), media_type=content_type, headers=image_cache_headers()
+    )
+
 
 if __name__ == "__main__":
     import uvicorn
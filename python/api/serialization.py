@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+API响应的JSON序列化
+
+安装 orjson 后使用 orjson 序列化响应（未安装时退回标准库 json）；
+统计数据和大列表的响应体按快照版本缓存为字节串，同一快照内重复请求直接返回，不再序列化。
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+
+    ORJSON_ENABLED = True
+except ImportError:
+    ORJSON_ENABLED = False
+
+
+def dumps(content: Any) -> bytes:
+    """
+    将响应内容序列化为JSON字节串
+
+    :param content: 可序列化为JSON的数据
+    :return: UTF-8编码的JSON
+    """
+    if ORJSON_ENABLED:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    使用 dumps 序列化的JSON响应
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def bytes_response(body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    直接返回已序列化的JSON字节串
+
+    :param body: JSON字节串
+    :param headers: 额外的响应头
+    :return: 响应
+    """
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class PayloadCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        按快照版本缓存序列化后的响应体，总大小超过上限时淘汰最久未使用的条目
+
+        :param max_bytes: 缓存总大小上限（字节）
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: str) -> Optional[bytes]:
+        """
+        获取缓存的响应体
+
+        :param key: 缓存键（请求路径和查询参数）
+        :param version: 当前快照版本，与缓存时的版本不同视为未命中
+        :return: 响应体或None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, version: str, body: bytes) -> None:
+        """
+        缓存响应体；单个响应体超过上限的四分之一时不缓存
+
+        :param key: 缓存键
+        :param version: 快照版本
+        :param body: 响应体
+        """
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old[1])
+            self._entries[key] = (version, body)
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        :return: 缓存统计字典
+        """
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "orjson": ORJSON_ENABLED,
+        }
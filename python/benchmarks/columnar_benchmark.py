@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内存快照两种格式的对比：字典列表 + SnapshotIndex 与列式快照（NumPy）
+分别测量常驻内存、过滤分页延迟和统计计算延迟（不需要MongoDB）
+
+用法：
+    python python/benchmarks/columnar_benchmark.py
+    python python/benchmarks/columnar_benchmark.py --size 50000 --repeat 50
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.douban_columnar import ColumnarSnapshot
+from python.mongodb.douban_index import SnapshotIndex
+from python.mongodb.douban_stats import compute_stats
+from python.mongodb.select_douban_hot import reshape_item
+from python.stubs.fake_douban_api import generate_catalogue
+from python.benchmarks.load_test_query import percentile
+
+# 压测使用的查询：(过滤条件, 排序字段, 是否降序)
+QUERIES = [
+    ({}, "rate", True),
+    ({"min_rate": 8}, "rate", True),
+    ({"category": None}, "year", True),  # 运行时替换为数据中最常见的类型
+    ({"keyword": "剧集1", "max_rate": 9}, "title", False),
+    ({"year": 2020, "min_rate": 6}, "rate", False),
+]
+
+
+def measure_memory(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """
+    测量 build() 返回的对象构建完成后仍占用的内存（字节）
+    """
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+
+def measure(call: Callable[[], Any], repeat: int) -> float:
+    """
+    重复执行 call，返回中位数耗时（毫秒）
+    """
+    latencies: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return percentile(latencies, 50) * 1000
+
+
+def query_page(
+    index, items, filters: Dict[str, Any], sort_by: str, reverse: bool
+) -> List[Dict[str, Any]]:
+    """
+    与 page_tv 相同的过滤、排序、取第一页并还原为字典
+    """
+    matched = index.filter(**filters)
+    positions, _ = index.page(matched, sort_by, reverse, 0, 20)
+    return [items[pos] for pos in positions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内存快照格式对比")
+    parser.add_argument("--size", type=int, default=10000, help="快照条数")
+    parser.add_argument("--repeat", type=int, default=30, help="每个查询的重复次数")
+    args = parser.parse_args()
+
+    raw = parse_tv_data({"items": generate_catalogue(args.size, seed=args.size)})
+    top_category = Counter(c for item in raw for c in item["genres"]).most_common(1)[0][0]
+    queries = [
+        ({k: (top_category if k == "category" else v) for k, v in f.items()}, s, r)
+        for f, s, r in QUERIES
+    ]
+
+    def build_dicts():
+        items = [reshape_item(item, "2024-01-01") for item in raw]
+        return items, SnapshotIndex(items)
+
+    def build_columnar():
+        table = ColumnarSnapshot(reshape_item(item, "2024-01-01") for item in raw)
+        return table, table
+
+    results = {}
+    for name, build in (("dicts", build_dicts), ("columnar", build_columnar)):
+        (items, index), memory = measure_memory(build)
+        latencies = [
+            measure(lambda: query_page(index, items, f, s, r), args.repeat) for f, s, r in queries
+        ]
+        if name == "dicts":
+            stats_latency = measure(lambda: compute_stats(items), args.repeat)
+        else:
+            stats_latency = measure(items.stats, args.repeat)
+        results[name] = (memory, latencies, stats_latency)
+
+    print(f"快照条数: {args.size}")
+    headers = " ".join(f"{'查询' + str(i + 1) + '(ms)':>10}" for i in range(len(queries)))
+    print(f"{'格式':<10} {'内存(MB)':>10} {headers} {'统计(ms)':>10}")
+    for name, (memory, latencies, stats_latency) in results.items():
+        print(
+            f"{name:<10} {memory / 1024 / 1024:>10.2f} "
+            + " ".join(f"{latency:>10.3f}" for latency in latencies)
+            + f" {stats_latency:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
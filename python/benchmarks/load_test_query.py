@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查询层并发压测：对比同步查询直接在事件循环中执行与异步查询层的吞吐量和延迟
+
+用法：
+    # 进程内对比（需要可访问的MongoDB，默认每次请求都检查快照版本以产生真实的数据库往返）
+    python python/benchmarks/load_test_query.py --concurrency 50 --requests 2000
+
+    # 对运行中的API服务压测
+    python python/benchmarks/load_test_query.py --url http://127.0.0.1:8000/api/douban/stats
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Callable, Awaitable
+
+# 添加项目根目录到系统路径，以便导入MongoDB模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.mongodb import mongo_pool
+from python.mongodb.select_douban_hot import CONFIG, query_mongo
+from python.mongodb.async_select_douban_hot import AsyncDoubanMongoDBQuery, shutdown_executor
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    计算已排序数据的百分位数
+    """
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def run_load(
+    name: str, call: Callable[[], Awaitable[object]], concurrency: int, total: int
+) -> None:
+    """
+    以固定并发数执行 total 次调用，并打印吞吐量与延迟分布
+    """
+    latencies: List[float] = []
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"{name:<8} 请求数={len(latencies)} 并发={concurrency} "
+        f"吞吐={len(latencies) / elapsed:,.1f} req/s "
+        f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.2f}ms"
+    )
+
+
+async def compare_in_process(concurrency: int, total: int, check_interval: float) -> None:
+    """
+    进程内对比同步查询与异步查询层
+    """
+    config = dict(CONFIG, cache_check_interval=check_interval)
+    client = mongo_pool.init_client(config)
+    sync_db = query_mongo(config, client)
+    async_db = AsyncDoubanMongoDBQuery(sync_db)
+
+    # 预热，避免首次加载快照计入结果
+    sync_db.get_all_stats()
+
+    async def sync_call():
+        # 与改造前的接口一致：在协程中直接调用同步驱动，阻塞事件循环
+        return sync_db.get_all_stats()
+
+    async def async_call():
+        return await async_db.get_all_stats()
+
+    try:
+        await run_load("sync", sync_call, concurrency, total)
+        await run_load("async", async_call, concurrency, total)
+    finally:
+        shutdown_executor()
+        mongo_pool.close_client()
+
+
+async def load_http(url: str, concurrency: int, total: int) -> None:
+    """
+    对运行中的API服务压测
+    """
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+        async def call():
+            response = await client.get(url)
+            response.raise_for_status()
+
+        await run_load("http", call, concurrency, total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询层并发压测")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发数")
+    parser.add_argument("--requests", type=int, default=2000, help="总请求数")
+    parser.add_argument(
+        "--check-interval",
+        type=float,
+        default=0,
+        help="快照版本检查间隔（秒），0表示每次请求都访问MongoDB",
+    )
+    parser.add_argument("--url", help="压测运行中的API服务地址，不提供则进行进程内对比")
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(load_http(args.url, args.concurrency, args.requests))
+    else:
+        asyncio.run(compare_in_process(args.concurrency, args.requests, args.check_interval))
+
+
+if __name__ == "__main__":
+    main()
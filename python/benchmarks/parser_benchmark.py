@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+推荐接口解析（parse_tv_data）的正确性检查与吞吐量测试（不需要MongoDB）
+
+fixtures/recommend_pages.json 保存推荐接口的原始响应，用 --record 从接口录制，录制后不做修改。
+先逐条检查录制页面的解析结果与副标题、评分是否一致（副标题除年份外的四个部分齐全时，各字段必须与对应位置的部分相同），
+再测量每秒解析的条目数。解析结果有问题时以非零状态退出；还没有录制文件时只测量吞吐量。
+
+用法：
+    python python/benchmarks/parser_benchmark.py --record 3
+    python python/benchmarks/parser_benchmark.py
+    python python/benchmarks/parser_benchmark.py --size 50000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.crawlr.async_spider import CRAWL_CONFIG, create_client, fetch_page
+from python.crawlr.douban_spider import TV_TYPES, parse_tv_data
+from python.crawlr.rate_limit import TokenBucket
+from python.stubs.fake_douban_api import generate_catalogue
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "recommend_pages.json")
+
+
+async def record_pages(
+    pages_per_type: int, path: str = FIXTURE_PATH, config: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    从推荐接口录制每个分类的前几页原始响应，写入 path
+
+    :param pages_per_type: 每个分类录制的页数
+    :param path: 录制文件路径
+    :param config: 覆盖默认值的爬取配置（如指向本地假接口的 api_url）
+    :return: 录制的条目数
+    """
+    cfg = {**CRAWL_CONFIG, **(config or {})}
+    limit = cfg["page_size"]
+    bucket = TokenBucket(cfg["requests_per_second"], cfg["burst"])
+    pages = []
+    async with create_client(cfg) as client:
+        for tv_type in TV_TYPES:
+            for start in range(0, pages_per_type * limit, limit):
+                response = await fetch_page(client, bucket, start, limit, tv_type, cfg)
+                pages.append({"tv_type": tv_type, "start": start, "response": response})
+                if not response.get("items"):
+                    break
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"recorded_at": datetime.now().isoformat(timespec="seconds"), "api_url": cfg["api_url"], "pages": pages},
+            f,
+            ensure_ascii=False,
+            indent=1,
+        )
+    return sum(len(page["response"].get("items") or []) for page in pages)
+
+
+def load_recorded_pages(path: str = FIXTURE_PATH) -> Optional[List[Dict[str, Any]]]:
+    """
+    读取录制的接口响应
+
+    :param path: 录制文件路径
+    :return: 原始响应列表，还没有录制时为None
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return [page["response"] for page in json.load(f)["pages"]]
+
+
+def check_item(raw: Dict[str, Any], item: Dict[str, Any]) -> List[str]:
+    """
+    检查一个条目的解析结果与原始数据是否一致
+
+    年份取副标题开头的四位数字，评分与原始评分相同；副标题除年份外有四个部分时，
+    国家或地区、类型、导演、演员依次与各部分（按空格规范化后）相同，否则每个值都必须出现在副标题中。
+
+    :param raw: 接口返回的原始条目
+    :param item: parse_tv_data 解析出的条目
+    :return: 不一致之处的描述列表，全部一致时为空
+    """
+    subtitle = raw.get("card_subtitle") or ""
+    parts = [" ".join(part.split()) for part in subtitle.split("/")]
+    parts = [part for part in parts if part]
+    year = int(parts[0][:4]) if parts and parts[0][:4].isdigit() else None
+    if year is not None:
+        parts = parts[1:]
+    rating = (raw.get("rating") or {}).get("value")
+
+    errors = []
+    if item["year"] != year:
+        errors.append(f"year: 期望 {year!r}，实际 {item['year']!r}")
+    if item["rating"] != (float(rating) if rating else None):
+        errors.append(f"rating: 期望 {rating!r}，实际 {item['rating']!r}")
+    fields = ("countries", "genres", "directors", "actors")
+    if len(parts) == 4:
+        for field, part in zip(fields, parts):
+            if " ".join(item[field]) != part:
+                errors.append(f"{field}: 期望 {part!r}，实际 {item[field]!r}")
+    else:
+        for field in fields:
+            for value in item[field]:
+                if not value or "/" in value or value not in subtitle:
+                    errors.append(f"{field}: {value!r} 不是副标题中的一部分")
+    return [f"{raw.get('id')} ({subtitle}) {error}" for error in errors]
+
+
+def check_pages(pages: List[Dict[str, Any]]) -> List[str]:
+    """
+    逐条检查录制页面的解析结果
+
+    :param pages: 接口原始响应列表
+    :return: 不一致之处的描述列表，全部一致时为空
+    """
+    errors = []
+    for page in pages:
+        for raw, item in zip(page.get("items") or [], parse_tv_data(page)):
+            errors.extend(check_item(raw, item))
+    return errors
+
+
+def items_per_second(pages: List[Dict[str, Any]], repeat: int) -> float:
+    """
+    重复解析全部页面，返回最快一轮的每秒条目数
+    """
+    total = sum(len(page["items"]) for page in pages)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in pages:
+            parse_tv_data(page)
+        best = min(best, time.perf_counter() - started)
+    return total / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推荐接口解析的正确性与吞吐量")
+    parser.add_argument("--record", type=int, metavar="PAGES", help="从推荐接口录制每个分类的前 PAGES 页后退出")
+    parser.add_argument("--api-url", default=CRAWL_CONFIG["api_url"], help="录制时使用的推荐接口地址")
+    parser.add_argument("--size", type=int, default=20000, help="吞吐量测试的条目数")
+    parser.add_argument("--repeat", type=int, default=15, help="重复轮数")
+    args = parser.parse_args()
+
+    if args.record:
+        count = asyncio.run(record_pages(args.record, config={"api_url": args.api_url}))
+        print(f"已录制 {count} 条数据到 {FIXTURE_PATH}")
+        return
+
+    errors = []
+    recorded = load_recorded_pages()
+    if recorded is None:
+        print(f"没有录制的接口页面（{FIXTURE_PATH}），可用 --record 录制")
+    else:
+        errors = check_pages(recorded)
+        count = sum(len(page.get("items") or []) for page in recorded)
+        print(f"录制页面核对（{count} 条）: {'全部一致' if not errors else f'{len(errors)} 处不一致'}")
+        for error in errors:
+            print(f"  {error}")
+
+    catalogue = generate_catalogue(args.size, seed=args.size)
+    pages = [{"items": catalogue[i : i + 20]} for i in range(0, len(catalogue), 20)]
+    rate = items_per_second(pages, args.repeat)
+    print(f"吞吐量（{args.size} 条，每页20条，取 {args.repeat} 轮中最快的一轮）: {rate:,.0f} 条/秒")
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
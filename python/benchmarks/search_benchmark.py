@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索索引的构建耗时、常驻内存和查询延迟，并与原来逐条比对标题子串的方式对比（不需要MongoDB）
+
+用法：
+    python python/benchmarks/search_benchmark.py
+    python python/benchmarks/search_benchmark.py --size 50000 --repeat 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.douban_search import SearchIndex
+from python.mongodb.select_douban_hot import reshape_item
+from python.stubs.fake_douban_api import generate_catalogue
+from python.benchmarks.columnar_benchmark import measure_memory
+from python.benchmarks.load_test_query import percentile
+
+# 每隔多少条改用英文标题，用于测量英文单词的前缀联想
+LATIN_TITLE_EVERY = 10
+LATIN_TITLES = ["Stranger Things", "Breaking Bad", "The Crown", "Game of Thrones", "Better Call Saul"]
+
+# 压测使用的查询：输入联想时的逐字输入、标题、演职员、组合查询和英文前缀
+QUERIES = ["测", "测试", "剧集12", "大卫", "大卫·哈伯", "艾米莉亚·克拉克", "哈伯 剧集3", "str", "stranger th", "the crown 1"]
+
+
+def substring_search(items: List[Dict[str, Any]], query: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    原来 get_hot_tv 的关键词过滤：逐条比对标题子串，不匹配演职员，也不排序
+    """
+    keyword = query.lower()
+    return [tv for tv in items if keyword in tv["title"].lower()][:limit]
+
+
+def latencies_ms(call: Callable[[], Any], repeat: int) -> List[float]:
+    """
+    重复执行 call，返回排好序的每次耗时（毫秒）
+    """
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="搜索索引压测")
+    parser.add_argument("--size", type=int, default=10000, help="快照条数")
+    parser.add_argument("--repeat", type=int, default=100, help="每个查询的重复次数")
+    parser.add_argument("--limit", type=int, default=10, help="每次查询返回的条数")
+    args = parser.parse_args()
+
+    raw = parse_tv_data({"items": generate_catalogue(args.size, seed=args.size)})
+    items = [reshape_item(item, "2024-01-01") for item in raw]
+    for pos in range(0, len(items), LATIN_TITLE_EVERY):
+        items[pos]["title"] = f"{LATIN_TITLES[pos // LATIN_TITLE_EVERY % len(LATIN_TITLES)]} {pos}"
+
+    started = time.perf_counter()
+    index = SearchIndex(items)
+    build_time = time.perf_counter() - started
+    _, memory = measure_memory(lambda: SearchIndex(items))
+
+    print(f"快照条数: {args.size}")
+    print(f"构建索引: {build_time:.2f} 秒，常驻内存 {memory / 1024 / 1024:.2f} MB，词项 {len(index.postings)} 个")
+    print(f"{'查询':<14} {'命中':>8} {'p50(ms)':>10} {'p99(ms)':>10} {'子串p50(ms)':>12}")
+    for query in QUERIES:
+        total, _ = index.search(query, args.limit)
+        indexed = latencies_ms(lambda: index.search(query, args.limit), args.repeat)
+        scanned = latencies_ms(lambda: substring_search(items, query, args.limit), args.repeat)
+        print(
+            f"{query:<14} {total:>8} {percentile(indexed, 50):>10.3f} {percentile(indexed, 99):>10.3f}"
+            f" {percentile(scanned, 50):>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
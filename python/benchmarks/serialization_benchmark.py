@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+列表响应序列化的微基准：对比 FastAPI 默认的 jsonable_encoder + 标准库 json、orjson 直接序列化，
+以及同一快照内直接返回已缓存字节串三种方式（不需要MongoDB）
+
+用法：
+    python python/benchmarks/serialization_benchmark.py
+    python python/benchmarks/serialization_benchmark.py --sizes 100 1000 5000 --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.api.serialization import ORJSON_ENABLED, FastJSONResponse, bytes_response, dumps
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.select_douban_hot import reshape_item
+from python.stubs.fake_douban_api import generate_catalogue
+from python.benchmarks.load_test_query import percentile
+
+
+def build_payload(size: int) -> Dict[str, Any]:
+    """
+    构造与 /api/douban/hot-tv 相同结构、包含 size 条数据的响应内容
+    """
+    items = parse_tv_data({"items": generate_catalogue(size, seed=size)})
+    tv_list = [reshape_item(item, "2024-01-01") for item in items]
+    return {
+        "code": 200,
+        "message": "获取热门电视剧列表成功",
+        "data": {"total": size, "page": 1, "page_size": size, "items": tv_list, "next_cursor": None},
+    }
+
+
+def measure(call: Callable[[], Any], repeat: int) -> float:
+    """
+    重复执行 call，返回中位数耗时（毫秒）
+    """
+    latencies: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return percentile(latencies, 50) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表响应序列化微基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000], help="列表条数")
+    parser.add_argument("--repeat", type=int, default=30, help="每种方式的重复次数")
+    args = parser.parse_args()
+
+    if not ORJSON_ENABLED:
+        print("未安装 orjson，FastJSONResponse 将退回标准库 json（pip install orjson）")
+
+    print(f"{'条数':>6} {'响应体':>10} {'jsonable+json':>14} {'orjson':>10} {'缓存字节串':>10} {'加速比':>8}")
+    for size in args.sizes:
+        payload = build_payload(size)
+        cached = dumps(payload)
+
+        baseline = measure(lambda: JSONResponse(jsonable_encoder(payload)), args.repeat)
+        fast = measure(lambda: FastJSONResponse(payload), args.repeat)
+        served = measure(lambda: bytes_response(cached), args.repeat)
+        print(
+            f"{size:>6} {len(cached) / 1024:>8.0f}KB {baseline:>12.2f}ms {fast:>8.2f}ms "
+            f"{served:>8.3f}ms {baseline / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
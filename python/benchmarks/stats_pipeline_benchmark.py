@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+统计数据两种计算方式的对比：把快照全部读回Python遍历计数，与在MongoDB中执行聚合管道只传回计数
+
+在独立的测试数据库中分别写入 1k/10k/100k 条假数据，记录每种方式的延迟和从服务器接收的字节数，
+结束后删除测试数据库。
+
+用法（需要可访问的MongoDB）：
+    python python/benchmarks/stats_pipeline_benchmark.py
+    python python/benchmarks/stats_pipeline_benchmark.py --sizes 1000 10000 --repeat 10
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Callable
+
+import bson
+from pymongo import MongoClient, monitoring
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.douban_stats import compute_stats
+from python.mongodb.save_douban_hot import build_item_document
+from python.mongodb.select_douban_hot import CONFIG, DoubanMongoDBQuery
+from python.stubs.fake_douban_api import generate_catalogue
+from python.benchmarks.load_test_query import percentile
+
+
+class ReplyBytesListener(monitoring.CommandListener):
+    """
+    累计服务器响应的BSON字节数
+    """
+
+    def __init__(self):
+        self.bytes_received = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.bytes_received += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+def seed_snapshot(db, config: Dict[str, Any], size: int) -> str:
+    """
+    写入一个包含 size 条假数据的快照
+
+    :return: 快照id
+    """
+    snapshot_id = f"benchmark_{size}"
+    created_at = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    items = parse_tv_data({"items": generate_catalogue(size, seed=size)})
+
+    db[config["collection_name"]].delete_many({})
+    db[config["items_collection_name"]].delete_many({})
+    docs = [build_item_document(item, snapshot_id, created_at, rank) for rank, item in enumerate(items)]
+    for offset in range(0, len(docs), 5000):
+        db[config["items_collection_name"]].insert_many(docs[offset : offset + 5000], ordered=False)
+    db[config["items_collection_name"]].create_index([("snapshot_id", 1), ("rank", 1)])
+    db[config["collection_name"]].insert_one(
+        {"_id": snapshot_id, "created_at": created_at, "data_count": size, "storage": "items"}
+    )
+    return snapshot_id
+
+
+def measure(
+    name: str, call: Callable[[], Any], listener: ReplyBytesListener, repeat: int
+) -> Dict[str, Any]:
+    """
+    重复执行 call，返回延迟分布与每次调用接收的字节数
+    """
+    latencies: List[float] = []
+    listener.bytes_received = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "name": name,
+        "p50": percentile(latencies, 50) * 1000,
+        "max": latencies[-1] * 1000,
+        "bytes": listener.bytes_received // repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计数据计算方式对比")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="快照条数")
+    parser.add_argument("--repeat", type=int, default=5, help="每种方式的重复次数")
+    parser.add_argument("--db", default="douban_benchmark", help="测试数据库名（结束后删除）")
+    args = parser.parse_args()
+
+    listener = ReplyBytesListener()
+    client = MongoClient(CONFIG["mongodb_uri"], event_listeners=[listener])
+    config = dict(CONFIG, db_name=args.db)
+    db = client[args.db]
+    query = DoubanMongoDBQuery(config, client)
+    query.connect()
+
+    def python_path():
+        # 改造前的方式：读回整个快照并在Python中计数（绕过快照缓存）
+        record = query.get_latest_header()
+        return compute_stats(query._load_snapshot(record))
+
+    try:
+        print(f"{'条数':>8} {'方式':<10} {'p50(ms)':>10} {'max(ms)':>10} {'接收字节':>14}")
+        for size in args.sizes:
+            seed_snapshot(db, config, size)
+            expected = python_path()
+            if query.aggregate_stats() != expected:
+                print(f"警告：{size} 条数据时两种方式的结果不一致")
+            for row in (
+                measure("python", python_path, listener, args.repeat),
+                measure("aggregate", query.aggregate_stats, listener, args.repeat),
+            ):
+                print(
+                    f"{size:>8} {row['name']:<10} {row['p50']:>10.1f} {row['max']:>10.1f} {row['bytes']:>14,}"
+                )
+    finally:
+        client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
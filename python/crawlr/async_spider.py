@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并发版豆瓣热门电视剧爬虫
+
+同时请求多个 start 偏移量，用令牌桶控制整体请求速率，某一页返回空数据后不再请求后续页面。
+限流和服务端错误按指数退避重试；已连续完成的页面写入断点，失败后再次运行从断点继续。
+"""
+
+import asyncio
+import sys
+import os
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Union
+
+import httpx
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.crawlr.douban_spider import (
+    API_URL,
+    HEADERS,
+    build_params,
+    parse_tv_data,
+    resolve_tv_type,
+    tv_type_key,
+)
+from python.crawlr.rate_limit import TokenBucket
+from python.crawlr.retry import (
+    RETRY_CONFIG,
+    RETRYABLE_STATUS,
+    CrawlError,
+    backoff_delay,
+    parse_retry_after,
+)
+from python.crawlr.checkpoint import CHECKPOINT_DIR, CHECKPOINT_TTL_HOURS, CrawlCheckpoint
+
+# 爬取配置
+CRAWL_CONFIG = {
+    "api_url": API_URL,  # 推荐接口地址，测试时可指向本地假服务器
+    "page_size": 20,  # 每页数量
+    "concurrency": 4,  # 同时进行的请求数
+    "requests_per_second": 2.0,  # 每秒请求数预算
+    "burst": 1,  # 令牌桶容量（允许的突发请求数）
+    "max_pages": 500,  # 最多爬取的页数，防止接口异常时无限翻页
+    "checkpoint_dir": CHECKPOINT_DIR,  # 断点文件目录
+    "checkpoint_ttl_hours": CHECKPOINT_TTL_HOURS,  # 断点有效时间（小时）
+    "crawl_id": None,  # 爬取批次标识（断点只在同一批次内有效），None表示当天日期
+    **RETRY_CONFIG,  # 重试次数、退避时间与超时
+}
+
+
+def create_client(config: Dict[str, Any]) -> httpx.AsyncClient:
+    """
+    创建爬虫使用的HTTP客户端（连接复用）
+
+    :param config: 爬取配置
+    :return: 异步HTTP客户端
+    """
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=httpx.Timeout(config["read_timeout"], connect=config["connect_timeout"]),
+        limits=httpx.Limits(
+            max_connections=config["concurrency"],
+            max_keepalive_connections=config["concurrency"],
+        ),
+    )
+
+
+def open_checkpoint(tv_type: Union[str, Dict[str, str]], config: Dict[str, Any]) -> CrawlCheckpoint:
+    """
+    按爬取配置打开某个组合的断点
+
+    :param tv_type: 电视剧类型，TV_TYPES 中的键或包含 region/category 的字典
+    :param config: 完整的爬取配置
+    :return: 断点
+    """
+    return CrawlCheckpoint(
+        tv_type_key(tv_type),
+        config["page_size"],
+        config["checkpoint_dir"],
+        config["crawl_id"],
+        config["checkpoint_ttl_hours"],
+    )
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    bucket: TokenBucket,
+    start: int,
+    limit: int,
+    tv_type: str,
+    config: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    获取一页推荐数据；每次请求（包括重试）前都从令牌桶获取令牌
+
+    :return: json格式的响应数据
+    :raises CrawlError: 重试后仍然失败，或返回了不可重试的错误状态码
+    """
+    max_retries = config["max_retries"]
+    for attempt in range(max_retries + 1):
+        await bucket.acquire()
+        retry_after = None
+        try:
+            response = await client.get(
+                config["api_url"], params=build_params(start, limit, tv_type)
+            )
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRYABLE_STATUS:
+                raise CrawlError(
+                    f"[{tv_type_key(tv_type)}] 请求失败 (start={start})，状态码: {response.status_code}"
+                )
+            reason = f"状态码 {response.status_code}"
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        except (httpx.TransportError, ValueError) as e:
+            reason = str(e) or type(e).__name__
+
+        if attempt == max_retries:
+            raise CrawlError(
+                f"[{tv_type_key(tv_type)}] 请求失败 (start={start})，已重试 {max_retries} 次: {reason}"
+            )
+
+        delay = backoff_delay(
+            attempt, config["backoff_base"], config["backoff_cap"], retry_after
+        )
+        print(
+            f"[{tv_type_key(tv_type)}] 请求失败 (start={start}, {reason})，"
+            f"{delay:.1f} 秒后第 {attempt + 1} 次重试"
+        )
+        if retry_after is not None:
+            # 服务器要求等待：暂停共享的令牌桶，其他协程在等待结束前也不再发出请求
+            bucket.pause_until(time.monotonic() + delay)
+        await asyncio.sleep(delay)
+
+
+async def iter_tv_pages(
+    tv_type: str = "tv_american",
+    config: Optional[Dict[str, Any]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    bucket: Optional[TokenBucket] = None,
+    resume: bool = True,
+) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    并发获取所有分页的电视剧数据，按偏移量顺序逐页产出
+
+    先重放断点中已完成的页面，再从断点处继续请求。每一页在产出前写入断点；
+    调用方暂停迭代时不会发出新的请求（已发出的请求不超过并发数），即下游处理得慢时自动减速。
+    爬取结束后断点保留，由调用方在数据保存完成后清除。
+
+    :param tv_type: 电视剧类型，TV_TYPES 中的键或包含 region/category 的字典
+    :param config: 覆盖默认值的爬取配置
+    :param client: 可选的共享HTTP客户端，不提供则新建并在结束时关闭
+    :param bucket: 可选的共享令牌桶，不提供则按配置新建
+    :param resume: 是否从上次失败的断点继续
+    :return: (起始偏移量, 该页数据) 异步生成器
+    :raises CrawlError: 某一页重试后仍然失败（之前的页面已产出并保留在断点中）
+    """
+    cfg = {**CRAWL_CONFIG, **(config or {})}
+    limit = cfg["page_size"]
+    max_start = cfg["max_pages"] * limit
+    bucket = bucket or TokenBucket(cfg["requests_per_second"], cfg["burst"])
+
+    key = tv_type_key(tv_type)
+    checkpoint = open_checkpoint(tv_type, cfg)
+    resumed_start = resumed_count = 0
+    if resume:
+        for start, items in checkpoint.iter_pages():
+            yield start, items
+            resumed_start = start + limit
+            resumed_count += len(items)
+        if resumed_start:
+            print(f"[{key}] 从断点继续：已重放 {resumed_count} 条数据，从 start={resumed_start} 开始")
+
+    own_client = client is None
+    client = client or create_client(cfg)
+    pages: Dict[int, List[Dict[str, Any]]] = {}
+    in_flight: Dict[asyncio.Task, int] = {}
+    cancelled: List[asyncio.Task] = []
+    stop_at = max_start  # 第一个返回空数据的偏移量，之后的页面不再请求
+    next_start = resumed_start
+    contiguous = resumed_start  # 此偏移量之前的页面都已产出并写入断点
+
+    print(f"[{key}] 开始并发获取豆瓣热门{resolve_tv_type(tv_type).get('name', '电视剧')}数据 (并发={cfg['concurrency']})...")
+
+    try:
+        while True:
+            # 补足并发窗口
+            while len(in_flight) < cfg["concurrency"] and next_start < stop_at:
+                task = asyncio.ensure_future(
+                    fetch_page(client, bucket, next_start, limit, tv_type, cfg)
+                )
+                in_flight[task] = next_start
+                next_start += limit
+
+            if not in_flight:
+                break
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            error = None
+            for task in sorted(done, key=in_flight.get):
+                if task not in in_flight:
+                    continue  # 同一轮中已因超出末页被移除
+                start = in_flight.pop(task)
+                if task.exception() is not None:
+                    error = error or task.exception()
+                    continue
+                items = parse_tv_data(task.result())
+                if items:
+                    pages[start] = items
+                    print(f"[{key}] 已获取第 {start // limit + 1} 页，{len(items)} 条数据")
+                elif start < stop_at:
+                    print(f"[{key}] 第 {start // limit + 1} 页没有数据，停止翻页")
+                    stop_at = start
+                    # 取消已发出但超出末页的请求
+                    for pending, pending_start in list(in_flight.items()):
+                        if pending_start > stop_at:
+                            pending.cancel()
+                            cancelled.append(pending)
+                            del in_flight[pending]
+
+            # 按偏移量顺序把已连续完成的页面写入断点并产出
+            while contiguous < stop_at and contiguous in pages:
+                items = pages.pop(contiguous)
+                checkpoint.append(contiguous, items)
+                yield contiguous, items
+                contiguous += limit
+
+            if error is not None:
+                raise error
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, *cancelled, return_exceptions=True)
+        if own_client:
+            await client.aclose()
+
+
+async def crawl_tv_data(
+    tv_type: str = "tv_american",
+    config: Optional[Dict[str, Any]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    bucket: Optional[TokenBucket] = None,
+    resume: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    并发获取所有分页的电视剧数据
+
+    :param tv_type: 电视剧类型，TV_TYPES 中的键或包含 region/category 的字典
+    :param config: 覆盖默认值的爬取配置
+    :param client: 可选的共享HTTP客户端，不提供则新建并在结束时关闭
+    :param bucket: 可选的共享令牌桶，不提供则按配置新建
+    :param resume: 是否从上次失败的断点继续
+    :return: 按页顺序排列的电视剧数据列表
+    :raises CrawlError: 某一页重试后仍然失败（已连续完成的页面保留在断点中）
+    """
+    all_items: List[Dict[str, Any]] = []
+    async for _, items in iter_tv_pages(tv_type, config, client, bucket, resume):
+        all_items.extend(items)
+
+    cfg = {**CRAWL_CONFIG, **(config or {})}
+    open_checkpoint(tv_type, cfg).clear()
+    print(f"[{tv_type_key(tv_type)}] 共获取 {len(all_items)} 条数据")
+    return all_items
+
+
+if __name__ == "__main__":
+    data = asyncio.run(crawl_tv_data())
+    print(f"成功获取 {len(data)} 条电视剧数据")
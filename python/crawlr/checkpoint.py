@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+爬取断点：按页追加保存已成功解析的数据，爬取失败后可从最后一个成功的偏移量继续
+
+断点只在同一批次的爬取中有效：文件头记录批次标识（默认为当天日期，流水线中为快照id）和创建时间，
+批次不同或超过有效期的断点视为作废并删除，前一天失败留下的页面不会被重放进当天的快照。
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+# 断点文件默认目录
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), ".checkpoints")
+
+# 断点默认有效时间（小时）
+CHECKPOINT_TTL_HOURS = 24
+
+
+class CrawlCheckpoint:
+    def __init__(
+        self,
+        key: str,
+        page_size: int,
+        directory: str = CHECKPOINT_DIR,
+        crawl_id: Optional[str] = None,
+        ttl_hours: float = CHECKPOINT_TTL_HOURS,
+    ):
+        """
+        初始化断点
+
+        :param key: 断点标识（如电视剧类型），不同的爬取任务互不影响
+        :param page_size: 每页数量，与断点记录不一致时断点作废
+        :param directory: 断点文件目录
+        :param crawl_id: 爬取批次标识，与断点记录不一致时断点作废；不提供时为当天日期（UTC，与快照id的日期一致）
+        :param ttl_hours: 有效时间（小时），断点创建超过该时间后作废
+        """
+        self.key = key
+        self.page_size = page_size
+        self.path = os.path.join(directory, f"{key}.jsonl")
+        self.crawl_id = crawl_id or datetime.utcnow().strftime("%Y%m%d")
+        self.ttl = ttl_hours * 3600
+
+    def _stale_reason(self, header: Dict[str, Any]) -> Optional[str]:
+        """
+        检查断点文件头是否属于当前任务
+
+        :return: 作废原因，有效时返回None
+        """
+        if header.get("key") != self.key or header.get("page_size") != self.page_size:
+            return "与当前任务不匹配"
+        if header.get("crawl_id") != self.crawl_id:
+            return f"属于爬取批次 {header.get('crawl_id')}，当前批次为 {self.crawl_id}"
+        if time.time() - header.get("created_at", 0) > self.ttl:
+            return f"已超过有效期 {self.ttl / 3600:g} 小时"
+        return None
+
+    def iter_pages(self) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        按偏移量顺序逐页读取断点中连续完成的页面，不会一次读入全部数据
+
+        :return: (起始偏移量, 该页数据) 生成器；没有有效断点时不产生任何页面，作废的断点文件会被删除
+        """
+        if not os.path.exists(self.path):
+            return
+
+        next_start = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stale = self._stale_reason(json.loads(f.readline()))
+                if stale is None:
+                    for line in f:
+                        try:
+                            page = json.loads(line)
+                        except ValueError:
+                            break  # 写入中断导致的不完整行
+                        if page["start"] != next_start:
+                            break
+                        yield page["start"], page["items"]
+                        next_start += self.page_size
+        except (OSError, ValueError) as e:
+            print(f"读取断点失败，之后的页面将重新获取: {e}")
+            return
+
+        if stale is not None:
+            print(f"断点 {self.path} {stale}，已作废")
+            self.clear()
+
+    def load(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        读取断点
+
+        :return: (下一页的起始偏移量, 已获取的数据)；没有有效断点时返回 (0, [])
+        """
+        next_start = 0
+        items: List[Dict[str, Any]] = []
+        for start, page in self.iter_pages():
+            items.extend(page)
+            next_start = start + self.page_size
+
+        if next_start:
+            print(f"从断点继续：已有 {len(items)} 条数据，从 start={next_start} 开始")
+        return next_start, items
+
+    def append(self, start: int, items: List[Dict[str, Any]]) -> None:
+        """
+        追加一页数据（页面必须按偏移量连续追加）
+
+        :param start: 该页的起始偏移量
+        :param items: 该页解析后的数据
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        is_new = start == 0 or not os.path.exists(self.path)
+        with open(self.path, "w" if is_new else "a", encoding="utf-8") as f:
+            if is_new:
+                header = {
+                    "key": self.key,
+                    "page_size": self.page_size,
+                    "crawl_id": self.crawl_id,
+                    "created_at": time.time(),
+                }
+                f.write(json.dumps(header) + "\n")
+            f.write(json.dumps({"start": start, "items": items}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        """
+        爬取完成后删除断点
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
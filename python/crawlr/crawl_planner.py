@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多地区/多类型爬取计划
+
+计划中的地区/类型组合由爬取流水线（pipeline.crawl_to_mongo）并行爬取，所有组合共享同一个令牌桶和HTTP客户端。
+同一部剧可能出现在多个组合中，合并时按条目id（与保存快照相同的 item_subject_id）去重，
+并在 slices 字段中记录它来自哪些组合。
+"""
+
+import sys
+import os
+from typing import List, Dict, Any
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.mongodb.save_douban_hot import item_subject_id
+
+# 每日默认爬取的组合（TV_TYPES 中的键）
+DEFAULT_PLAN = [
+    "tv_american",
+    "tv_british",
+    "tv_domestic",
+    "tv_hongkong",
+    "tv_taiwan",
+    "tv_japanese",
+    "tv_korean",
+    "tv_animation",
+    "tv_documentary",
+]
+
+
+def merge_slices(results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    合并各组合的爬取结果，按条目id去重并记录来源
+
+    :param results: 以组合标识为键、该组合爬取结果为值的字典（按计划顺序）
+    :return: 去重后的电视剧数据列表，保持首次出现的顺序
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for key, items in results.items():
+        for item in items:
+            item_id = item_subject_id(item)
+            existing = merged.get(item_id)
+            if existing is None:
+                merged[item_id] = dict(item, slices=[key])
+            elif key not in existing["slices"]:
+                existing["slices"].append(key)
+    return list(merged.values())
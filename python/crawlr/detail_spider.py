@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+豆瓣电视剧详情爬虫（第二阶段）
+
+推荐接口只给出副标题中的少量信息，制片国家/地区、集数、完整演职员和评价人数需要逐部请求详情接口。
+详情请求与推荐接口一样受并发数和令牌桶限制，失败时按指数退避重试；
+每部剧的详情按条目id保存在本地磁盘缓存中，有效期内不会重复请求，
+因此每天爬取后只有新上榜的剧才会真正访问详情接口。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import List, Dict, Any, Optional, Iterable
+
+import httpx
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.crawlr.async_spider import create_client
+from python.crawlr.rate_limit import TokenBucket
+from python.crawlr.retry import (
+    RETRY_CONFIG,
+    RETRYABLE_STATUS,
+    CrawlError,
+    backoff_delay,
+    parse_retry_after,
+)
+
+# 详情接口地址
+DETAIL_URL = "https://m.douban.com/rexxar/api/v2/tv/{subject_id}"
+
+# 详情缓存默认目录
+DETAIL_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".detail_cache")
+
+# 详情爬取配置
+DETAIL_CONFIG = {
+    "detail_url": DETAIL_URL,  # 详情接口地址模板，测试时可指向本地假服务器
+    "concurrency": 4,  # 同时进行的请求数
+    "requests_per_second": 1.0,  # 每秒请求数预算
+    "burst": 1,  # 令牌桶容量（允许的突发请求数）
+    "cache_dir": DETAIL_CACHE_DIR,  # 详情缓存目录
+    "cache_ttl_days": 30,  # 详情缓存有效天数，过期后重新请求
+    "max_subjects": 0,  # 每次最多请求的条目数（按热度顺序），0表示不限
+    **RETRY_CONFIG,  # 重试次数、退避时间与超时
+}
+
+
+class DetailCache:
+    def __init__(self, directory: str = DETAIL_CACHE_DIR, ttl_days: float = 30):
+        """
+        按条目id保存详情的磁盘缓存，每部剧一个JSON文件
+
+        文件按条目id的末两位分到子目录，避免单个目录中文件过多
+
+        :param directory: 缓存目录
+        :param ttl_days: 有效天数
+        """
+        self.directory = directory
+        self.ttl = ttl_days * 86400
+
+    def path(self, subject_id: str) -> str:
+        return os.path.join(self.directory, subject_id[-2:], f"{subject_id}.json")
+
+    def get(self, subject_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的详情
+
+        :param subject_id: 豆瓣条目id
+        :return: parse_detail 格式的详情；没有缓存、缓存已过期或文件损坏时返回None
+        """
+        try:
+            with open(self.path(subject_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry.get("detail")
+
+    def put(self, subject_id: str, detail: Dict[str, Any]) -> None:
+        """
+        写入详情（先写临时文件再替换，写入中断不会留下不完整的缓存）
+
+        :param subject_id: 豆瓣条目id
+        :param detail: parse_detail 格式的详情
+        """
+        path = self.path(subject_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "detail": detail}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def parse_detail(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    从详情接口的响应中提取需要的字段
+
+    :param data: json格式的详情数据
+    :return: {countries, episodes, directors, actors, rating_count} 字典，缺失的数值字段为None
+    """
+    episodes = data.get("episodes_count")
+    rating = data.get("rating") or {}
+    return {
+        "countries": [c for c in data.get("countries") or [] if c],
+        "episodes": int(episodes) if str(episodes or "").isdigit() else None,
+        "directors": [d["name"] for d in data.get("directors") or [] if d.get("name")],
+        "actors": [a["name"] for a in data.get("actors") or [] if a.get("name")],
+        "rating_count": rating.get("count"),
+    }
+
+
+async def fetch_detail(
+    client: httpx.AsyncClient,
+    bucket: TokenBucket,
+    subject_id: str,
+    config: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """
+    获取一部剧的详情；每次请求（包括重试）前都从令牌桶获取令牌
+
+    :return: json格式的详情数据；条目不存在（404）时返回None
+    :raises CrawlError: 重试后仍然失败，或返回了不可重试的错误状态码
+    """
+    url = config["detail_url"].format(subject_id=subject_id)
+    max_retries = config["max_retries"]
+    for attempt in range(max_retries + 1):
+        await bucket.acquire()
+        retry_after = None
+        try:
+            response = await client.get(url)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 404:
+                return None
+            if response.status_code not in RETRYABLE_STATUS:
+                raise CrawlError(f"[详情 {subject_id}] 请求失败，状态码: {response.status_code}")
+            reason = f"状态码 {response.status_code}"
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        except (httpx.TransportError, ValueError) as e:
+            reason = str(e) or type(e).__name__
+
+        if attempt == max_retries:
+            raise CrawlError(f"[详情 {subject_id}] 请求失败，已重试 {max_retries} 次: {reason}")
+
+        delay = backoff_delay(
+            attempt, config["backoff_base"], config["backoff_cap"], retry_after
+        )
+        print(f"[详情 {subject_id}] 请求失败 ({reason})，{delay:.1f} 秒后第 {attempt + 1} 次重试")
+        if retry_after is not None:
+            # 服务器要求等待：暂停共享的令牌桶，其他协程在等待结束前也不再发出请求
+            bucket.pause_until(time.monotonic() + delay)
+        await asyncio.sleep(delay)
+
+
+async def crawl_details(
+    subject_ids: Iterable[str],
+    config: Optional[Dict[str, Any]] = None,
+    cache: Optional[DetailCache] = None,
+) -> Dict[str, Any]:
+    """
+    获取一批电视剧的详情，缓存中已有的直接使用，其余的并发请求并写入缓存
+
+    单部剧失败不会中断其他请求，下次运行时会重新请求失败的条目
+
+    :param subject_ids: 豆瓣条目id（按热度顺序）
+    :param config: 覆盖默认值的详情爬取配置
+    :param cache: 可选的详情缓存，不提供则按配置新建
+    :return: {"details": {条目id: 详情}, "cached": 缓存命中数, "fetched": 请求成功数, "missing": 条目不存在数, "failed": 失败数}
+    """
+    cfg = {**DETAIL_CONFIG, **(config or {})}
+    cache = cache or DetailCache(cfg["cache_dir"], cfg["cache_ttl_days"])
+    result: Dict[str, Any] = {"details": {}, "cached": 0, "fetched": 0, "missing": 0, "failed": 0}
+
+    pending: List[str] = []
+    for subject_id in subject_ids:
+        detail = cache.get(subject_id)
+        if detail is not None:
+            result["details"][subject_id] = detail
+            result["cached"] += 1
+        else:
+            pending.append(subject_id)
+    if cfg["max_subjects"]:
+        pending = pending[: cfg["max_subjects"]]
+    if not pending:
+        print(f"[详情] {result['cached']} 部剧的详情均已缓存，无需请求")
+        return result
+
+    print(
+        f"[详情] 已缓存 {result['cached']} 部，开始请求 {len(pending)} 部剧的详情 (并发={cfg['concurrency']})..."
+    )
+    bucket = TokenBucket(cfg["requests_per_second"], cfg["burst"])
+    queue: asyncio.Queue = asyncio.Queue()
+    for subject_id in pending:
+        queue.put_nowait(subject_id)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while not queue.empty():
+            subject_id = queue.get_nowait()
+            try:
+                data = await fetch_detail(client, bucket, subject_id, cfg)
+            except CrawlError as e:
+                print(e)
+                result["failed"] += 1
+                continue
+            if data is None:
+                result["missing"] += 1
+                continue
+            detail = parse_detail(data)
+            cache.put(subject_id, detail)
+            result["details"][subject_id] = detail
+            result["fetched"] += 1
+            if result["fetched"] % 100 == 0:
+                print(f"[详情] 已获取 {result['fetched']} 部")
+
+    async with create_client(cfg) as client:
+        await asyncio.gather(*(worker(client) for _ in range(cfg["concurrency"])))
+
+    print(
+        f"[详情] 完成：缓存 {result['cached']} 部，新获取 {result['fetched']} 部，"
+        f"不存在 {result['missing']} 部，失败 {result['failed']} 部"
+    )
+    return result
+
+
+def enrich_snapshot(saver, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, int]]:
+    """
+    为最新快照中的电视剧补充详情并写回电视剧集合
+
+    :param saver: 已连接的 DoubanToMongoDB
+    :param config: 覆盖默认值的详情爬取配置
+    :return: 包含 cached/fetched/missing/failed/updated 条数的字典；没有可补充的快照时返回None
+    """
+    header = saver.get_previous_snapshot()
+    if header is None:
+        print("没有可补充详情的快照")
+        return None
+
+    # 缺少豆瓣条目id的剧以详情页URL或标题作为标识，没有可请求的详情
+    subject_ids = [subject_id for subject_id in saver.list_subject_ids(header["_id"]) if subject_id.isdigit()]
+    result = asyncio.run(crawl_details(subject_ids, config))
+    details = result.pop("details")
+    result["updated"] = saver.apply_details(header["_id"], details)
+    return result
+
+
+def main(config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, int]]:
+    """
+    为最新快照补充详情，完成后重新计算统计数据（地区分布依赖详情中的制片国家/地区）
+    """
+    # 导入MongoDB模块（放在函数内避免循环导入问题）
+    from python.mongodb.save_douban_hot import CONFIG as MONGO_CONFIG, DoubanToMongoDB
+
+    saver = DoubanToMongoDB(MONGO_CONFIG)
+    if not saver.connect():
+        return None
+    try:
+        result = enrich_snapshot(saver, config)
+        if result is not None:
+            print(f"已更新 {result['updated']} 部剧的详情")
+            saver.save_stats()
+        return result
+    finally:
+        saver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="为最新快照补充豆瓣电视剧详情")
+    parser.add_argument("--max-subjects", type=int, default=0, help="最多请求的条目数，0表示不限")
+    args = parser.parse_args()
+    main({"max_subjects": args.max_subjects})
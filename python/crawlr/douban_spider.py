@@ -1,65 +1,233 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import requests
+import argparse
+import asyncio
+import json
 import sys
 import os
+import re
 
 # 添加项目根目录到系统路径，以便导入MongoDB模块
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
+from python.crawlr.retry import CrawlError
+
+
+# 豆瓣电视剧推荐接口
+API_URL = "https://m.douban.com/rexxar/api/v2/tv/recommend"
+
+# 设置请求头，模拟浏览器行为
+HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Encoding": "gzip, deflate, br, zstd",
+    "Accept-Language": "zh-CN,zh;q=0.8,zh-TW;q=0.7,zh-HK;q=0.5,en-US;q=0.3,en;q=0.2",
+    "Connection": "keep-alive",
+    "Origin": "https://movie.douban.com",
+    "Referer": "https://movie.douban.com/tv/",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site",
+    "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:139.0) Gecko/20100101 Firefox/139.0",
+}
+
+
+# 可爬取的电视剧分类：地区/类型组合，键即 tv_type
+TV_TYPES = {
+    "tv_american": {"name": "欧美剧", "region": "欧美", "category": ""},
+    "tv_domestic": {"name": "国产剧", "region": "中国大陆", "category": ""},
+    "tv_hongkong": {"name": "港剧", "region": "中国香港", "category": ""},
+    "tv_taiwan": {"name": "台剧", "region": "中国台湾", "category": ""},
+    "tv_japanese": {"name": "日剧", "region": "日本", "category": ""},
+    "tv_korean": {"name": "韩剧", "region": "韩国", "category": ""},
+    "tv_british": {"name": "英剧", "region": "英国", "category": ""},
+    "tv_animation": {"name": "动画", "region": "", "category": "动画"},
+    "tv_documentary": {"name": "纪录片", "region": "", "category": "纪录片"},
+}
+
+
+def resolve_tv_type(tv_type):
+    """
+    获取电视剧分类的地区/类型定义
+
+    参数：
+        tv_type: TV_TYPES 中的键，或包含 region/category 的字典
+
+    返回：
+        分类定义字典
+    """
+    if isinstance(tv_type, dict):
+        return tv_type
+    if tv_type not in TV_TYPES:
+        raise ValueError(f"未知的电视剧类型: {tv_type}")
+    return TV_TYPES[tv_type]
+
+
+def tv_type_key(tv_type):
+    """
+    获取电视剧分类的标识（用于断点文件名和来源记录）
+
+    参数：
+        tv_type: TV_TYPES 中的键，或包含 region/category 的字典
+
+    返回：
+        分类标识字符串
+    """
+    if isinstance(tv_type, dict):
+        return tv_type.get("key") or "_".join(
+            tv_type.get(key) or "all" for key in ("region", "category")
+        )
+    return tv_type
 
-def get_douban_hot_tv(start=0, limit=20, tv_type="tv_american"):
+
+def build_params(start=0, limit=20, tv_type="tv_american"):
     """
-    获取豆瓣热门电视剧数据
+    构建推荐接口的查询参数
 
     参数：
         start: 起始位置
         limit: 返回数量
-        tv_type: 电视剧类型，如tv_american（美剧）
+        tv_type: 电视剧类型，如tv_american（美剧），见 TV_TYPES
 
     返回：
-        json格式的响应数据
+        查询参数字典
     """
-    # 构建URL
-    url = "https://m.douban.com/rexxar/api/v2/tv/recommend"
-    params = {
+    definition = resolve_tv_type(tv_type)
+    selected = {}
+    if definition.get("category"):
+        selected["类型"] = definition["category"]
+    if definition.get("region"):
+        selected["地区"] = definition["region"]
+    tags = [definition[key] for key in ("category", "region") if definition.get(key)]
+
+    return {
         "refresh": 0,
         "start": start,
         "count": limit,
-        "selected_categories": '{"地区":"欧美"}',
+        "selected_categories": json.dumps(selected, ensure_ascii=False, separators=(",", ":")),
         "uncollect": False,
         "score_range": "0,10",
-        "tags": "欧美",
+        "tags": ",".join(tags),
     }
 
-    # 设置请求头，模拟浏览器行为
-    headers = {
-        "Accept": "application/json, text/plain, */*",
-        "Accept-Encoding": "gzip, deflate, br, zstd",
-        "Accept-Language": "zh-CN,zh;q=0.8,zh-TW;q=0.7,zh-HK;q=0.5,en-US;q=0.3,en;q=0.2",
-        "Connection": "keep-alive",
-        "Host": "m.douban.com",
-        "Origin": "https://movie.douban.com",
-        "Referer": "https://movie.douban.com/tv/",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-site",
-        "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:139.0) Gecko/20100101 Firefox/139.0",
-    }
 
-    try:
-        # 发送请求
-        response = requests.get(url, params=params, headers=headers)
+# 副标题第一部分的年份（如 "2024"、"2024(中国大陆)"）
+_YEAR_PATTERN = re.compile(r"(\d{4})\b")
+# 是否包含拉丁字母
+_LATIN_LETTER = re.compile(r"[A-Za-zÀ-ɏ]")
+
+# 拉丁字母书写的人名：名 [姓氏前缀...] 姓 [后缀]，如 "Matt Duffer"、"Guillermo del Toro"、"Robert Downey Jr."；
+# 其余按空格切分（中文译名以 "·" 连接，本身不含空格）
+_LATIN_WORD = r"[A-Za-zÀ-ɏ][A-Za-zÀ-ɏ.'\-]*"
+_NAME_PREFIX = r"(?:de|del|della|der|di|da|das|do|dos|du|la|le|van|von|bin|al|St\.)"
+_NAME_SUFFIX = r"(?:Jr\.?|Sr\.?|II|III|IV)"
+_NAME_PATTERN = re.compile(
+    rf"{_LATIN_WORD}(?: {_NAME_PREFIX})* (?!{_NAME_SUFFIX}(?:\s|$)){_LATIN_WORD}(?: {_NAME_SUFFIX}(?=\s|$))?|\S+"
+)
+
+# 豆瓣常用的影视类型，只在副标题缺少部分、按位置无法确定时用来判断哪一部分是类型
+GENRES = frozenset(
+    "剧情 喜剧 动作 爱情 科幻 动画 悬疑 惊悚 恐怖 犯罪 同性 音乐 歌舞 传记 历史 战争 西部 奇幻 冒险 "
+    "灾难 武侠 情色 纪录片 短片 真人秀 脱口秀 家庭 儿童 古装 运动 黑色电影 戏曲 鬼怪".split()
+)
+
+# 年份之后的各部分依次为：0 国家或地区  1 类型  2 导演  3 演员
+_FIELDS = ("countries", "genres", "directors", "actors")
+# 少于四个部分时可能的对应关系，按优先顺序排列（先认为缺少演员，其次缺少类型、国家或地区）
+_LAYOUTS = {
+    1: ((0,), (1,), (2,)),
+    2: ((0, 1), (0, 2), (1, 2), (2, 3)),
+    3: ((0, 1, 2), (0, 2, 3), (1, 2, 3)),
+}
+
+
+def split_names(part):
+    """
+    将副标题中的导演或演员部分切分为人名列表
 
-        # 检查响应状态
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"请求失败，状态码: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"发生错误: {str(e)}")
+    不含拉丁字母时直接按空格切分；否则用预编译的人名正则合并拉丁字母书写的多词人名，
+    例如 "Matt Duffer Ross Duffer" 得到两个人名，"古天乐 Guillermo del Toro" 得到 "古天乐" 和 "Guillermo del Toro"。
+
+    参数：
+        part: 导演或演员部分的字符串
+
+    返回：
+        人名列表
+    """
+    if _LATIN_LETTER.search(part) is None:
+        return part.split()
+    return _NAME_PATTERN.findall(part)
+
+
+def _layout_score(layout, parts):
+    """
+    缺少部分时给一种对应关系打分：类型词只用来区分类型和人名，带 "·" 或拉丁字母的部分像人名，
+    有多个名字的部分像演员
+    """
+    score = 0
+    for field, part in zip(layout, parts):
+        tokens = part.split()
+        has_genre = not GENRES.isdisjoint(tokens)
+        if field == 1:
+            score += 2 if has_genre else 0
+        elif field >= 2:
+            if has_genre:
+                score -= 2
+            elif "·" in part or _LATIN_LETTER.search(part):
+                score += 1
+            if field == 3 and len(tokens) > 1:
+                score += 1
+    return score
+
+
+def parse_subtitle(subtitle):
+    """
+    解析推荐接口的副标题 "年份 / 国家或地区 / 类型 / 导演 / 演员"
+
+    按 "/" 切分（容忍不规范的空格），第一部分以四位数字开头时为年份。其余部分按位置对应：
+    四个部分齐全时依次为国家或地区、类型、导演、演员（类型不在 GENRES 中也按位置取值）；
+    缺少部分时在几种可能的对应关系中按类型词和人名特征选分数最高的一种，分数相同时按 _LAYOUTS 中的顺序。
+
+    参数：
+        subtitle: 副标题字符串
+
+    返回：
+        {year, countries, genres, directors, actors} 字典，年份为整数，未知时为None
+    """
+    fields = {"year": None, "countries": [], "genres": [], "directors": [], "actors": []}
+    parts = [part.strip() for part in (subtitle or "").split("/")]
+    parts = [part for part in parts if part]
+    if parts:
+        match = _YEAR_PATTERN.match(parts[0])
+        if match:
+            fields["year"] = int(match.group(1))
+            parts = parts[1:]
+    if not parts:
+        return fields
+
+    if len(parts) >= 4:
+        layout = (0, 1, 2) + (3,) * (len(parts) - 3)
+    else:
+        layout = max(_LAYOUTS[len(parts)], key=lambda candidate: _layout_score(candidate, parts))
+    for field, part in zip(layout, parts):
+        fields[_FIELDS[field]].extend(split_names(part) if field >= 2 else part.split())
+    return fields
+
+
+def parse_rating_value(rating):
+    """
+    获取推荐接口中的评分数值
+
+    参数：
+        rating: 条目的 rating 字段（暂无评分的条目没有该字段或为null）
+
+    返回：
+        评分（浮点数），暂无评分时为None
+    """
+    value = rating.get("value") if isinstance(rating, dict) else None
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
         return None
 
 
@@ -71,120 +239,85 @@ def parse_tv_data(data):
         data: API返回的原始数据
 
     返回：
-        处理后的电视剧信息列表
+        处理后的电视剧信息列表；年份为整数、评分为浮点数，未知时均为None，
+        country 为第一个国家或地区（地区统计使用）
     """
-    if not data or "items" not in data:
+    if not data or not data.get("items"):
         return []
 
     result = []
-
     for item in data["items"]:
-        # 从card_subtitle解析更多信息（包含年份、国家、类型等）
-        subtitle = item.get("card_subtitle", "")
-        subtitle_parts = subtitle.split(" / ") if subtitle else []
-
-        # 提取年份
-        year_part = subtitle_parts[0] if len(subtitle_parts) > 0 else ""
-        year = year_part.split(" ")[0] if year_part else "未知"
-
-        # 提取类型
-        genres = subtitle_parts[1].split(" ") if len(subtitle_parts) > 1 else []
-
-        # 提取导演和演员
-        directors_actors = subtitle_parts[2:] if len(subtitle_parts) > 2 else []
-        director_names = []
-        actor_names = []
-
-        if len(directors_actors) >= 1:
-            director_part = directors_actors[0].split(" ")
-            director_names = director_part[1:] if len(director_part) > 1 else []
-
-        if len(directors_actors) >= 2:
-            actor_part = directors_actors[1].split(" ")
-            actor_names = actor_part
-
-        # 提取图片链接
-        pic_large = item.get("pic", {}).get("large", "") if item.get("pic") else ""
-
-        # 构建详情链接
-        item_id = item.get("id", "")
-        detail_url = f"https://movie.douban.com/subject/{item_id}/" if item_id else ""
-
-        tv_info = {
-            "title": item.get("title", "未知"),
-            "rating": item.get("rating", {}).get("value", "暂无评分"),
-            "year": year,
-            "genres": genres,
-            "directors": director_names,
-            "actors": actor_names,
-            "intro": subtitle,
-            "image": pic_large,
-            "detail_url": detail_url,
-            "id": item_id,
-        }
-        result.append(tv_info)
+        subtitle = item.get("card_subtitle") or ""
+        fields = parse_subtitle(subtitle)
+        item_id = item.get("id") or ""
+        pic = item.get("pic") or {}
+
+        result.append(
+            {
+                "title": item.get("title") or "未知",
+                "rating": parse_rating_value(item.get("rating")),
+                "year": fields["year"],
+                "country": fields["countries"][0] if fields["countries"] else "",
+                "countries": fields["countries"],
+                "genres": fields["genres"],
+                "directors": fields["directors"],
+                "actors": fields["actors"],
+                "intro": subtitle,
+                "image": pic.get("large", ""),
+                "detail_url": f"https://movie.douban.com/subject/{item_id}/" if item_id else "",
+                "id": item_id,
+            }
+        )
 
     return result
 
 
-def get_all_tv_data():
+def get_all_tv_data(tv_type="tv_american", resume=True):
     """
-    获取所有分页的电视剧数据
-    """
-    all_items = []
-    start = 0
-    limit = 20  # 每次获取20条数据
-    tv_type = "tv_american"  # 美剧类型
-
-    print("开始获取所有豆瓣热门美剧数据...")
-
-    while True:
-        print(f"正在获取第 {start//limit + 1} 页数据...")
-        raw_data = get_douban_hot_tv(start, limit, tv_type)
-
-        if not raw_data or "items" not in raw_data or not raw_data["items"]:
-            print("没有更多数据了")
-            break
-
-        # 解析当前页数据
-        current_page_items = parse_tv_data(raw_data)
-        if not current_page_items:
-            print(f"第 {start//limit + 1} 页没有有效数据")
-            break
+    获取所有分页的电视剧数据（同步调用并发爬虫 async_spider.crawl_tv_data）
 
-        # 添加到总数据中
-        all_items.extend(current_page_items)
-        print(f"已获取 {len(current_page_items)} 条数据，总计 {len(all_items)} 条")
-
-        # 准备获取下一页
-        start += limit
+    参数：
+        tv_type: 电视剧类型
+        resume: 是否从上次失败的断点继续
 
-        # 添加延时，避免请求过于频繁
-        import time
+    返回：
+        按页顺序排列的电视剧数据列表
 
-        time.sleep(1)
+    异常：
+        CrawlError: 某一页在重试后仍然失败（已获取的数据保留在断点中）
+    """
+    # 放在函数内避免循环导入（async_spider 依赖本模块）
+    from python.crawlr.async_spider import crawl_tv_data
 
-    return all_items
+    return asyncio.run(crawl_tv_data(tv_type, resume=resume))
 
 
-def main():
+def main(incremental=False, enrich=False):
     """
     主函数，执行数据获取和处理并保存到MongoDB
+
+    参数：
+        incremental: 是否增量爬取（各组合连续若干页与上一个快照相同时停止翻页，其余条目沿用上一个快照）
+        enrich: 是否在快照完成后补充详情（制片国家/地区、集数、完整演职员、评价人数）
     """
     try:
         # 导入MongoDB模块（放在函数内避免循环导入问题）
-        from python.mongodb.save_douban_hot import save_to_mongo
+        from python.crawlr.pipeline import crawl_to_mongo
 
-        # 获取所有数据
-        all_tv_data = get_all_tv_data()
+        # 并行爬取各地区/类型组合（共享令牌桶控制请求速率），按条目id去重，边爬边分批写入MongoDB
+        counts = crawl_to_mongo(config={"incremental": incremental, "enrich_details": enrich})
 
-        if all_tv_data:
-            # 保存到MongoDB数据库
-            saved_count = save_to_mongo(all_tv_data)
-            print(f"成功获取并处理 {len(all_tv_data)} 条美剧数据")
-            print(f"成功保存 {saved_count} 条记录到MongoDB数据库")
+        if counts is None:
+            print("获取数据失败：无法连接MongoDB")
         else:
-            print("获取数据失败")
+            total = counts["inserted"] + counts["updated"] + counts["reranked"] + counts["unchanged"]
+            print(f"成功获取并处理 {total} 条电视剧数据")
+            print(
+                f"MongoDB保存结果：新增 {counts['inserted']} 条，更新 {counts['updated']} 条，"
+                f"仅名次变化 {counts['reranked']} 条，未变化 {counts['unchanged']} 条，删除 {counts['deleted']} 条"
+            )
+    except CrawlError as e:
+        print(f"爬取失败，已获取的数据已写入MongoDB并保存在断点中，重新运行将从断点继续: {e}")
     except ImportError:
         print("错误：未能导入MongoDB模块，请确保项目结构正确")
     except Exception as e:
@@ -192,4 +325,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="爬取豆瓣热门电视剧并保存到MongoDB")
+    parser.add_argument(
+        "--incremental", action="store_true", help="增量爬取：翻到与上一个快照相同的页面后停止"
+    )
+    parser.add_argument(
+        "--enrich", action="store_true", help="快照完成后补充详情（只请求详情缓存中没有的剧）"
+    )
+    args = parser.parse_args()
+    main(incremental=args.incremental, enrich=args.enrich)
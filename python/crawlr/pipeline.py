@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+边爬边写的流水线：获取并解析 → 合并去重 → 分批 → 批量写入MongoDB
+
+各阶段之间是有界队列：写入跟不上时批次队列写满，合并阶段暂停取页，
+页面队列随之写满，获取阶段便不再发出新请求。内存中只保留队列里的少量页面和已见过的条目id，
+与爬取总量无关；每一批写入后即已持久化，爬取中途失败时已写入的数据不会丢失，
+重新运行时已完成的页面从断点重放，未变化的条目不会重复写入。
+
+合并阶段按计划顺序依次消费各组合的页面（与 merge_slices 的结果顺序相同，名次因此保持稳定）；
+各组合仍然并行获取，但受页面队列长度限制，只会提前获取有限的页数。
+整体请求速率本来就由共享令牌桶决定，这样做不会降低吞吐量。
+
+增量模式下，每一页都按条目id和指纹与上一个快照对比，某个组合连续若干页都没有变化时停止翻页，
+该组合其余的条目按上一个快照中的名次顺序原样沿用。距上一次全量爬取超过一定天数时自动改为全量爬取。
+
+开启详情补充时，快照完成后再由详情爬虫（detail_spider）为其中的电视剧补充制片国家/地区、集数等详情。
+"""
+
+import asyncio
+import itertools
+import sys
+import os
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable, Iterator
+
+# 添加项目根目录到系统路径，以便导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.crawlr.async_spider import CRAWL_CONFIG, create_client, iter_tv_pages, open_checkpoint
+from python.crawlr.crawl_planner import DEFAULT_PLAN
+from python.crawlr.detail_spider import enrich_snapshot
+from python.crawlr.douban_spider import tv_type_key
+from python.crawlr.rate_limit import TokenBucket
+from python.crawlr.retry import CrawlError
+from python.mongodb.save_douban_hot import item_fingerprint, item_subject_id
+
+# 流水线配置
+PIPELINE_CONFIG = {
+    "page_queue_size": 4,  # 每个组合已获取但尚未合并的页数上限
+    "batch_queue_size": 2,  # 等待写入的批次数上限
+    "batch_size": 500,  # 每批写入的条数
+    "incremental": False,  # 是否增量爬取
+    "unchanged_pages_to_stop": 3,  # 增量爬取时某个组合连续多少页没有变化后停止翻页
+    "full_crawl_interval_days": 7,  # 距上一次全量爬取超过该天数时改为全量爬取
+    "enrich_details": False,  # 快照完成后是否补充详情（只请求详情缓存中没有的剧）
+}
+
+# 队列结束标记：_DONE 表示组合已爬取到末页，_CARRY 表示增量爬取提前停止，其余条目沿用上一个快照
+_DONE = object()
+_CARRY = object()
+
+
+def page_unchanged(items: List[Dict[str, Any]], baseline: Dict[str, str]) -> bool:
+    """
+    判断一页数据是否与上一个快照完全相同（每部剧都已存在且评分、副标题、封面都未变化）
+
+    :param items: 该页解析后的数据
+    :param baseline: 上一个快照中以条目id为键、指纹为值的字典
+    :return: 是否没有变化
+    """
+    return all(baseline.get(item_subject_id(item)) == item_fingerprint(item) for item in items)
+
+
+def load_baseline(saver, config: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, str]]]:
+    """
+    获取增量爬取的对比基准
+
+    :param saver: 已连接的 DoubanToMongoDB 实例
+    :param config: 爬取与流水线配置
+    :return: (上一个快照id, 指纹字典)；未开启增量模式或需要全量爬取时返回None
+    """
+    if not config["incremental"]:
+        return None
+    previous = saver.get_previous_snapshot()
+    if previous is None:
+        print("没有可对比的快照，执行全量爬取")
+        return None
+    last_full = saver.get_previous_snapshot(crawl_mode="full")
+    interval = timedelta(days=config["full_crawl_interval_days"])
+    if last_full is None or datetime.utcnow() - last_full["created_at"] >= interval:
+        print(f"距上一次全量爬取已超过 {config['full_crawl_interval_days']} 天，执行全量爬取")
+        return None
+    print(f"增量爬取：与快照 {previous['_id']} 对比")
+    return previous["_id"], saver.load_fingerprints(previous["_id"])
+
+
+async def produce_pages(
+    tv_type: Union[str, Dict[str, str]],
+    queue: asyncio.Queue,
+    config: Dict[str, Any],
+    client,
+    bucket: TokenBucket,
+    baseline: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    获取阶段：按页顺序把一个组合的页面放入队列，队列已满时暂停获取
+
+    结束时放入结束标记（增量爬取提前停止时为 _CARRY）；失败时放入异常，由合并阶段记录
+
+    :param baseline: 增量爬取时上一个快照的指纹字典，None表示全量爬取
+    """
+    pages = iter_tv_pages(tv_type, config, client, bucket)
+    unchanged = 0
+    try:
+        async for start, items in pages:
+            await queue.put(items)
+            if baseline is None:
+                continue
+            unchanged = unchanged + 1 if page_unchanged(items, baseline) else 0
+            if unchanged >= config["unchanged_pages_to_stop"]:
+                print(
+                    f"[{tv_type_key(tv_type)}] 连续 {unchanged} 页没有变化，"
+                    f"在第 {start // config['page_size'] + 1} 页停止，其余条目沿用上一个快照"
+                )
+                await queue.put(_CARRY)
+                return
+    except Exception as e:
+        await queue.put(e)
+        return
+    finally:
+        await pages.aclose()
+    await queue.put(_DONE)
+
+
+async def merge_pages(
+    keys: List[str],
+    queues: List[asyncio.Queue],
+    batch_queue: asyncio.Queue,
+    batch_size: int,
+    carry_forward: Optional[Callable[[str], Iterator[Dict[str, Any]]]] = None,
+) -> List[str]:
+    """
+    合并阶段：按计划顺序消费各组合的页面，按条目id去重并记录来源，攒够一批后放入批次队列
+
+    同一部剧再次出现时：如果所在批次尚未写入，直接追加到它的 slices；
+    否则作为 (条目id, 组合标识) 随下一批提交，写入阶段对已写入的文档追加来源。
+    某个组合增量爬取提前停止时，从 carry_forward 逐批读取该组合在上一个快照中的条目，接在已爬取的页面之后。
+
+    :param carry_forward: 以组合标识为参数，返回上一个快照中该组合全部文档（按名次排序）的函数
+    :return: 爬取失败的组合及原因列表
+    """
+    loop = asyncio.get_running_loop()
+    slices_by_id: Dict[Any, List[str]] = {}
+    pending_ids = set()
+    batch: List[Dict[str, Any]] = []
+    additions: List[Tuple[Any, str]] = []
+    failures: List[str] = []
+
+    async def flush() -> None:
+        nonlocal batch, additions
+        if batch or additions:
+            # 交给写入线程的文档使用独立的 slices 副本，之后追加来源不影响正在写入的批次
+            for doc in batch:
+                doc["slices"] = list(doc["slices"])
+            await batch_queue.put((batch, additions))
+            batch, additions = [], []
+            pending_ids.clear()
+
+    async def add_page(page: List[Dict[str, Any]], key: str) -> None:
+        for item in page:
+            item_id = item_subject_id(item)
+            slices = slices_by_id.get(item_id)
+            if slices is None:
+                slices_by_id[item_id] = [key]
+                batch.append(dict(item, slices=slices_by_id[item_id]))
+                pending_ids.add(item_id)
+            elif key not in slices:
+                slices.append(key)
+                if item_id not in pending_ids:
+                    additions.append((item_id, key))
+        if len(batch) >= batch_size:
+            await flush()
+
+    carried = 0
+    for key, queue in zip(keys, queues):
+        while True:
+            page = await queue.get()
+            if page is _DONE:
+                break
+            if isinstance(page, Exception):
+                failures.append(f"{key}: {page}")
+                break
+            if page is _CARRY:
+                # 游标在线程池中逐批读取，不阻塞事件循环
+                cursor = await loop.run_in_executor(None, carry_forward, key)
+                while True:
+                    chunk = await loop.run_in_executor(
+                        None, lambda: list(itertools.islice(cursor, batch_size))
+                    )
+                    if not chunk:
+                        break
+                    before = len(slices_by_id)
+                    await add_page(chunk, key)
+                    carried += len(slices_by_id) - before
+                break
+            await add_page(page, key)
+    await flush()
+
+    print(f"合并完成：去重后 {len(slices_by_id)} 条" + (f"，其中沿用上一个快照 {carried} 条" if carried else ""))
+    return failures
+
+
+async def write_batches(writer, batch_queue: asyncio.Queue) -> int:
+    """
+    写入阶段：在线程池中逐批写入MongoDB（pymongo为同步驱动，不阻塞事件循环）
+
+    :return: 写入的批次数
+    """
+    loop = asyncio.get_running_loop()
+    written = 0
+    while True:
+        batch = await batch_queue.get()
+        if batch is _DONE:
+            return written
+        items, additions = batch
+        await loop.run_in_executor(None, writer.write_batch, items, additions)
+        written += 1
+        print(f"已写入第 {written} 批，{len(items)} 条")
+
+
+async def run_pipeline(
+    saver,
+    plan: Optional[List[Union[str, Dict[str, str]]]] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, int]:
+    """
+    执行爬取计划，边爬边写入当天的快照
+
+    :param saver: 已连接的 DoubanToMongoDB 实例
+    :param plan: 地区/类型组合列表，元素为 TV_TYPES 中的键或包含 region/category 的字典
+    :param config: 覆盖默认值的爬取与流水线配置
+    :return: 包含 inserted/updated/reranked/unchanged/deleted 条数的字典
+    :raises CrawlError: 有组合爬取失败（其他组合的数据已写入，快照保持未完成状态，重新运行时从断点继续）
+    """
+    plan = plan or DEFAULT_PLAN
+    cfg = {**CRAWL_CONFIG, **PIPELINE_CONFIG, **(config or {})}
+    keys = [tv_type_key(tv_type) for tv_type in plan]
+    bucket = TokenBucket(cfg["requests_per_second"], cfg["burst"])
+    client = create_client(dict(cfg, concurrency=cfg["concurrency"] * len(plan)))
+    loop = asyncio.get_running_loop()
+    baseline = await loop.run_in_executor(None, load_baseline, saver, cfg)
+    fingerprints = baseline[1] if baseline else None
+    writer = await loop.run_in_executor(
+        None, saver.begin_snapshot, "incremental" if baseline else "full"
+    )
+    # 断点只在写入同一个快照时有效，前一天失败留下的断点不会被重放进今天的快照
+    cfg["crawl_id"] = writer.snapshot_id
+
+    page_queues = [asyncio.Queue(maxsize=cfg["page_queue_size"]) for _ in plan]
+    batch_queue: asyncio.Queue = asyncio.Queue(maxsize=cfg["batch_queue_size"])
+    print(f"开始执行爬取流水线：{len(plan)} 个组合，共享速率 {cfg['requests_per_second']} 次/秒")
+
+    producers = [
+        asyncio.ensure_future(produce_pages(tv_type, queue, cfg, client, bucket, fingerprints))
+        for tv_type, queue in zip(plan, page_queues)
+    ]
+    consumer = asyncio.ensure_future(write_batches(writer, batch_queue))
+    try:
+        merge = asyncio.ensure_future(
+            merge_pages(
+                keys,
+                page_queues,
+                batch_queue,
+                cfg["batch_size"],
+                (lambda key: saver.iter_slice_items(baseline[0], key)) if baseline else None,
+            )
+        )
+        # 写入失败时立即停止合并，不再等待
+        done, _ = await asyncio.wait({merge, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        if consumer in done:
+            merge.cancel()
+            consumer.result()
+        failures = await merge
+        await batch_queue.put(_DONE)
+        await consumer
+    finally:
+        for task in producers + [consumer]:
+            task.cancel()
+        await asyncio.gather(*producers, consumer, return_exceptions=True)
+        await client.aclose()
+
+    if failures:
+        raise CrawlError("以下组合爬取失败：" + "; ".join(failures))
+
+    counts = await loop.run_in_executor(None, writer.finish)
+    # 快照已完整写入，断点不再需要
+    for tv_type in plan:
+        open_checkpoint(tv_type, cfg).clear()
+    return counts
+
+
+def crawl_to_mongo(
+    plan: Optional[List[Union[str, Dict[str, str]]]] = None,
+    config: Optional[Dict[str, Any]] = None,
+    mongo_config: Optional[Dict[str, Any]] = None,
+    detail_config: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, int]]:
+    """
+    连接MongoDB并执行边爬边写的流水线，按配置补充详情，最后预先计算统计数据
+
+    :param plan: 地区/类型组合列表
+    :param config: 覆盖默认值的爬取与流水线配置
+    :param mongo_config: 可选的MongoDB配置，不提供则使用默认配置
+    :param detail_config: 覆盖 DETAIL_CONFIG 默认值的详情爬取配置（与推荐接口的并发数、速率和重试配置互不影响）
+    :return: 包含 inserted/updated/reranked/unchanged/deleted 条数的字典；无法连接MongoDB时返回None
+    :raises CrawlError: 有组合爬取失败
+    """
+    # 导入MongoDB模块（放在函数内避免循环导入问题）
+    from python.mongodb.save_douban_hot import CONFIG as MONGO_CONFIG, DoubanToMongoDB
+
+    saver = DoubanToMongoDB(mongo_config or MONGO_CONFIG)
+    if not saver.connect():
+        return None
+    try:
+        saver.create_indexes()
+        counts = asyncio.run(run_pipeline(saver, plan, config))
+
+        if {**PIPELINE_CONFIG, **(config or {})}["enrich_details"]:
+            try:
+                enriched = enrich_snapshot(saver, detail_config)
+                if enriched is not None:
+                    print(f"已更新 {enriched['updated']} 部剧的详情")
+            except Exception as e:
+                print(f"补充详情时出错（已获取的详情保存在缓存中，下次运行时继续）: {e}")
+
+        # 保存后预先计算统计数据，接口只需读取一条文档
+        try:
+            saver.save_stats()
+        except Exception as e:
+            print(f"计算统计数据时出错（接口将改为实时计算）: {e}")
+        return counts
+    finally:
+        saver.close()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+爬虫请求速率限制
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        令牌桶：平均每秒放行 rate 个请求，最多允许 capacity 个请求的突发
+
+        :param rate: 每秒生成的令牌数（即每秒请求数预算）
+        :param capacity: 桶容量，不提供时为1，即请求严格按 1/rate 秒的间隔放行
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else 1.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        # 暂停期间 _updated 位于将来，暂停结束前不生成令牌
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def pause_until(self, deadline: float) -> None:
+        """
+        在 deadline 之前不再放行任何请求（服务器返回 Retry-After 时，共享令牌桶的所有协程一起等待），
+        暂停结束后从空桶开始按速率放行
+
+        :param deadline: 暂停结束的时间（time.monotonic() 的时间）
+        """
+        self._refill()
+        if deadline > self._updated:
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = deadline
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        获取令牌，令牌不足时等待；多个协程按调用顺序依次获得令牌
+
+        :param tokens: 需要的令牌数
+        """
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                paused = max(0.0, self._updated - time.monotonic())
+                await asyncio.sleep(paused + (tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
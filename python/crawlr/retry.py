@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+爬虫请求的重试策略：指数退避 + 随机抖动，并遵循服务器返回的 Retry-After
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# 重试配置
+RETRY_CONFIG = {
+    "max_retries": 5,  # 最大重试次数
+    "backoff_base": 1.0,  # 退避基数（秒），第n次重试前最多等待 base * 2^n 秒
+    "backoff_cap": 60.0,  # 单次退避的最长等待时间（秒）
+    "connect_timeout": 5,  # 建立连接超时（秒）
+    "read_timeout": 15,  # 读取响应超时（秒）
+}
+
+# 值得重试的状态码：限流与服务端临时错误
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CrawlError(Exception):
+    """
+    请求在重试后仍然失败（区别于"没有更多数据"）
+    """
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    :param value: 响应头的值，可以是秒数或HTTP日期
+    :return: 需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = RETRY_CONFIG["backoff_base"],
+    cap: float = RETRY_CONFIG["backoff_cap"],
+    retry_after: Optional[float] = None,
+) -> float:
+    """
+    计算第 attempt 次重试前的等待时间（全抖动指数退避）
+
+    :param attempt: 已失败的次数，从0开始
+    :param base: 退避基数（秒）
+    :param cap: 单次等待上限（秒）
+    :param retry_after: 服务器要求的最短等待时间（秒）
+    :return: 等待秒数
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+豆瓣热门电视剧数据的异步查询层
+
+pymongo是同步驱动，直接在 async 接口中调用会阻塞事件循环，使并发请求串行化。
+本模块将 DoubanMongoDBQuery 的每个方法放到专用线程池中执行，对外提供相同的方法（均为协程）。
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import MongoClient
+from typing import List, Dict, Any, Optional, Callable, Iterable
+
+from python.mongodb.select_douban_hot import DoubanMongoDBQuery, query_mongo
+from python.mongodb.snapshot_cache import Snapshot
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(config: Dict[str, Any]) -> ThreadPoolExecutor:
+    """
+    获取执行MongoDB查询的进程级线程池，线程数与连接池大小一致
+
+    :param config: 配置字典，包含连接池大小
+    :return: 线程池
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.get("max_pool_size", 50),
+                thread_name_prefix="mongo-query",
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """
+    关闭查询线程池
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+class AsyncDoubanMongoDBQuery:
+    def __init__(self, query: DoubanMongoDBQuery, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        包装同步查询实例
+
+        :param query: 已连接的同步查询实例
+        :param executor: 执行查询的线程池，不提供则使用进程级线程池
+        """
+        self.query = query
+        self.executor = executor or get_executor(query.config)
+
+    async def _run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def get_snapshot(self) -> Optional[Snapshot]:
+        return await self._run(self.query.get_snapshot)
+
+    async def get_version(self) -> Optional[str]:
+        return await self._run(self.query.get_version)
+
+    async def get_header(self, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        return await self._run(self.query.get_header, *args, **kwargs)
+
+    async def list_snapshots(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await self._run(self.query.list_snapshots, *args, **kwargs)
+
+    async def get_latest_data(self) -> List[Dict[str, Any]]:
+        return await self._run(self.query.get_latest_data)
+
+    async def filter_tv(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await self._run(self.query.filter_tv, *args, **kwargs)
+
+    async def page_tv(self, *args, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.query.page_tv, *args, **kwargs)
+
+    async def find_tv(self, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        return await self._run(self.query.find_tv, *args, **kwargs)
+
+    async def search_tv(self, *args, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.query.search_tv, *args, **kwargs)
+
+    async def aggregate_stats(self) -> Optional[Dict[str, Dict[str, int]]]:
+        return await self._run(self.query.aggregate_stats)
+
+    async def get_all_stats(self) -> Dict[str, Dict[str, int]]:
+        return await self._run(self.query.get_all_stats)
+
+    async def get_top(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await self._run(self.query.get_top, *args, **kwargs)
+
+    async def get_rate_stats(self) -> Dict[str, int]:
+        return await self._run(self.query.get_rate_stats)
+
+    async def get_category_stats(self) -> Dict[str, int]:
+        return await self._run(self.query.get_category_stats)
+
+    async def get_area_stats(self) -> Dict[str, int]:
+        return await self._run(self.query.get_area_stats)
+
+    async def get_year_stats(self) -> Dict[str, int]:
+        return await self._run(self.query.get_year_stats)
+
+    async def get_tv_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.query.get_tv_by_url, url)
+
+    async def get_tv_by_id(self, tv_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.query.get_tv_by_id, tv_id)
+
+    async def get_tv_history(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await self._run(self.query.get_tv_history, *args, **kwargs)
+
+    async def get_movers(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await self._run(self.query.get_movers, *args, **kwargs)
+
+    def iter_snapshot_items(self, *args, **kwargs) -> Iterable[Dict[str, Any]]:
+        # 返回同步生成器，由 StreamingResponse 在线程池中逐批迭代，不阻塞事件循环
+        return self.query.iter_snapshot_items(*args, **kwargs)
+
+    def iter_history(self, *args, **kwargs) -> Iterable[Dict[str, Any]]:
+        return self.query.iter_history(*args, **kwargs)
+
+    def close(self) -> None:
+        """
+        关闭底层查询实例（共享客户端由连接池统一关闭）
+        """
+        self.query.close()
+
+
+def async_query_mongo(
+    config: Dict[str, str] = None, client: Optional[MongoClient] = None
+) -> Optional[AsyncDoubanMongoDBQuery]:
+    """
+    创建异步MongoDB查询实例的便捷函数
+
+    :param config: 可选的配置信息，不提供则使用默认配置
+    :param client: 可选的共享MongoClient
+    :return: 异步查询实例，连接失败时返回None
+    """
+    db_handler = query_mongo(config, client)
+    if db_handler is None:
+        return None
+    return AsyncDoubanMongoDBQuery(db_handler)
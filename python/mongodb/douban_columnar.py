@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+快照的紧凑列式表示（需要 NumPy）
+
+每个字段保存为一列：评分、年份、集数和评价人数为数值数组（缺失的集数和评价人数记为-1），类型、地区编码为整数并共用一份词表，
+其余字符串经过驻留后保存在列表中。过滤、排序和统计都是对整列的向量化运算（标题关键词通过二元组倒排列表查找候选行），
+只有当前页实际返回的条目才会还原为字典。
+对外提供与 SnapshotIndex 相同的 filter/page/positions 接口，并可像列表一样按下标取出条目。
+"""
+
+import sys
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Union
+
+import numpy as np
+
+from python.mongodb.douban_stats import RATE_BUCKETS
+from python.mongodb.douban_index import normalize_detail_url, subject_id_from_url, title_grams
+
+# 评分区间的分界（与 rate_bucket 一致：低于5分为"0-5"，9分及以上为"9-10"）
+RATE_EDGES = np.array([5, 6, 7, 8, 9], dtype=np.float64)
+NO_POSITIONS = np.empty(0, dtype=np.int32)
+
+
+class Vocabulary:
+    def __init__(self):
+        """
+        字符串词表：按首次出现的顺序为每个不同的值分配整数编码
+        """
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(sys.intern(value))
+        return code
+
+
+class ColumnarLookup:
+    def __init__(self, table: "ColumnarSnapshot"):
+        """
+        按条目id和规范化URL查找条目位置的哈希索引，查到后才还原为字典
+
+        :param table: 列式快照
+        """
+        self.table = table
+        self.positions: Dict[str, int] = {}
+        for pos in range(table.size):
+            tv_id = table.ids[pos] or subject_id_from_url(table.urls[pos])
+            if tv_id:
+                self.positions.setdefault(str(tv_id), pos)
+            if table.urls[pos]:
+                self.positions.setdefault(normalize_detail_url(table.urls[pos]), pos)
+
+    def get(self, key: str, default: Any = None) -> Optional[Dict[str, Any]]:
+        pos = self.positions.get(key)
+        return default if pos is None else self.table.row(pos)
+
+
+class ColumnarSnapshot:
+    def __init__(self, tv_list: Iterable[Dict[str, Any]]):
+        """
+        将电视剧数据转换为列式存储（可传入生成器，转换过程中不保留原始字典）
+
+        :param tv_list: reshape_item 格式的电视剧数据
+        """
+        intern = sys.intern
+        self.categories = Vocabulary()
+        self.areas = Vocabulary()
+        self.update_times = Vocabulary()
+
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.covers: List[str] = []
+        self.descriptions: List[str] = []
+        self.directors: List[Tuple[str, ...]] = []
+        self.actors: List[Tuple[str, ...]] = []
+        self.slices: List[Tuple[str, ...]] = []
+        rates: List[float] = []
+        years: List[int] = []
+        episodes: List[int] = []
+        rating_counts: List[int] = []
+        area_codes: List[int] = []
+        update_codes: List[int] = []
+        category_codes: List[int] = []
+        category_counts: List[int] = []
+
+        for tv in tv_list:
+            self.ids.append(intern(tv["id"]))
+            self.titles.append(tv["title"])
+            self.urls.append(tv["url"])
+            self.covers.append(tv["cover"])
+            self.descriptions.append(tv["description"])
+            self.directors.append(tuple(intern(name) for name in tv["directors"]))
+            self.actors.append(tuple(intern(name) for name in tv["actors"]))
+            self.slices.append(tuple(intern(name) for name in tv["slices"]))
+            rates.append(tv["rate"])
+            years.append(tv["year"])
+            episodes.append(-1 if tv["episodes"] is None else tv["episodes"])
+            rating_counts.append(-1 if tv["rating_count"] is None else tv["rating_count"])
+            area_codes.append(self.areas.encode(tv["area"]))
+            update_codes.append(self.update_times.encode(tv["update_time"]))
+            category_codes.extend(self.categories.encode(c) for c in tv["category"])
+            category_counts.append(len(tv["category"]))
+
+        self.size = len(self.ids)
+        self.rates = np.array(rates, dtype=np.float64)
+        self.years = np.array(years, dtype=np.int32)
+        self.episodes = np.array(episodes, dtype=np.int32)
+        self.rating_counts = np.array(rating_counts, dtype=np.int64)
+        self.area_codes = np.array(area_codes, dtype=np.int32)
+        self.update_codes = np.array(update_codes, dtype=np.int32)
+        # 类型为多值字段：category_codes 依次保存每部剧的类型编码，category_rows 为对应的行号
+        counts = np.array(category_counts, dtype=np.int64)
+        self.category_codes = np.array(category_codes, dtype=np.int32)
+        self.category_rows = np.repeat(np.arange(self.size, dtype=np.int32), counts)
+        self.category_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.titles_lower = [title.lower() for title in self.titles]
+        # 标题的一元组、二元组倒排列表（与 SnapshotIndex 相同），每个列表为升序的行号数组
+        by_gram: Dict[str, List[int]] = {}
+        for pos, title in enumerate(self.titles_lower):
+            for gram in title_grams(title):
+                by_gram.setdefault(gram, []).append(pos)
+        self.by_gram = {gram: np.array(positions, dtype=np.int32) for gram, positions in by_gram.items()}
+
+        # 预先计算各字段的升降序排列（稳定排序，与 SnapshotIndex 的结果一致）及每个位置的名次
+        _, title_ranks = np.unique(np.array(self.titles, dtype=object), return_inverse=True)
+        sort_keys = {
+            "rate": self.rates,
+            "year": self.years.astype(np.int64),
+            "title": title_ranks.astype(np.int64).reshape(-1),
+        }
+        self.natural_order = np.arange(self.size, dtype=np.int64)
+        self.orderings: Dict[Tuple[str, bool], np.ndarray] = {}
+        self.ranks: Dict[Tuple[str, bool], np.ndarray] = {}
+        for field, values in sort_keys.items():
+            for reverse in (False, True):
+                order = np.argsort(-values if reverse else values, kind="stable")
+                rank = np.empty(self.size, dtype=np.int64)
+                rank[order] = self.natural_order
+                self.orderings[(field, reverse)] = order
+                self.ranks[(field, reverse)] = rank
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        return (self.row(pos) for pos in range(self.size))
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(key, slice):
+            return [self.row(pos) for pos in range(*key.indices(self.size))]
+        return self.row(key)
+
+    def row(self, pos: int) -> Dict[str, Any]:
+        """
+        将一行还原为 reshape_item 格式的字典
+
+        :param pos: 行号
+        :return: 电视剧数据
+        """
+        start, end = self.category_offsets.item(pos), self.category_offsets.item(pos + 1)
+        categories = self.categories.values
+        episodes = self.episodes.item(pos)
+        rating_count = self.rating_counts.item(pos)
+        return {
+            "id": self.ids[pos],
+            "title": self.titles[pos],
+            "url": self.urls[pos],
+            "cover": self.covers[pos],
+            "rate": self.rates.item(pos),
+            "description": self.descriptions[pos],
+            "category": [categories[c] for c in self.category_codes[start:end].tolist()],
+            "area": self.areas.values[self.area_codes.item(pos)],
+            "directors": list(self.directors[pos]),
+            "actors": list(self.actors[pos]),
+            "slices": list(self.slices[pos]),
+            "year": self.years.item(pos),
+            "episodes": None if episodes < 0 else episodes,
+            "rating_count": None if rating_count < 0 else rating_count,
+            "update_time": self.update_times.values[self.update_codes.item(pos)],
+        }
+
+    def match_keyword(self, keyword: str) -> np.ndarray:
+        """
+        查找标题包含关键词（忽略大小写）的电视剧，语义与 SnapshotIndex.match_keyword 一致
+
+        :param keyword: 标题关键词
+        :return: 升序排列的匹配行号数组
+        """
+        keyword = keyword.lower()
+        if len(keyword) <= 2:
+            return self.by_gram.get(keyword, NO_POSITIONS)
+
+        # 候选集为关键词所有二元组倒排列表的交集，再做子串校验排除误匹配
+        postings = []
+        for i in range(len(keyword) - 1):
+            posting = self.by_gram.get(keyword[i : i + 2])
+            if posting is None:
+                return NO_POSITIONS
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        titles = self.titles_lower
+        return candidates[
+            np.fromiter((keyword in titles[pos] for pos in candidates.tolist()), dtype=bool, count=len(candidates))
+        ]
+
+    def filter(
+        self,
+        keyword: Optional[str] = None,
+        category: Optional[str] = None,
+        area: Optional[str] = None,
+        year: Optional[int] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        组合各过滤条件，语义与 SnapshotIndex.filter 一致
+
+        :return: 按原始顺序排列的匹配行号数组；没有任何过滤条件时返回None，表示全部匹配
+        """
+        masks = []
+        if category:
+            mask = np.zeros(self.size, dtype=bool)
+            code = self.categories.codes.get(category)
+            if code is not None:
+                mask[self.category_rows[self.category_codes == code]] = True
+            masks.append(mask)
+        if area:
+            code = self.areas.codes.get(area)
+            masks.append(self.area_codes == code if code is not None else np.zeros(self.size, dtype=bool))
+        if year:
+            masks.append(self.years == year)
+        if min_rate is not None:
+            masks.append(self.rates >= min_rate)
+        if max_rate is not None:
+            masks.append(self.rates <= max_rate)
+        if keyword:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self.match_keyword(keyword)] = True
+            masks.append(mask)
+
+        if not masks:
+            return None
+        return np.flatnonzero(np.logical_and.reduce(masks))
+
+    def page(
+        self,
+        matched: Optional[np.ndarray],
+        sort_by: str,
+        reverse: bool,
+        offset: int,
+        limit: int,
+        after: int = -1,
+    ) -> Tuple[List[int], int]:
+        """
+        按预先计算的排列取出一页匹配结果
+
+        :param matched: filter() 的返回值
+        :param sort_by: 排序字段（rate/year/title），其他值保持原始顺序
+        :param reverse: 是否降序
+        :param offset: 跳过的匹配条数
+        :param limit: 每页数量
+        :param after: 只返回名次大于该值的条目（游标分页）
+        :return: (当前页位置列表, 最后一条的名次)
+        """
+        order = self.orderings.get((sort_by, reverse), self.natural_order)
+        start = after + 1
+        candidates = order[start:]
+        if matched is None:
+            chosen = np.arange(offset, min(offset + limit, len(candidates)))
+        else:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[matched] = True
+            chosen = np.flatnonzero(mask[candidates])[offset : offset + limit]
+        if len(chosen) == 0:
+            return [], after
+        return candidates[chosen].tolist(), int(start + chosen[-1])
+
+    def positions(self, matched: Optional[np.ndarray]) -> Iterable[int]:
+        """
+        按原始顺序返回匹配位置
+        """
+        return range(self.size) if matched is None else matched.tolist()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        向量化计算评分、类型、地区和年份分布，结果与 compute_stats 一致
+
+        :return: 包含 rate/category/area/year 四个统计字典的字典
+        """
+        rate_counts = np.bincount(
+            np.searchsorted(RATE_EDGES, self.rates, side="right"), minlength=len(RATE_BUCKETS)
+        )
+        category_counts = np.bincount(self.category_codes, minlength=len(self.categories.values))
+        area_counts = np.bincount(self.area_codes, minlength=len(self.areas.values))
+        years, year_counts = np.unique(self.years[self.years > 0], return_counts=True)
+        return {
+            "rate": {bucket: int(count) for bucket, count in zip(RATE_BUCKETS, rate_counts)},
+            "category": {
+                name: int(count) for name, count in zip(self.categories.values, category_counts) if count
+            },
+            "area": {name: int(count) for name, count in zip(self.areas.values, area_counts) if count},
+            "year": {str(year): int(count) for year, count in zip(years, year_counts)},
+        }
+
+    def build_lookup(self) -> ColumnarLookup:
+        """
+        构建按条目id和规范化URL查找条目的索引
+        """
+        return ColumnarLookup(self)
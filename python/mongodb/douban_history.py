@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+豆瓣热门电视剧的评分与排名历史
+
+每部剧每个月一条分桶文档，_id 为 "条目id:年月"，当月每天的评分和排名记录在 points 中，
+键为日期（两位数字）。同一天重复保存只会覆盖当天的键，写入是幂等的。
+查询某部剧的走势只需按条目id读取几条分桶；查询一段时间内的变化最大的剧只需读取窗口覆盖的几个月的分桶，
+都不需要加载历史快照。
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, UpdateOne
+from typing import List, Dict, Any, Optional, Iterable
+
+# 添加项目根目录到系统路径，以便直接运行本模块时也能导入项目内模块
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.mongodb.douban_stats import parse_rate
+
+
+def history_bucket_id(subject_id: str, day: datetime) -> str:
+    """
+    获取某部剧某一天所在的分桶id
+
+    :param subject_id: 豆瓣条目id
+    :param day: 日期
+    :return: 分桶id，如 "1234567:2024-05"
+    """
+    return f"{subject_id}:{day.strftime('%Y-%m')}"
+
+
+def build_history_operations(
+    docs: Iterable[Dict[str, Any]], removed: Iterable[str], day: datetime
+) -> List[UpdateOne]:
+    """
+    生成写入某一天历史数据的批量操作
+
+    :param docs: 当天新增或变化的电视剧文档（包含 subject_id、title、rating、rank）
+    :param removed: 当天已从榜单中移除的条目id，删除它们当天的记录
+    :param day: 快照日期
+    :return: UpdateOne 操作列表
+    """
+    key = f"points.{day.strftime('%d')}"
+    month = day.strftime("%Y-%m")
+    operations = []
+    for doc in docs:
+        operations.append(
+            UpdateOne(
+                {"_id": history_bucket_id(doc["subject_id"], day)},
+                {
+                    "$set": {
+                        key: {"rating": doc.get("rating"), "rank": doc.get("rank")},
+                        "title": doc.get("title", ""),
+                    },
+                    "$setOnInsert": {"subject_id": doc["subject_id"], "month": month},
+                },
+                upsert=True,
+            )
+        )
+    for subject_id in removed:
+        operations.append(
+            UpdateOne({"_id": history_bucket_id(subject_id, day)}, {"$unset": {key: ""}})
+        )
+    return operations
+
+
+def create_history_indexes(collection) -> None:
+    """
+    创建历史集合的索引
+
+    :param collection: 历史集合
+    """
+    # 查询一部剧的走势
+    collection.create_index(
+        [("subject_id", ASCENDING), ("month", ASCENDING)], name="subject_month_index"
+    )
+    # 查询一段时间内所有剧的变化
+    collection.create_index([("month", ASCENDING)], name="month_index")
+
+
+def _months_between(start: datetime, end: datetime) -> List[str]:
+    """
+    获取 [start, end] 覆盖的全部年月
+    """
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _iter_points(bucket: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    """
+    按日期顺序展开一条分桶中的记录
+    """
+    for day in sorted(bucket.get("points", {})):
+        point = bucket["points"][day]
+        yield {
+            "date": f"{bucket['month']}-{day}",
+            "rating": point.get("rating"),
+            "rank": point.get("rank"),
+        }
+
+
+def get_trajectory(
+    collection, subject_id: str, days: Optional[int] = None, end: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    获取某部剧的评分与排名走势
+
+    :param collection: 历史集合
+    :param subject_id: 豆瓣条目id
+    :param days: 只返回最近多少天，None表示全部
+    :param end: 窗口结束日期，默认今天
+    :return: 按日期升序排列的 [{date, rating, rank}] 列表
+    """
+    query: Dict[str, Any] = {"subject_id": str(subject_id)}
+    start_date = None
+    if days:
+        end = end or datetime.utcnow()
+        start = end - timedelta(days=days - 1)
+        query["month"] = {"$gte": start.strftime("%Y-%m")}
+        start_date = start.strftime("%Y-%m-%d")
+
+    points = []
+    for bucket in collection.find(query).sort("month", ASCENDING):
+        for point in _iter_points(bucket):
+            if start_date is None or point["date"] >= start_date:
+                points.append(point)
+    return points
+
+
+def get_movers(
+    collection, end: datetime, days: int = 7, by: str = "rating", limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    获取一段时间内评分或排名变化最大的剧
+
+    对窗口内至少有两天记录的剧，比较其窗口内第一天和最后一天的值
+
+    :param collection: 历史集合
+    :param end: 窗口结束日期（通常为最新快照日期）
+    :param days: 窗口天数
+    :param by: 比较的指标，rating 为评分变化，rank 为排名上升的名次（负数表示下降）
+    :param limit: 返回数量
+    :return: 按变化幅度降序排列的 [{id, title, from, to, change, first_date, last_date}] 列表
+    """
+    start = end - timedelta(days=days - 1)
+    start_date, end_date = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+    series: Dict[str, Dict[str, Any]] = {}
+    cursor = collection.find({"month": {"$in": _months_between(start, end)}}).sort(
+        [("subject_id", ASCENDING), ("month", ASCENDING)]
+    )
+    for bucket in cursor:
+        entry = series.setdefault(bucket["subject_id"], {"title": "", "points": []})
+        entry["title"] = bucket.get("title") or entry["title"]
+        for point in _iter_points(bucket):
+            if start_date <= point["date"] <= end_date and point[by] is not None:
+                entry["points"].append(point)
+
+    movers = []
+    for subject_id, entry in series.items():
+        points = entry["points"]
+        if len(points) < 2:
+            continue
+        first, last = points[0], points[-1]
+        if by == "rank":
+            # 名次数字变小表示排名上升
+            change = first["rank"] - last["rank"]
+        else:
+            change = round(parse_rate(last["rating"]) - parse_rate(first["rating"]), 2)
+        if change == 0:
+            continue
+        movers.append(
+            {
+                "id": subject_id,
+                "title": entry["title"],
+                "from": first[by],
+                "to": last[by],
+                "change": change,
+                "first_date": first["date"],
+                "last_date": last["date"],
+            }
+        )
+
+    movers.sort(key=lambda m: abs(m["change"]), reverse=True)
+    return movers[:limit]
+
+
+def iter_history_rows(
+    collection,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> Iterable[Dict[str, Any]]:
+    """
+    逐条展开历史集合中的全部记录（用于导出），游标按批读取，内存占用与历史总量无关
+
+    :param collection: 历史集合
+    :param start: 起始日期，None表示不限
+    :param end: 结束日期，None表示不限
+    :param batch_size: 游标每批读取的分桶数
+    :return: 按条目id、日期升序排列的 {id, title, date, rating, rank} 生成器
+    """
+    query: Dict[str, Any] = {}
+    if start or end:
+        query["month"] = {}
+        if start:
+            query["month"]["$gte"] = start.strftime("%Y-%m")
+        if end:
+            query["month"]["$lte"] = end.strftime("%Y-%m")
+    start_date = start.strftime("%Y-%m-%d") if start else None
+    end_date = end.strftime("%Y-%m-%d") if end else None
+
+    cursor = (
+        collection.find(query)
+        .sort([("subject_id", ASCENDING), ("month", ASCENDING)])
+        .batch_size(batch_size)
+    )
+    for bucket in cursor:
+        for point in _iter_points(bucket):
+            if (start_date and point["date"] < start_date) or (end_date and point["date"] > end_date):
+                continue
+            yield {"id": bucket["subject_id"], "title": bucket.get("title", ""), **point}
+
+
+def backfill_history(db, config: Dict[str, Any]) -> int:
+    """
+    从已保存的历史快照回填历史集合（包括旧版内嵌 items 的快照）
+
+    :param db: MongoDB数据库
+    :param config: 配置字典，包含快照头、电视剧和历史集合名
+    :return: 回填的快照数
+    """
+    from python.mongodb.save_douban_hot import build_item_document
+
+    headers = db[config["collection_name"]]
+    items = db[config["items_collection_name"]]
+    history = db[config["history_collection_name"]]
+    create_history_indexes(history)
+
+    count = 0
+    for header in headers.find(projection={"_id": 1, "created_at": 1}).sort("created_at", ASCENDING):
+        record = headers.find_one({"_id": header["_id"]})
+        if "items" in record:
+            docs = [
+                build_item_document(item, record["_id"], record["created_at"], rank)
+                for rank, item in enumerate(record["items"])
+            ]
+        else:
+            docs = items.find(
+                {"snapshot_id": record["_id"]},
+                projection={"subject_id": 1, "title": 1, "rating": 1, "rank": 1},
+            )
+        operations = build_history_operations(docs, [], record["created_at"])
+        if operations:
+            history.bulk_write(operations, ordered=False)
+        count += 1
+        print(f"已回填快照 {record['_id']}，{len(operations)} 部剧")
+    return count
+
+
+if __name__ == "__main__":
+    from python.mongodb.save_douban_hot import CONFIG
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description="豆瓣热门电视剧历史数据")
+    parser.add_argument("--backfill", action="store_true", help="从已保存的快照回填历史集合")
+    args = parser.parse_args()
+
+    if args.backfill:
+        client = MongoClient(CONFIG["mongodb_uri"])
+        try:
+            print(f"共回填 {backfill_history(client[CONFIG['db_name']], CONFIG)} 个快照")
+        finally:
+            client.close()
+    else:
+        parser.print_help()
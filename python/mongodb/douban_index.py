@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于快照构建的二级索引，用于热门电视剧列表的过滤、排序和分页
+
+每个快照只构建一次：类型/地区/年份使用倒排索引，评分使用有序数组配合二分查找，
+标题关键词使用字符一元/二元组索引筛选候选后再精确校验。各过滤条件通过集合求交组合。
+评分、年份、标题的升降序排列也预先计算好，分页时只需取出当前页所需的条目。
+"""
+
+import base64
+import heapq
+import json
+import re
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Optional, Set, Iterable, Tuple
+
+from python.mongodb.douban_stats import parse_rate
+
+# 从豆瓣详情页URL中提取条目id
+SUBJECT_URL_PATTERN = re.compile(r"/subject/(\d+)")
+
+
+def subject_id_from_url(url: str) -> str:
+    """
+    从豆瓣详情页URL中提取条目id
+
+    :param url: 详情页URL，如 https://movie.douban.com/subject/1234567/
+    :return: 条目id，无法识别时返回空字符串
+    """
+    match = SUBJECT_URL_PATTERN.search(url or "")
+    return match.group(1) if match else ""
+
+
+def normalize_detail_url(url: str) -> str:
+    """
+    规范化详情页URL（忽略协议、大小写、查询参数和末尾斜杠的差异）
+
+    :param url: 详情页URL
+    :return: 规范化后的URL
+    """
+    url = (url or "").strip().split("#", 1)[0].split("?", 1)[0]
+    url = re.sub(r"^https?://", "", url, flags=re.IGNORECASE)
+    return url.lower().rstrip("/")
+
+
+def build_lookup(tv_list: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    构建按条目id和规范化URL查找电视剧的哈希索引
+
+    :param tv_list: 电视剧数据列表
+    :return: 以条目id和规范化URL为键的字典
+    """
+    lookup: Dict[str, Dict[str, Any]] = {}
+    for tv in tv_list:
+        tv_id = tv.get("id") or subject_id_from_url(tv["url"])
+        if tv_id:
+            lookup.setdefault(str(tv_id), tv)
+        if tv["url"]:
+            lookup.setdefault(normalize_detail_url(tv["url"]), tv)
+    return lookup
+
+
+def title_grams(text: str) -> Set[str]:
+    """
+    获取文本的全部字符一元组和二元组
+    """
+    grams = set(text)
+    grams.update(text[i : i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class SnapshotIndex:
+    def __init__(self, tv_list: List[Dict[str, Any]]):
+        """
+        为电视剧数据列表构建索引
+
+        :param tv_list: 电视剧数据列表，索引中的位置即列表下标
+        """
+        self.size = len(tv_list)
+        self.titles: List[str] = []
+        self.rates: List[float] = []
+        self.by_category: Dict[str, Set[int]] = {}
+        self.by_area: Dict[str, Set[int]] = {}
+        self.by_year: Dict[int, Set[int]] = {}
+        self.by_gram: Dict[str, Set[int]] = {}
+
+        rated = []
+        for pos, tv in enumerate(tv_list):
+            for category in tv["category"]:
+                self.by_category.setdefault(category, set()).add(pos)
+            self.by_area.setdefault(tv["area"], set()).add(pos)
+            self.by_year.setdefault(tv["year"], set()).add(pos)
+
+            title = tv["title"].lower()
+            self.titles.append(title)
+            for gram in title_grams(title):
+                self.by_gram.setdefault(gram, set()).add(pos)
+
+            rate = parse_rate(tv["rate"])
+            self.rates.append(rate)
+            rated.append((rate, pos))
+
+        rated.sort()
+        self.sorted_rates = [rate for rate, _ in rated]
+        self.rate_positions = [pos for _, pos in rated]
+
+        # 预先计算各字段的升降序排列（排序稳定，与逐次排序结果一致）及每个位置的名次
+        sort_keys = {
+            "rate": self.rates,
+            "year": [tv["year"] for tv in tv_list],
+            "title": [tv["title"] for tv in tv_list],
+        }
+        self.natural_order = list(range(self.size))
+        self.orderings: Dict[Tuple[str, bool], List[int]] = {}
+        self.ranks: Dict[Tuple[str, bool], List[int]] = {}
+        for field, values in sort_keys.items():
+            for reverse in (False, True):
+                order = sorted(self.natural_order, key=values.__getitem__, reverse=reverse)
+                rank = [0] * self.size
+                for r, pos in enumerate(order):
+                    rank[pos] = r
+                self.orderings[(field, reverse)] = order
+                self.ranks[(field, reverse)] = rank
+
+    def match_keyword(self, keyword: str) -> Set[int]:
+        """
+        查找标题包含关键词（忽略大小写）的电视剧
+
+        :param keyword: 标题关键词
+        :return: 匹配位置集合
+        """
+        keyword = keyword.lower()
+        if len(keyword) <= 2:
+            return set(self.by_gram.get(keyword, ()))
+
+        # 候选集为关键词所有二元组倒排列表的交集，再做子串校验排除误匹配
+        postings = []
+        for i in range(len(keyword) - 1):
+            posting = self.by_gram.get(keyword[i : i + 2])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {pos for pos in candidates if keyword in self.titles[pos]}
+
+    def match_rate(
+        self, min_rate: Optional[float] = None, max_rate: Optional[float] = None
+    ) -> Set[int]:
+        """
+        查找评分在闭区间 [min_rate, max_rate] 内的电视剧
+
+        :param min_rate: 最低评分
+        :param max_rate: 最高评分
+        :return: 匹配位置集合
+        """
+        lo = 0 if min_rate is None else bisect_left(self.sorted_rates, min_rate)
+        hi = self.size if max_rate is None else bisect_right(self.sorted_rates, max_rate)
+        return set(self.rate_positions[lo:hi]) if lo < hi else set()
+
+    def filter(
+        self,
+        keyword: Optional[str] = None,
+        category: Optional[str] = None,
+        area: Optional[str] = None,
+        year: Optional[int] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+    ) -> Optional[Set[int]]:
+        """
+        组合各过滤条件
+
+        :return: 匹配位置集合；没有任何过滤条件时返回None，表示全部匹配
+        """
+        sets: List[Set[int]] = []
+        if category:
+            sets.append(self.by_category.get(category, set()))
+        if area:
+            sets.append(self.by_area.get(area, set()))
+        if year:
+            sets.append(self.by_year.get(year, set()))
+        if min_rate is not None or max_rate is not None:
+            sets.append(self.match_rate(min_rate, max_rate))
+        if keyword:
+            sets.append(self.match_keyword(keyword))
+
+        if not sets:
+            return None
+
+        # 从最小的集合开始求交，减少比较次数
+        sets.sort(key=len)
+        return set(sets[0]).intersection(*sets[1:])
+
+    def page(
+        self,
+        matched: Optional[Set[int]],
+        sort_by: str,
+        reverse: bool,
+        offset: int,
+        limit: int,
+        after: int = -1,
+    ) -> Tuple[List[int], int]:
+        """
+        按预先计算的排列取出一页匹配结果，取满一页即停止
+
+        :param matched: filter() 的返回值
+        :param sort_by: 排序字段（rate/year/title），其他值保持原始顺序
+        :param reverse: 是否降序
+        :param offset: 跳过的匹配条数
+        :param limit: 每页数量
+        :param after: 只返回名次大于该值的条目（游标分页）
+        :return: (当前页位置列表, 最后一条的名次)
+        """
+        key = (sort_by, reverse)
+        order = self.orderings.get(key, self.natural_order)
+        rank = self.ranks.get(key)
+
+        # 匹配结果远少于全集时，直接按名次取前 offset+limit 个，比顺序扫描更快
+        if matched is not None and rank is not None and len(matched) * 8 < self.size:
+            candidates = matched if after < 0 else [p for p in matched if rank[p] > after]
+            chosen = heapq.nsmallest(offset + limit, candidates, key=rank.__getitem__)
+            chosen = chosen[offset:]
+            return chosen, (rank[chosen[-1]] if chosen else after)
+
+        chosen = []
+        last = after
+        skipped = 0
+        for r in range(after + 1, self.size):
+            pos = order[r]
+            if matched is not None and pos not in matched:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            chosen.append(pos)
+            last = r
+            if len(chosen) >= limit:
+                break
+        return chosen, last
+
+    def positions(self, matched: Optional[Set[int]]) -> Iterable[int]:
+        """
+        按原始顺序返回匹配位置
+
+        :param matched: filter() 的返回值
+        :return: 升序的位置序列
+        """
+        return range(self.size) if matched is None else sorted(matched)
+
+
+def encode_cursor(snapshot_id: Any, sort_by: str, reverse: bool, rank: int, seen: int) -> str:
+    """
+    生成分页游标
+
+    :param snapshot_id: 游标所属快照
+    :param sort_by: 排序字段
+    :param reverse: 是否降序
+    :param rank: 已返回的最后一条在排列中的名次
+    :param seen: 已返回的匹配条数
+    :return: URL安全的游标字符串
+    """
+    payload = {"s": str(snapshot_id), "k": sort_by, "d": reverse, "r": rank, "n": seen}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    解析分页游标
+
+    :param cursor: encode_cursor 生成的游标
+    :return: 游标内容
+    :raises ValueError: 游标格式无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload.get("r"), int) or not isinstance(payload.get("n"), int):
+            raise ValueError
+        return payload
+    except Exception:
+        raise ValueError("无效的分页游标")
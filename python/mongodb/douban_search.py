@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于快照构建的全文检索索引，用于标题、导演、演员的搜索和输入联想
+
+文本经过 NFKC 规范化和小写转换后切分为词项：中日韩文字取字符二元组（单字时取一元组），
+拉丁字母和数字取整个单词。每个词项的倒排列表在构建时就按 BM25 计算好得分（标题、导演、演员各自计算后加权求和），
+并按得分降序排列；标题开头的词项额外加分，输入标题的前几个字时该剧排在前面。
+查询要求所有词项都命中，最后一个拉丁单词按前缀匹配（边输入边联想）。
+每个快照只构建一次，查询只需合并几个倒排列表；命中很多时按阈值算法从各列表头部读取，不必计算每部剧的得分。
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Set, Tuple
+
+# 中日韩文字片段与拉丁字母/数字单词
+_CJK_RUN = r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+_WORD = r"[0-9a-z\u00c0-\u024f]+"
+TOKEN_PATTERN = re.compile(f"({_CJK_RUN})|({_WORD})")
+WORD_PATTERN = re.compile(_WORD)
+
+# 各字段的权重
+FIELD_WEIGHTS = {"title": 3.0, "directors": 1.0, "actors": 1.0}
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 标题开头的词项额外增加的得分
+TITLE_PREFIX_BONUS = 2.0
+# 前缀匹配时最多展开的词项数
+MAX_PREFIX_EXPANSIONS = 50
+# 命中数超过返回数量的多少倍时改用阈值算法取前几条
+TOP_K_SCAN_FACTOR = 4
+
+
+# 译名中的间隔号，去掉后 "大卫·哈伯" 与 "大卫哈伯" 得到相同的词项
+_NAME_DOTS = str.maketrans("", "", "·・•")
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化文本：全角转半角、小写、去掉译名中的间隔号
+    """
+    return unicodedata.normalize("NFKC", text or "").lower().translate(_NAME_DOTS)
+
+
+def tokenize(text: str) -> List[Tuple[str, bool]]:
+    """
+    将文本切分为词项
+
+    :param text: 已规范化的文本
+    :return: (词项, 是否为拉丁单词) 列表，按在文本中出现的顺序排列
+    """
+    terms = []
+    for cjk, word in TOKEN_PATTERN.findall(text):
+        if word:
+            terms.append((word, True))
+        elif len(cjk) == 1:
+            terms.append((cjk, False))
+        else:
+            terms.extend((cjk[i : i + 2], False) for i in range(len(cjk) - 1))
+    return terms
+
+
+def _index_terms(text: str) -> List[str]:
+    """
+    获取建立索引时一段文本的全部词项：除二元组外还包含每个汉字的一元组，以便单字查询
+    """
+    terms = []
+    for cjk, word in TOKEN_PATTERN.findall(text):
+        if word:
+            terms.append(word)
+        else:
+            terms.extend(cjk)
+            terms.extend(cjk[i : i + 2] for i in range(len(cjk) - 1))
+    return terms
+
+
+class SearchIndex:
+    def __init__(self, tv_list: Iterable[Dict[str, Any]]):
+        """
+        为电视剧数据构建倒排索引
+
+        :param tv_list: reshape_item 格式的电视剧数据（字典列表或列式快照），索引中的位置即下标，也是热度顺序
+        """
+        # 每个字段中词项的出现次数，以及各文档的字段长度
+        field_counts: Dict[str, List[Counter]] = {field: [] for field in FIELD_WEIGHTS}
+        prefix_positions: Dict[str, Set[int]] = {}  # 词项 -> 以该词项开头的标题位置
+        pos = -1
+        for pos, tv in enumerate(tv_list):
+            title = normalize_text(tv["title"])
+            field_counts["title"].append(Counter(_index_terms(title)))
+            field_counts["directors"].append(Counter(_index_terms(normalize_text(" ".join(tv["directors"])))))
+            field_counts["actors"].append(Counter(_index_terms(normalize_text(" ".join(tv["actors"])))))
+            # 标题开头的一元组、二元组或单词
+            first = TOKEN_PATTERN.match(title)
+            if first is not None:
+                cjk, word = first.groups()
+                for term in {word} if word else {cjk[0], cjk[:2]}:
+                    prefix_positions.setdefault(term, set()).add(pos)
+        self.size = pos + 1
+
+        # 每个词项在各文档中的加权 BM25 词频部分
+        weights: Dict[str, Dict[int, float]] = {}
+        for field, counts in field_counts.items():
+            lengths = [sum(c.values()) for c in counts]
+            avg_length = (sum(lengths) / self.size) if self.size else 0
+            field_weight = FIELD_WEIGHTS[field]
+            for pos, counter in enumerate(counts):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[pos] / avg_length) if avg_length else BM25_K1
+                for term, tf in counter.items():
+                    postings = weights.setdefault(term, {})
+                    postings[pos] = postings.get(pos, 0.0) + field_weight * tf * (BM25_K1 + 1) / (tf + norm)
+
+        # 词项 -> {位置: 得分}，按得分降序插入（得分相同时热度高、位置小的在前），
+        # 既可按顺序直接取前几条，也可在求交时按位置查得分
+        self.postings: Dict[str, Dict[int, float]] = {}
+        for term, postings in weights.items():
+            idf = math.log(1 + (self.size - len(postings) + 0.5) / (len(postings) + 0.5))
+            bonus = prefix_positions.get(term, ())
+            scored = sorted(
+                (-(idf * weight + (TITLE_PREFIX_BONUS if pos in bonus else 0.0)), pos) for pos, weight in postings.items()
+            )
+            self.postings[term] = {pos: -score for score, pos in scored}
+
+        # 拉丁单词按字母顺序排列，用于前缀匹配
+        self.words = sorted(term for term in self.postings if WORD_PATTERN.fullmatch(term))
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """
+        查找以 prefix 开头的拉丁单词
+
+        :param prefix: 已规范化的前缀
+        :return: 单词列表，最多 MAX_PREFIX_EXPANSIONS 个
+        """
+        start = bisect_left(self.words, prefix)
+        words = []
+        for word in self.words[start : start + MAX_PREFIX_EXPANSIONS]:
+            if not word.startswith(prefix):
+                break
+            words.append(word)
+        return words
+
+    def _group(self, terms: List[str]) -> Dict[int, float]:
+        """
+        合并几个可互相替代的词项（前缀展开的结果），每部剧取其中最高的得分
+        """
+        if len(terms) == 1:
+            return self.postings[terms[0]]
+        merged: Dict[int, float] = {}
+        for term in terms:
+            for pos, score in self.postings[term].items():
+                if score > merged.get(pos, 0.0):
+                    merged[pos] = score
+        return merged
+
+    @staticmethod
+    def _top_k(lists: List[Dict[int, float]], common: Set[int], limit: int) -> List[int]:
+        """
+        阈值算法：各倒排列表已按得分降序排列，逐行同时向下读取，读到命中全部词项的位置就计算总分，
+        当本行得分之和（未读到的位置可能达到的最高总分）不超过当前第 limit 名时停止
+
+        :param lists: 各词项的倒排列表
+        :param common: 命中全部词项的位置
+        :param limit: 返回数量
+        :return: 按总分降序排列的位置列表，与计算全部总分后排序的结果相同
+        """
+        heap: List[Tuple[float, int]] = []  # (总分, -位置)，堆顶为当前第 limit 名
+        seen: Set[int] = set()
+        # 命中全部词项的位置都在最短的列表中，该列表读完时已全部读到
+        for row in zip(*(scores.items() for scores in lists)):
+            bound = 0.0
+            last = 0
+            for pos, score in row:
+                bound += score
+                if pos > last:
+                    last = pos
+                if pos in common and pos not in seen:
+                    seen.add(pos)
+                    entry = (sum(scores[pos] for scores in lists), -pos)
+                    if len(heap) < limit:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+            # 未读到的位置总分等于 bound 时，它在每个列表中都排在本行之后，位置比 last 大
+            if len(heap) == limit and (bound, -last) <= heap[0]:
+                break
+        return [-pos for _, pos in sorted(heap, reverse=True)]
+
+    def search(self, query: str, limit: int = 10) -> Tuple[int, List[int]]:
+        """
+        搜索电视剧
+
+        :param query: 查询文本，匹配标题、导演和演员
+        :param limit: 返回数量
+        :return: (命中总数, 按得分降序排列的位置列表)
+        """
+        text = normalize_text(query)
+        terms = tokenize(text)
+        if not terms:
+            return 0, []
+
+        # 每个元素为一组可互相替代的词项；查询以拉丁单词结尾（后面没有空格）时，该单词按前缀匹配
+        last, last_is_word = terms[-1]
+        prefix = last if last_is_word and text.endswith(last) else None
+        groups: List[List[str]] = []
+        for term, _ in dict.fromkeys(terms):
+            if term == prefix:
+                expanded = self.expand_prefix(term)
+            else:
+                expanded = [term] if term in self.postings else []
+            if not expanded:
+                return 0, []
+            groups.append(expanded)
+
+        # 只有一个词项时倒排列表已按得分排好序，直接取前几条
+        if len(groups) == 1 and len(groups[0]) == 1:
+            postings = self.postings[groups[0][0]]
+            return len(postings), list(islice(postings, limit))
+
+        # 从最短的倒排列表开始，依次与其他词项求交并累加得分
+        groups.sort(key=lambda group: sum(len(self.postings[term]) for term in group))
+        lists = [self._group(group) for group in groups]
+        if len(lists) > 1 and all(len(group) == 1 for group in groups):
+            # 都是单个词项时先用集合运算求交得到命中总数；命中很多时用阈值算法只计算排在前面的几部剧
+            common = lists[0].keys() & lists[1].keys()
+            for other in lists[2:]:
+                common &= other.keys()
+            if 0 < limit * TOP_K_SCAN_FACTOR < len(common):
+                return len(common), self._top_k(lists, common, limit)
+            top = heapq.nsmallest(limit, [(-sum(scores[pos] for scores in lists), pos) for pos in common])
+            return len(common), [pos for _, pos in top]
+
+        scores = lists[0]
+        for other in lists[1:]:
+            scores = {pos: score + other[pos] for pos, score in scores.items() if pos in other}
+            if not scores:
+                return 0, []
+
+        top = heapq.nsmallest(limit, [(-score, pos) for pos, score in scores.items()])
+        return len(scores), [pos for _, pos in top]
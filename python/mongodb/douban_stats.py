@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+豆瓣热门电视剧统计数据的单次遍历聚合
+
+compute_stats 在Python中遍历已加载的快照；stats_pipeline 生成等价的MongoDB聚合管道，
+只把计数结果传回客户端。
+"""
+
+from typing import List, Dict, Any
+
+# 评分区间，按上界升序排列，最后一个区间包含10分及以上
+RATE_BUCKETS = ["0-5", "5-6", "6-7", "7-8", "8-9", "9-10"]
+
+
+def parse_rate(value: Any) -> float:
+    """
+    将评分转换为数值，无法解析的评分（如"暂无评分"）记为0
+
+    :param value: 原始评分
+    :return: 数值评分
+    """
+    if isinstance(value, (int, float, str)) and str(value).replace(".", "", 1).isdigit():
+        return float(value)
+    return 0
+
+
+def parse_year(value: Any) -> int:
+    """
+    将年份转换为整数，未知年份（如"未知"）记为0
+
+    :param value: 原始年份，字符串或整数
+    :return: 年份
+    """
+    if isinstance(value, int):
+        return value
+    value = str(value or "").strip()
+    return int(value) if value.isdigit() else 0
+
+
+def rate_bucket(rate: float) -> str:
+    """
+    获取评分所属的区间名称
+
+    :param rate: 数值评分
+    :return: 区间名称
+    """
+    if rate < 5:
+        return "0-5"
+    if rate >= 9:
+        return "9-10"
+    return RATE_BUCKETS[int(rate) - 4]
+
+
+def compute_stats(tv_list: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """
+    一次遍历同时计算评分、类型、地区和年份分布
+
+    :param tv_list: 电视剧数据列表
+    :return: 包含 rate/category/area/year 四个统计字典的字典
+    """
+    rate_stats = {bucket: 0 for bucket in RATE_BUCKETS}
+    category_stats: Dict[str, int] = {}
+    area_stats: Dict[str, int] = {}
+    year_stats: Dict[str, int] = {}
+
+    for tv in tv_list:
+        rate_stats[rate_bucket(parse_rate(tv["rate"]))] += 1
+
+        for category in tv["category"]:
+            category_stats[category] = category_stats.get(category, 0) + 1
+
+        area = tv["area"]
+        area_stats[area] = area_stats.get(area, 0) + 1
+
+        year = tv["year"]
+        if year > 0:  # 跳过无效年份
+            year_str = str(year)
+            year_stats[year_str] = year_stats.get(year_str, 0) + 1
+
+    return {
+        "rate": rate_stats,
+        "category": category_stats,
+        "area": area_stats,
+        "year": year_stats,
+    }
+
+
+def stats_pipeline(snapshot_id: str) -> List[Dict[str, Any]]:
+    """
+    生成在电视剧集合上计算某个快照统计数据的聚合管道，结果与 compute_stats 一致
+
+    :param snapshot_id: 快照id
+    :return: 聚合管道，输出一条包含 rate/category/area/year 四个分面的文档
+    """
+    return [
+        {"$match": {"snapshot_id": snapshot_id}},
+        {
+            "$facet": {
+                # 暂无评分记为0分；9分及以上落入默认区间
+                "rate": [
+                    {
+                        "$bucket": {
+                            "groupBy": {"$ifNull": ["$rating", 0]},
+                            "boundaries": [0, 5, 6, 7, 8, 9],
+                            "default": 9,
+                            "output": {"count": {"$sum": 1}},
+                        }
+                    }
+                ],
+                "category": [
+                    {"$unwind": "$genres"},
+                    {"$group": {"_id": "$genres", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                ],
+                "area": [
+                    {"$group": {"_id": {"$ifNull": ["$country", ""]}, "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                ],
+                "year": [
+                    {"$match": {"year": {"$gt": 0}}},
+                    {"$group": {"_id": "$year", "count": {"$sum": 1}}},
+                ],
+            }
+        },
+    ]
+
+
+def stats_from_facets(result: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, int]]:
+    """
+    将 stats_pipeline 的输出转换为 compute_stats 的返回格式
+
+    :param result: 聚合管道输出的文档
+    :return: 包含 rate/category/area/year 四个统计字典的字典
+    """
+    rate_stats = {bucket: 0 for bucket in RATE_BUCKETS}
+    for row in result.get("rate", []):
+        rate_stats[rate_bucket(row["_id"])] += row["count"]
+
+    return {
+        "rate": rate_stats,
+        "category": {row["_id"]: row["count"] for row in result.get("category", [])},
+        "area": {row["_id"]: row["count"] for row in result.get("area", [])},
+        "year": {str(row["_id"]): row["count"] for row in result.get("year", [])},
+    }
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+进程级共享的MongoDB连接池
+
+FastAPI启动时创建一个MongoClient，所有DoubanMongoDBQuery实例共享该客户端，
+避免每个请求都新建连接、发送ping并关闭连接。
+"""
+
+import threading
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+from typing import Dict, Any, Optional
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    连接池事件监听器，统计连接的创建、关闭和借出情况
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checkout_failed = 0
+        self.pool_cleared = 0
+
+    def _incr(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr("pool_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr("closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr("checkout_failed")
+
+    def connection_checked_out(self, event):
+        self._incr("checked_out")
+
+    def connection_checked_in(self, event):
+        self._incr("checked_out", -1)
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        获取当前统计数据
+
+        :return: 连接池统计字典
+        """
+        with self._lock:
+            return {
+                "open_connections": self.created - self.closed,
+                "in_use": self.checked_out,
+                "total_created": self.created,
+                "total_closed": self.closed,
+                "checkout_failed": self.checkout_failed,
+                "pool_cleared": self.pool_cleared,
+            }
+
+
+_client: Optional[MongoClient] = None
+_listener: Optional[PoolStatsListener] = None
+_pool_options: Dict[str, Any] = {}
+_client_lock = threading.Lock()
+
+
+def init_client(config: Dict[str, Any]) -> MongoClient:
+    """
+    创建进程级共享的MongoClient（重复调用时返回已有实例）
+
+    :param config: 配置字典，包含MongoDB连接信息和连接池参数
+    :return: 共享的MongoClient实例
+    """
+    global _client, _listener, _pool_options
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        _pool_options = {
+            "maxPoolSize": config.get("max_pool_size", 50),
+            "minPoolSize": config.get("min_pool_size", 0),
+            "maxIdleTimeMS": config.get("max_idle_time_ms", 60000),
+            "connectTimeoutMS": config.get("connect_timeout_ms", 5000),
+            "serverSelectionTimeoutMS": config.get("server_selection_timeout_ms", 5000),
+            "socketTimeoutMS": config.get("socket_timeout_ms", 10000),
+            "waitQueueTimeoutMS": config.get("wait_queue_timeout_ms", 5000),
+        }
+        _listener = PoolStatsListener()
+        _client = MongoClient(
+            config["mongodb_uri"], event_listeners=[_listener], **_pool_options
+        )
+
+    # 启动时检查一次连接；失败时保留客户端，由驱动在后台自动重连
+    try:
+        _client.admin.command("ping")
+        print(f"已创建MongoDB连接池 (maxPoolSize={_pool_options['maxPoolSize']})")
+    except PyMongoError as e:
+        print(f"MongoDB连接检查失败，将在后续请求时重试: {e}")
+
+    return _client
+
+
+def get_client() -> Optional[MongoClient]:
+    """
+    获取共享的MongoClient
+
+    :return: 共享的MongoClient实例，未初始化时返回None
+    """
+    return _client
+
+
+def ping() -> bool:
+    """
+    检查共享客户端与MongoDB服务器的连通性
+
+    :return: 是否连通
+    """
+    if _client is None:
+        return False
+    try:
+        _client.admin.command("ping")
+        return True
+    except PyMongoError as e:
+        print(f"MongoDB连接检查失败: {e}")
+        return False
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    获取连接池配置与统计数据
+
+    :return: 连接池统计字典
+    """
+    if _client is None or _listener is None:
+        return {"initialized": False}
+
+    stats = {"initialized": True, "options": dict(_pool_options)}
+    stats.update(_listener.snapshot())
+    return stats
+
+
+def close_client() -> None:
+    """
+    关闭共享的MongoClient
+    """
+    global _client, _listener
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+            _listener = None
+            print("已关闭MongoDB连接池")
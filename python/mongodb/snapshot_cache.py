@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+最新快照的进程级内存缓存
+
+爬虫每天写入一个新快照，同一天重复爬取时只更新该快照并刷新 updated_at，
+因此缓存以快照的 _id/created_at/updated_at 作为版本号：
+在检查间隔内直接命中缓存；超过间隔后只发送一次仅含投影字段的查询确认版本，
+只有出现更新的快照时才重新加载并转换全部数据。
+"""
+
+import threading
+import time
+from pymongo import DESCENDING
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# 版本检查只需要的字段
+VERSION_PROJECTION = {"_id": 1, "created_at": 1, "updated_at": 1}
+
+# 已完成写入的快照：爬虫边爬边写的新快照在全部写完前标记为 in_progress，读取端忽略
+PUBLISHED_QUERY = {"status": {"$ne": "in_progress"}}
+
+
+class Snapshot:
+    def __init__(self, version: Tuple[Any, ...], items: List[Dict[str, Any]]):
+        """
+        一个已加载并转换完成的快照
+
+        :param version: 快照版本号，(_id, created_at, updated_at)
+        :param items: 转换后的电视剧数据（字典列表或列式快照，均可按下标取出条目）
+        """
+        self.version = version
+        self.items = items
+        self.loaded_at = time.time()
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.Lock()
+
+    @property
+    def snapshot_id(self) -> Any:
+        return self.version[0]
+
+    def derive(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        获取基于本快照计算的派生数据（统计、索引等），每个快照只计算一次
+
+        :param name: 派生数据名称
+        :param factory: 首次访问时调用的计算函数
+        :return: 派生数据
+        """
+        value = self._derived.get(name)
+        if value is not None:
+            return value
+
+        with self._derived_lock:
+            value = self._derived.get(name)
+            if value is None:
+                value = factory()
+                self._derived[name] = value
+            return value
+
+
+class SnapshotCache:
+    def __init__(self, check_interval: float = 30):
+        """
+        初始化快照缓存
+
+        :param check_interval: 两次版本检查之间的最短间隔（秒），0表示每次都检查
+        """
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Snapshot] = None
+        self._checked_at = 0.0
+        self._head: Optional[Tuple[Any, ...]] = None
+        self._head_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+
+    @staticmethod
+    def _version_of(record: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (record.get("_id"), record.get("created_at"), record.get("updated_at"))
+
+    def get(
+        self,
+        collection,
+        loader: Callable[[Dict[str, Any]], List[Dict[str, Any]]],
+    ) -> Optional[Snapshot]:
+        """
+        获取最新快照，必要时从MongoDB重新加载
+
+        :param collection: 快照所在的MongoDB集合
+        :param loader: 将原始快照记录转换为电视剧数据列表的函数
+        :return: 最新快照，集合为空时返回None
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.time() - self._checked_at < self.check_interval:
+            self.hits += 1
+            return snapshot
+
+        # 同一时刻只允许一个线程检查版本和重新加载，避免并发重复加载
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.time() - self._checked_at < self.check_interval:
+                self.hits += 1
+                return snapshot
+
+            self.version_checks += 1
+            head = collection.find_one(
+                PUBLISHED_QUERY, projection=VERSION_PROJECTION, sort=[("created_at", DESCENDING)]
+            )
+            if head is None:
+                return None
+
+            version = self._version_of(head)
+            self._head, self._head_checked_at = version, time.time()
+            if snapshot is not None and snapshot.version == version:
+                self._checked_at = time.time()
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            record = collection.find_one({"_id": head["_id"]})
+            if record is None:
+                return snapshot
+
+            snapshot = Snapshot(self._version_of(record), loader(record))
+            self._snapshot = snapshot
+            self._checked_at = time.time()
+            print(f"已加载快照 {snapshot.snapshot_id}，共 {len(snapshot.items)} 条电视剧数据")
+            return snapshot
+
+    def current_version(self, collection) -> Optional[Tuple[Any, ...]]:
+        """
+        获取最新快照的版本号而不加载快照（用于生成HTTP缓存校验值）
+
+        与 get() 共用检查间隔；发现比已加载快照更新的版本时，让下一次 get() 立即重新加载，
+        保证按新版本号生成的响应使用的是新快照的数据。
+
+        :param collection: 快照所在的MongoDB集合
+        :return: 快照版本号，集合为空时返回None
+        """
+        head = self._head
+        if head is not None and time.time() - self._head_checked_at < self.check_interval:
+            return head
+
+        record = collection.find_one(
+            PUBLISHED_QUERY, projection=VERSION_PROJECTION, sort=[("created_at", DESCENDING)]
+        )
+        with self._lock:
+            self.version_checks += 1
+            self._head = self._version_of(record) if record else None
+            self._head_checked_at = time.time()
+            if self._snapshot is not None and self._snapshot.version != self._head:
+                self._checked_at = 0.0
+            return self._head
+
+    def invalidate(self) -> None:
+        """
+        清空缓存，下次访问时强制重新加载
+        """
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+            self._head = None
+            self._head_checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存命中统计
+
+        :return: 缓存统计字典
+        """
+        snapshot = self._snapshot
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "version_checks": self.version_checks,
+            "check_interval": self.check_interval,
+            "snapshot_id": snapshot.snapshot_id if snapshot else None,
+            "item_count": len(snapshot.items) if snapshot else 0,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+        }
+
+
+_caches: Dict[Tuple[str, str], SnapshotCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_snapshot_cache(config: Dict[str, Any]) -> SnapshotCache:
+    """
+    获取指定数据库集合对应的进程级快照缓存
+
+    :param config: 配置字典，包含数据库名、集合名和检查间隔
+    :return: 快照缓存实例
+    """
+    key = (config["db_name"], config["collection_name"])
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = SnapshotCache(config.get("cache_check_interval", 30))
+            _caches[key] = cache
+        return cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取所有快照缓存的统计数据
+
+    :return: 以 "数据库.集合" 为键的统计字典
+    """
+    with _caches_lock:
+        caches = dict(_caches)
+    return {f"{db}.{coll}": cache.stats() for (db, coll), cache in caches.items()}
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地假豆瓣接口，模拟 rexxar/api/v2/tv/recommend 和条目详情 rexxar/api/v2/tv/{id}，用于离线测试爬虫
+
+根据固定随机种子生成一份电视剧目录，按 start/count 分页返回，与真实接口的数据结构一致。
+不同的 tags 参数会得到目录中互有重叠的不同子集，用于验证多地区爬取的去重。
+服务器会记录每次请求的时间和参数，可据此验证并发和速率限制；
+还可以为指定偏移量或条目id预设失败响应（如429、503），用于验证重试和断点续爬。
+条目详情由目录中的条目确定性地生成（制片国家/地区、集数、完整演职员和评价人数）。
+
+用法：
+    python python/stubs/fake_douban_api.py --port 9002 --total 300
+    # 爬虫配置 api_url 指向 http://127.0.0.1:9002/rexxar/api/v2/tv/recommend
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Tuple, Optional, Union
+from urllib.parse import urlsplit, parse_qs
+
+RECOMMEND_PATH = "/rexxar/api/v2/tv/recommend"
+DETAIL_PATH_PREFIX = "/rexxar/api/v2/tv/"
+
+_COUNTRIES = ["美国", "英国", "美国 英国", "加拿大", "澳大利亚"]
+_GENRES = ["剧情", "喜剧", "悬疑", "犯罪", "科幻", "奇幻", "动作", "爱情", "惊悚", "历史"]
+_NAMES = ["马特·达菲", "罗斯·达菲", "米莉·博比·布朗", "大卫·哈伯", "布莱恩·科兰斯顿",
+          "亚伦·保尔", "文斯·吉里根", "艾米莉亚·克拉克", "基特·哈灵顿", "彼得·丁拉基"]
+
+
+def generate_catalogue(total: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    生成与推荐接口条目结构一致的电视剧目录
+
+    :param total: 条目数量
+    :param seed: 随机种子
+    :return: 条目列表
+    """
+    rng = random.Random(seed)
+    items = []
+    for i in range(total):
+        subject_id = str(30000000 + i)
+        year = rng.randint(1995, 2025)
+        genres = " ".join(rng.sample(_GENRES, rng.randint(1, 3)))
+        directors = " ".join(rng.sample(_NAMES, rng.randint(1, 2)))
+        actors = " ".join(rng.sample(_NAMES, rng.randint(2, 4)))
+        item = {
+            "id": subject_id,
+            "title": f"测试剧集{i}",
+            "type": "tv",
+            "card_subtitle": f"{year} / {rng.choice(_COUNTRIES)} / {genres} / {directors} / {actors}",
+            "pic": {
+                "large": f"https://img1.doubanio.com/view/photo/m_ratio_poster/public/p{subject_id}.jpg",
+                "normal": f"https://img1.doubanio.com/view/photo/s_ratio_poster/public/p{subject_id}.jpg",
+            },
+            "uri": f"douban://douban.com/tv/{subject_id}",
+        }
+        # 约一成条目没有评分（与真实接口一致，不返回 rating 字段）
+        if rng.random() > 0.1:
+            item["rating"] = {
+                "count": rng.randint(100, 500000),
+                "max": 10,
+                "value": round(rng.uniform(5, 9.8), 1),
+            }
+        items.append(item)
+    return items
+
+
+def build_detail(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    根据目录条目生成与详情接口结构一致的条目详情（同一条目每次生成的结果相同）
+
+    副标题中的导演、演员只是前几位，详情中的演员表更完整
+
+    :param item: 目录条目
+    :return: 条目详情
+    """
+    rng = random.Random(item["id"])
+    parts = item["card_subtitle"].split(" / ")
+    directors = parts[3].split()
+    actors = parts[4].split()
+    actors += [name for name in rng.sample(_NAMES, rng.randint(0, 4)) if name not in actors]
+    return {
+        "id": item["id"],
+        "title": item["title"],
+        "type": "tv",
+        "year": parts[0],
+        "countries": parts[1].split(),
+        "genres": parts[2].split(),
+        "episodes_count": rng.randint(6, 40),
+        "directors": [{"name": name} for name in directors],
+        "actors": [{"name": name} for name in actors],
+        "rating": item.get("rating"),
+        "pic": item["pic"],
+        "uri": item["uri"],
+    }
+
+
+class FakeDoubanServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        total: int = 200,
+        latency: float = 0.0,
+        failures: Optional[Dict[Union[int, str], List[int]]] = None,
+        retry_after: Optional[str] = "1",
+    ):
+        """
+        :param address: 监听地址
+        :param total: 目录条目数量
+        :param latency: 每次请求的模拟延迟（秒）
+        :param failures: 预设的失败响应，键为 start 偏移量（推荐接口）或条目id（详情接口），值为依次返回的状态码列表
+        :param retry_after: 429响应的 Retry-After 头，None表示不返回该头
+        """
+        super().__init__(address, FakeDoubanHandler)
+        self.catalogue = generate_catalogue(total)
+        self.by_id = {item["id"]: item for item in self.catalogue}
+        self.latency = latency
+        self.failures = {start: list(codes) for start, codes in (failures or {}).items()}
+        self.retry_after = retry_after
+        self._slices: Dict[str, List[Dict[str, Any]]] = {}
+        self.requests: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # 客户端取消请求导致的断开属于正常情况，不打印堆栈
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def recommend_url(self) -> str:
+        return self.base_url + RECOMMEND_PATH
+
+    def record(self, path: str) -> None:
+        with self._lock:
+            self.requests.append((time.monotonic(), path))
+
+    def slice_items(self, tags: str) -> List[Dict[str, Any]]:
+        """
+        获取某个 tags 对应的目录子集（约一半条目，不同 tags 之间互有重叠）
+        """
+        with self._lock:
+            items = self._slices.get(tags)
+            if items is None:
+                items = [
+                    item
+                    for item in self.catalogue
+                    if not tags or zlib.crc32((tags + item["id"]).encode("utf-8")) % 2 == 0
+                ]
+                self._slices[tags] = items
+            return items
+
+    @property
+    def detail_url(self) -> str:
+        return self.base_url + DETAIL_PATH_PREFIX + "{subject_id}"
+
+    def next_failure(self, key: Union[int, str]) -> Optional[int]:
+        """
+        取出该偏移量或条目id下一次预设的失败状态码
+        """
+        with self._lock:
+            codes = self.failures.get(key)
+            return codes.pop(0) if codes else None
+
+
+class FakeDoubanHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_failure(self, status: int) -> None:
+        self.send_response(status)
+        if status == 429 and self.server.retry_after is not None:
+            self.send_header("Retry-After", self.server.retry_after)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        server: FakeDoubanServer = self.server
+        server.record(self.path)
+        if server.latency:
+            time.sleep(server.latency)
+
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        if parts.path != RECOMMEND_PATH:
+            subject_id = parts.path[len(DETAIL_PATH_PREFIX):]
+            if not parts.path.startswith(DETAIL_PATH_PREFIX) or subject_id not in server.by_id:
+                self.send_json(404, {"msg": "not found"})
+                return
+            failure = server.next_failure(subject_id)
+            if failure is not None:
+                self.send_failure(failure)
+                return
+            self.send_json(200, build_detail(server.by_id[subject_id]))
+            return
+
+        start = int(query.get("start", ["0"])[0])
+        count = int(query.get("count", ["20"])[0])
+
+        failure = server.next_failure(start)
+        if failure is not None:
+            self.send_failure(failure)
+            return
+
+        catalogue = server.slice_items(query.get("tags", [""])[0])
+        items = catalogue[start : start + count]
+        self.send_json(
+            200,
+            {"start": start, "count": len(items), "total": len(catalogue), "items": items},
+        )
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_douban_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    total: int = 200,
+    latency: float = 0.0,
+    failures: Optional[Dict[Union[int, str], List[int]]] = None,
+    retry_after: Optional[str] = "1",
+) -> FakeDoubanServer:
+    """
+    在后台线程中启动假豆瓣接口
+
+    :param host: 监听地址
+    :param port: 监听端口，0表示随机端口
+    :param total: 目录条目数量
+    :param latency: 每次请求的模拟延迟（秒）
+    :param failures: 预设的失败响应，键为 start 偏移量（推荐接口）或条目id（详情接口），值为依次返回的状态码列表
+    :param retry_after: 429响应的 Retry-After 头，None表示不返回该头
+    :return: 服务器实例，使用完毕后调用 shutdown()
+    """
+    server = FakeDoubanServer(
+        (host, port), total=total, latency=latency, failures=failures, retry_after=retry_after
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地假豆瓣推荐接口")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9002)
+    parser.add_argument("--total", type=int, default=200, help="目录条目数量")
+    parser.add_argument("--latency", type=float, default=0.0, help="每次请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    server = FakeDoubanServer((args.host, args.port), total=args.total, latency=args.latency)
+    print(f"假豆瓣接口已启动: {server.recommend_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地假图片服务器，用于在不访问豆瓣图片服务器的情况下测试图片代理
+
+任意路径都会返回一张内容由路径决定的固定图片，并记录每个路径被请求的次数和建立的连接数，
+可据此验证代理的连接复用和磁盘缓存是否生效。
+
+用法：
+    python python/stubs/fake_image_server.py --port 9001
+    curl "http://127.0.0.1:8000/api/proxy/image?url=http://127.0.0.1:9001/view/photo/p1.jpg"
+"""
+
+import argparse
+import hashlib
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+def fake_image_bytes(path: str, size: int = 32 * 1024) -> bytes:
+    """
+    生成由路径决定的固定图片内容（JPEG文件头加伪随机数据）
+
+    :param path: 请求路径
+    :param size: 图片大小（字节）
+    :return: 图片内容
+    """
+    seed = hashlib.sha256(path.encode("utf-8")).digest()
+    body = (seed * (size // len(seed) + 1))[: size - 4]
+    return b"\xff\xd8\xff\xe0" + body
+
+
+class FakeImageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], delay: float = 0.0, chunk_size: int = 4096):
+        """
+        :param address: 监听地址
+        :param delay: 每个数据块之间的延迟（秒），用于观察流式转发
+        :param chunk_size: 每次写出的数据块大小
+        """
+        super().__init__(address, FakeImageHandler)
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.hits: Counter = Counter()
+        self.connections = 0
+
+    def handle_error(self, request, client_address):
+        # 客户端取消请求导致的断开属于正常情况，不打印堆栈
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class FakeImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.hits[self.path] += 1
+        if self.path.startswith("/status/"):
+            # /status/<code> 返回指定的错误状态码
+            code = int(self.path.split("/")[2])
+            self.send_response(code)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        data = fake_image_bytes(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        for i in range(0, len(data), self.server.chunk_size):
+            self.wfile.write(data[i : i + self.server.chunk_size])
+            if self.server.delay:
+                time.sleep(self.server.delay)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_image_server(
+    host: str = "127.0.0.1", port: int = 0, delay: float = 0.0
+) -> FakeImageServer:
+    """
+    在后台线程中启动假图片服务器
+
+    :param host: 监听地址
+    :param port: 监听端口，0表示随机端口
+    :param delay: 每个数据块之间的延迟（秒）
+    :return: 服务器实例，使用完毕后调用 shutdown()
+    """
+    server = FakeImageServer((host, port), delay=delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地假图片服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--delay", type=float, default=0.0, help="数据块之间的延迟（秒）")
+    args = parser.parse_args()
+
+    server = FakeImageServer((args.host, args.port), delay=args.delay)
+    print(f"假图片服务器已启动: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试公共配置：把项目根目录加入系统路径，测试中以 python.xxx 的形式导入项目内模块
+
+运行：
+    pip install pytest pytest-benchmark mongomock
+    python -m pytest python/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from python.stubs.fake_douban_api import start_fake_douban_server
+
+
+@pytest.fixture
+def douban_server():
+    """
+    启动本地假豆瓣接口：douban_server(total=..., latency=..., failures=...)，测试结束后自动关闭
+    """
+    servers = []
+
+    def start(**kwargs):
+        server = start_fake_douban_server(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    """
+    mongomock 的内存MongoDB客户端（未安装 mongomock 时跳过测试）
+    """
+    mongomock = pytest.importorskip("mongomock")
+    from mongomock.collection import BulkOperationBuilder
+
+    # pymongo 4.9 起 UpdateOne 向批量写入传入 sort 参数，mongomock 4.3 尚不接受；单条更新不需要排序，直接丢弃
+    add_update = BulkOperationBuilder.add_update
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    monkeypatch.setattr(BulkOperationBuilder, "add_update", add_update_without_sort)
+    return mongomock.MongoClient()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并发爬虫：并发请求、令牌桶限速、空页后停止翻页（上游为本地假豆瓣接口）
+"""
+
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from python.crawlr import async_spider
+from python.crawlr.async_spider import crawl_tv_data
+from python.crawlr.douban_spider import get_all_tv_data, parse_tv_data
+from python.crawlr.rate_limit import TokenBucket
+
+# 不带地区/类型筛选的组合，假接口返回完整目录
+ALL = {"region": "", "category": ""}
+
+
+def crawl_config(server, tmp_path, **overrides):
+    return {
+        "api_url": server.recommend_url,
+        "checkpoint_dir": str(tmp_path),
+        "requests_per_second": 1000,
+        "burst": 10,
+        **overrides,
+    }
+
+
+def requested_starts(server):
+    return [int(parse_qs(urlsplit(path).query)["start"][0]) for _, path in server.requests]
+
+
+def test_crawl_returns_catalogue_in_order_and_stops_after_empty_page(douban_server, tmp_path):
+    server = douban_server(total=50)
+    items = asyncio.run(crawl_tv_data(ALL, crawl_config(server, tmp_path, concurrency=4)))
+
+    assert items == parse_tv_data({"items": server.catalogue})
+    starts = requested_starts(server)
+    assert {0, 20, 40, 60} <= set(starts)
+    # 第4页（start=60）为空后不再翻页，最多只多发出一个并发窗口内的请求
+    assert max(starts) < 60 + 4 * 20
+    assert len(starts) == len(set(starts))
+
+
+def test_max_pages_limits_the_crawl(douban_server, tmp_path):
+    server = douban_server(total=200)
+    items = asyncio.run(crawl_tv_data(ALL, crawl_config(server, tmp_path, max_pages=3)))
+    assert len(items) == 60
+    assert max(requested_starts(server)) == 40
+
+
+def test_pages_are_fetched_concurrently(douban_server, tmp_path):
+    server = douban_server(total=160, latency=0.2)
+    started = time.monotonic()
+    items = asyncio.run(crawl_tv_data(ALL, crawl_config(server, tmp_path, concurrency=4)))
+    elapsed = time.monotonic() - started
+
+    assert len(items) == 160
+    # 9个请求（含末尾的空页）逐个请求至少需要1.8秒
+    assert elapsed < 1.2
+
+
+def test_requests_are_paced_by_the_token_bucket(douban_server, tmp_path):
+    server = douban_server(total=200)
+    config = crawl_config(server, tmp_path, concurrency=4, requests_per_second=20, burst=1)
+    asyncio.run(crawl_tv_data(ALL, config))
+
+    times = sorted(t for t, _ in server.requests)
+    assert len(times) >= 11
+    # 容量为1时相邻请求至少间隔 1/20 秒（留出计时误差）
+    assert times[-1] - times[0] >= (len(times) - 1) / 20 * 0.9
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 0.04
+
+
+def test_token_bucket_allows_burst_then_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=5)
+        started = time.monotonic()
+        stamps = []
+        for _ in range(15):
+            await bucket.acquire()
+            stamps.append(time.monotonic() - started)
+        return stamps
+
+    stamps = asyncio.run(run())
+    assert stamps[4] < 0.02  # 前5个令牌立即可用
+    assert stamps[-1] >= 10 / 50 * 0.9
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_sync_wrapper_uses_the_async_crawler(douban_server, tmp_path, monkeypatch):
+    server = douban_server(total=30)
+    for key, value in crawl_config(server, tmp_path).items():
+        monkeypatch.setitem(async_spider.CRAWL_CONFIG, key, value)
+    assert len(get_all_tv_data(ALL, resume=False)) == 30
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+爬取断点：按页续爬，以及批次不一致或过期的断点作废
+"""
+
+import json
+import os
+import time
+
+from python.crawlr.checkpoint import CrawlCheckpoint
+
+
+def page(start):
+    return [{"id": str(start + i), "title": f"剧{start + i}"} for i in range(2)]
+
+
+def test_pages_are_replayed_in_order(tmp_path):
+    checkpoint = CrawlCheckpoint("tv_american", 2, str(tmp_path), crawl_id="douban_hot_tv_20261017")
+    for start in (0, 2, 4):
+        checkpoint.append(start, page(start))
+
+    reopened = CrawlCheckpoint("tv_american", 2, str(tmp_path), crawl_id="douban_hot_tv_20261017")
+    assert list(reopened.iter_pages()) == [(0, page(0)), (2, page(2)), (4, page(4))]
+    assert reopened.load() == (6, page(0) + page(2) + page(4))
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    checkpoint = CrawlCheckpoint("tv_american", 2, str(tmp_path))
+    checkpoint.append(0, page(0))
+    checkpoint.append(2, page(2))
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"start": 4, "items": [')
+
+    assert [start for start, _ in checkpoint.iter_pages()] == [0, 2]
+
+
+def test_checkpoint_from_another_crawl_is_discarded(tmp_path):
+    yesterday = CrawlCheckpoint("tv_american", 2, str(tmp_path), crawl_id="douban_hot_tv_20261016")
+    yesterday.append(0, page(0))
+
+    today = CrawlCheckpoint("tv_american", 2, str(tmp_path), crawl_id="douban_hot_tv_20261017")
+    assert list(today.iter_pages()) == []
+    assert not os.path.exists(today.path)
+
+
+def test_default_crawl_id_is_the_utc_date(tmp_path):
+    checkpoint = CrawlCheckpoint("tv_american", 2, str(tmp_path))
+    checkpoint.append(0, page(0))
+    with open(checkpoint.path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+    assert header["crawl_id"] == time.strftime("%Y%m%d", time.gmtime())
+
+
+def test_expired_checkpoint_is_discarded(tmp_path):
+    checkpoint = CrawlCheckpoint("tv_american", 2, str(tmp_path), crawl_id="run", ttl_hours=1)
+    checkpoint.append(0, page(0))
+    with open(checkpoint.path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    header = json.loads(lines[0])
+    header["created_at"] -= 2 * 3600
+    with open(checkpoint.path, "w", encoding="utf-8") as f:
+        f.writelines([json.dumps(header) + "\n"] + lines[1:])
+
+    assert list(checkpoint.iter_pages()) == []
+    assert not os.path.exists(checkpoint.path)
+
+
+def test_legacy_header_or_other_page_size_is_discarded(tmp_path):
+    path = tmp_path / "tv_american.jsonl"
+    path.write_text(
+        json.dumps({"key": "tv_american", "page_size": 2}) + "\n"
+        + json.dumps({"start": 0, "items": page(0)}) + "\n",
+        encoding="utf-8",
+    )
+    assert list(CrawlCheckpoint("tv_american", 2, str(tmp_path)).iter_pages()) == []
+
+    checkpoint = CrawlCheckpoint("tv_american", 2, str(tmp_path))
+    checkpoint.append(0, page(0))
+    assert list(CrawlCheckpoint("tv_american", 20, str(tmp_path)).iter_pages()) == []
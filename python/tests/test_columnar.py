@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+列式快照：标题关键词通过二元组倒排列表过滤，结果与 SnapshotIndex 一致
+"""
+
+import pytest
+
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.douban_columnar import ColumnarSnapshot
+from python.mongodb.douban_index import SnapshotIndex
+from python.mongodb.select_douban_hot import reshape_item
+from python.stubs.fake_douban_api import generate_catalogue
+
+
+class NoScanList(list):
+    """
+    可以按下标读取、但不允许逐条遍历的列表，用于确认关键词过滤没有扫描全部标题
+    """
+
+    def __iter__(self):
+        raise AssertionError("关键词过滤扫描了全部标题")
+
+
+@pytest.fixture(scope="module")
+def items():
+    items = [reshape_item(item, "2024-01-01") for item in parse_tv_data({"items": generate_catalogue(500, seed=500)})]
+    items[3]["title"] = "Stranger Things 第四季"
+    items[7]["title"] = "怪奇物语"
+    return items
+
+
+@pytest.mark.parametrize("keyword", ["剧集1", "剧", "集4", "STRANGER", "第四季", "怪奇物语", "剧集9999", "魔戒"])
+def test_keyword_filter_matches_snapshot_index(items, keyword):
+    table = ColumnarSnapshot(items)
+    assert table.filter(keyword=keyword).tolist() == sorted(SnapshotIndex(items).filter(keyword=keyword))
+
+
+def test_keyword_filter_uses_the_gram_index(items):
+    table = ColumnarSnapshot(items)
+    table.titles_lower = NoScanList(table.titles_lower)
+    assert table.filter(keyword="stranger th").tolist() == [3]
+    assert table.filter(keyword="剧集12", min_rate=0).tolist() == sorted(SnapshotIndex(items).match_keyword("剧集12"))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+详情爬虫：详情解析、磁盘缓存与有效期、失败与不存在的条目（上游为本地假豆瓣接口）
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from python.crawlr.detail_spider import DetailCache, crawl_details, parse_detail
+from python.stubs.fake_douban_api import build_detail
+
+
+def detail_config(server, tmp_path, **overrides):
+    return {
+        "detail_url": server.detail_url,
+        "cache_dir": str(tmp_path),
+        "requests_per_second": 1000,
+        "burst": 10,
+        "backoff_base": 0.01,
+        **overrides,
+    }
+
+
+def detail_requests(server):
+    return [path for _, path in server.requests if "/recommend" not in path]
+
+
+@pytest.fixture
+def server(douban_server):
+    return douban_server(total=20)
+
+
+def test_parse_detail():
+    detail = parse_detail(
+        {
+            "countries": ["美国", "", "英国"],
+            "episodes_count": "8",
+            "directors": [{"name": "马特·达菲"}, {}],
+            "actors": [{"name": "米莉·博比·布朗"}, {"name": "大卫·哈伯"}],
+            "rating": {"count": 12345, "value": 8.9},
+        }
+    )
+    assert detail == {
+        "countries": ["美国", "英国"],
+        "episodes": 8,
+        "directors": ["马特·达菲"],
+        "actors": ["米莉·博比·布朗", "大卫·哈伯"],
+        "rating_count": 12345,
+    }
+    assert parse_detail({"episodes_count": "", "rating": None}) == {
+        "countries": [],
+        "episodes": None,
+        "directors": [],
+        "actors": [],
+        "rating_count": None,
+    }
+
+
+def test_details_are_fetched_then_served_from_cache(server, tmp_path):
+    ids = [item["id"] for item in server.catalogue[:10]]
+    config = detail_config(server, tmp_path, concurrency=3)
+
+    first = asyncio.run(crawl_details(ids, config))
+    assert (first["fetched"], first["cached"], first["failed"]) == (10, 0, 0)
+    assert first["details"][ids[0]] == parse_detail(build_detail(server.by_id[ids[0]]))
+    assert len(detail_requests(server)) == 10
+
+    second = asyncio.run(crawl_details(ids, config))
+    assert (second["fetched"], second["cached"]) == (0, 10)
+    assert second["details"] == first["details"]
+    assert len(detail_requests(server)) == 10
+
+
+def test_expired_cache_entries_are_refetched(server, tmp_path):
+    ids = [item["id"] for item in server.catalogue[:3]]
+    config = detail_config(server, tmp_path, cache_ttl_days=1)
+    asyncio.run(crawl_details(ids, config))
+
+    cache = DetailCache(str(tmp_path), ttl_days=1)
+    path = cache.path(ids[0])
+    with open(path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["fetched_at"] = time.time() - 2 * 86400
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    assert cache.get(ids[0]) is None
+    assert cache.get(ids[1]) is not None
+
+    result = asyncio.run(crawl_details(ids, config))
+    assert (result["fetched"], result["cached"]) == (1, 2)
+    assert cache.get(ids[0]) is not None
+
+
+def test_corrupt_cache_file_is_treated_as_missing(tmp_path):
+    cache = DetailCache(str(tmp_path))
+    cache.put("30000001", {"countries": ["美国"]})
+    with open(cache.path("30000001"), "w", encoding="utf-8") as f:
+        f.write("{")
+    assert cache.get("30000001") is None
+
+
+def test_missing_and_failing_subjects_do_not_abort_the_batch(douban_server, tmp_path):
+    server = douban_server(total=5, failures={"30000001": [503], "30000002": [403]})
+    ids = [item["id"] for item in server.catalogue] + ["99999999"]
+    result = asyncio.run(crawl_details(ids, detail_config(server, tmp_path)))
+
+    # 503 重试后成功，403 不重试，不存在的条目返回404
+    assert (result["fetched"], result["failed"], result["missing"]) == (4, 1, 1)
+    assert "30000002" not in result["details"]
+
+    # 失败的条目没有写入缓存，下次运行时重新请求
+    again = asyncio.run(crawl_details(ids, detail_config(server, tmp_path)))
+    assert (again["cached"], again["fetched"], again["missing"]) == (4, 1, 1)
+
+
+def test_max_subjects_limits_requests(server, tmp_path):
+    ids = [item["id"] for item in server.catalogue]
+    result = asyncio.run(crawl_details(ids, detail_config(server, tmp_path, max_subjects=4)))
+    assert result["fetched"] == 4
+    assert len(detail_requests(server)) == 4
+
+
+def test_detail_requests_share_the_rate_limit(server, tmp_path):
+    ids = [item["id"] for item in server.catalogue[:6]]
+    config = detail_config(server, tmp_path, concurrency=4, requests_per_second=20, burst=1)
+    asyncio.run(crawl_details(ids, config))
+
+    times = sorted(t for t, path in server.requests)
+    assert times[-1] - times[0] >= 5 / 20 * 0.9
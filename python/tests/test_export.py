@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+数据导出：流式导出不经过响应压缩，仍在写入的快照不能导出（MongoDB 使用 mongomock 的内存实现，只读）
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from python.api import main
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.async_select_douban_hot import async_query_mongo
+from python.mongodb.save_douban_hot import build_item_document
+from python.stubs.fake_douban_api import generate_catalogue
+
+SNAPSHOT_ID = "douban_hot_tv_20261016"
+IN_PROGRESS_ID = "douban_hot_tv_20261017"
+
+
+@pytest.fixture
+def snapshots(mongo_client):
+    db = mongo_client[main.MONGO_CONFIG["db_name"]]
+    created_at = datetime(2026, 10, 16)
+    items = parse_tv_data({"items": generate_catalogue(300, seed=300)})
+    db[main.MONGO_CONFIG["collection_name"]].insert_one(
+        {"_id": SNAPSHOT_ID, "created_at": created_at, "storage": "items", "status": "complete", "data_count": len(items)}
+    )
+    db[main.MONGO_CONFIG["items_collection_name"]].insert_many(
+        [build_item_document(item, SNAPSHOT_ID, created_at, rank) for rank, item in enumerate(items)]
+    )
+    # 第二天的快照只写入了一部分，快照头仍为 in_progress
+    db[main.MONGO_CONFIG["collection_name"]].insert_one(
+        {"_id": IN_PROGRESS_ID, "created_at": datetime(2026, 10, 17), "storage": "items", "status": "in_progress"}
+    )
+    db[main.MONGO_CONFIG["items_collection_name"]].insert_many(
+        [build_item_document(item, IN_PROGRESS_ID, datetime(2026, 10, 17), rank) for rank, item in enumerate(items[:40])]
+    )
+    return mongo_client
+
+
+@pytest.fixture
+def client(snapshots, monkeypatch):
+    def get_db():
+        db = async_query_mongo(main.MONGO_CONFIG, snapshots)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setitem(main.MONGO_CONFIG, "server_selection_timeout_ms", 100)
+    main.app.dependency_overrides[main.get_db] = get_db
+    try:
+        with TestClient(main.app) as test_client:
+            yield test_client
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv", "parquet"])
+def test_exports_are_not_compressed(client, fmt):
+    if fmt == "parquet" and not main.PARQUET_ENABLED:
+        pytest.skip("导出Parquet需要安装 pyarrow")
+    response = client.get("/api/douban/export", params={"format": fmt}, headers={"Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert SNAPSHOT_ID in response.headers["content-disposition"]
+    if fmt == "ndjson":
+        assert len(response.text.splitlines()) == 300
+
+
+def test_other_responses_are_still_compressed(client):
+    response = client.get("/api/douban/hot-tv", params={"limit": 100}, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] in ("gzip", "br")
+
+
+def test_snapshots_still_being_written_are_not_exported(client):
+    latest = client.get("/api/douban/export")
+    assert SNAPSHOT_ID in latest.headers["content-disposition"]
+    assert len(latest.text.splitlines()) == 300
+
+    response = client.get("/api/douban/export", params={"snapshot_id": IN_PROGRESS_ID})
+    assert response.status_code == 404
+    assert client.get("/api/douban/export", params={"snapshot_id": SNAPSHOT_ID}).status_code == 200
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图片代理：共享连接池、流式转发、磁盘LRU缓存与ETag（上游为本地假图片服务器）
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from python.api import main
+from python.api.image_cache import ImageDiskCache
+from python.stubs.fake_image_server import fake_image_bytes, start_fake_image_server
+
+
+@pytest.fixture
+def image_server():
+    server = start_fake_image_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # 缓存目录指向临时目录；写盘阈值调小，使一张封面分多次写入
+    monkeypatch.setitem(main.PROXY_CONFIG, "cache_dir", str(tmp_path / "images"))
+    monkeypatch.setitem(main.PROXY_CONFIG, "cache_flush_bytes", 8 * 1024)
+    # 图片代理不访问MongoDB，启动时的连接检查不必等待
+    monkeypatch.setitem(main.MONGO_CONFIG, "server_selection_timeout_ms", 100)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def proxy(client, url, **kwargs):
+    return client.get("/api/proxy/image", params={"url": url}, **kwargs)
+
+
+def test_repeat_requests_are_served_from_disk_cache(client, image_server):
+    url = f"{image_server.base_url}/view/photo/p1.jpg"
+
+    first = proxy(client, url)
+    assert first.status_code == 200
+    assert first.content == fake_image_bytes("/view/photo/p1.jpg")
+    assert first.headers["content-type"] == "image/jpeg"
+    assert "max-age" in first.headers["cache-control"]
+
+    second = proxy(client, url)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"]
+    assert image_server.hits["/view/photo/p1.jpg"] == 1
+
+    stats = client.app.state.image_cache.stats()
+    assert stats["entries"] == 1
+    assert stats["total_bytes"] == len(first.content)
+
+
+def test_if_none_match_returns_304_without_upstream_call(client, image_server):
+    url = f"{image_server.base_url}/view/photo/p2.jpg"
+    proxy(client, url)
+    etag = proxy(client, url).headers["etag"]
+
+    response = proxy(client, url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    # ETag 不匹配时返回完整图片
+    assert proxy(client, url, headers={"If-None-Match": '"other"'}).status_code == 200
+    assert image_server.hits["/view/photo/p2.jpg"] == 1
+
+
+def test_shared_client_reuses_upstream_connection(client, image_server):
+    shared = client.app.state.http_client
+    for i in range(5):
+        assert proxy(client, f"{image_server.base_url}/view/photo/c{i}.jpg").status_code == 200
+    assert client.app.state.http_client is shared
+    assert sum(image_server.hits.values()) == 5
+    assert image_server.connections == 1
+
+
+def test_upstream_errors_are_not_cached(client, image_server):
+    assert proxy(client, f"{image_server.base_url}/status/404").status_code == 404
+    assert proxy(client, f"{image_server.base_url}/status/503").status_code == 502
+    assert proxy(client, f"{image_server.base_url}/status/404").status_code == 404
+    assert image_server.hits["/status/404"] == 2
+    assert client.app.state.image_cache.stats()["entries"] == 0
+    assert not [name for name in os.listdir(main.PROXY_CONFIG["cache_dir"]) if name.endswith(".part")]
+
+
+def store(cache, url, data=None):
+    writer = cache.writer(url)
+    writer.write(data if data is not None else fake_image_bytes(url))
+    return writer.commit("image/jpeg")
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    size = len(fake_image_bytes("a"))
+    cache = ImageDiskCache(str(tmp_path), max_bytes=2 * size)
+    store(cache, "a")
+    store(cache, "b")
+    # 访问 a 后，b 成为最久未使用的条目
+    assert cache.get("a") is not None
+    store(cache, "c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["total_bytes"] <= 2 * size
+    assert not os.path.exists(cache._data_path(ImageDiskCache.key_of("b")))
+
+
+def test_disk_cache_restores_index_and_drops_partial_files(tmp_path):
+    cache = ImageDiskCache(str(tmp_path), max_bytes=1024 * 1024)
+    entry = store(cache, "a")
+    abandoned = cache.writer("b")
+    abandoned.write(b"partial")
+
+    reloaded = ImageDiskCache(str(tmp_path), max_bytes=1024 * 1024)
+    image = reloaded.get("a")
+    assert image is not None
+    assert image.etag == entry.etag
+    assert reloaded.get("b") is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_disk_cache_skips_empty_and_oversized_images(tmp_path):
+    cache = ImageDiskCache(str(tmp_path), max_bytes=1024 * 1024, max_entry_bytes=1024)
+    assert store(cache, "empty", b"") is None
+    assert store(cache, "large", b"x" * 2048) is None
+    assert cache.stats()["entries"] == 0
+    assert os.listdir(tmp_path) == []
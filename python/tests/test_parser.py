@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+推荐接口解析：副标题按位置分类，录制的接口页面逐条核对，以及解析吞吐量（pytest-benchmark）
+"""
+
+import asyncio
+
+import pytest
+
+from python.benchmarks.parser_benchmark import FIXTURE_PATH, check_pages, load_recorded_pages, record_pages
+from python.crawlr.douban_spider import parse_rating_value, parse_subtitle, parse_tv_data
+from python.stubs.fake_douban_api import generate_catalogue
+
+RECORDED_PAGES = load_recorded_pages()
+
+
+@pytest.fixture(scope="module")
+def catalogue_pages():
+    catalogue = generate_catalogue(2000, seed=2000)
+    return [{"items": catalogue[i : i + 20]} for i in range(0, len(catalogue), 20)]
+
+
+@pytest.mark.parametrize(
+    "subtitle, fields",
+    [
+        # 五个部分齐全时按位置取值，不认识的类型也是类型
+        ("2024 / 日本 / 特摄 / 田口清隆 / 寺坂赖我", {"genres": ["特摄"], "directors": ["田口清隆"]}),
+        # 缺少部分时才用类型词和人名特征判断
+        ("2023 / 英国 / 音乐剧 / 汤姆·霍伯", {"genres": ["音乐剧"], "directors": ["汤姆·霍伯"], "actors": []}),
+        ("2024 / 中国大陆 / 张艺谋 / 张译 秦海璐", {"genres": [], "directors": ["张艺谋"], "actors": ["张译", "秦海璐"]}),
+        ("2019 / 英国 / 纪录片 / 大卫·爱登堡 戴维·阿滕伯勒", {"genres": ["纪录片"], "actors": []}),
+        ("2024 / 剧情 / 张艺谋", {"countries": [], "genres": ["剧情"], "directors": ["张艺谋"]}),
+        ("2024(中国香港)", {"year": 2024, "countries": []}),
+        ("2022(中国香港) / 中国香港 / 犯罪 动作 / 林岭东 / 古天乐", {"year": 2022, "countries": ["中国香港"]}),
+        ("2025 / 美国 英国 / 剧情 / 乔·赖特 / 裘德·洛", {"countries": ["美国", "英国"], "genres": ["剧情"]}),
+        # 不规范的间距
+        (
+            "2021/日本/ 剧情 爱情 /是枝裕和/ 松隆子  松田龙平",
+            {"countries": ["日本"], "genres": ["剧情", "爱情"], "directors": ["是枝裕和"], "actors": ["松隆子", "松田龙平"]},
+        ),
+        ("韩国 / 喜剧 / 申源浩 / 李到晛", {"year": None, "countries": ["韩国"], "directors": ["申源浩"]}),
+        ("2026", {"year": 2026, "countries": [], "genres": [], "directors": [], "actors": []}),
+        ("", {"year": None, "countries": [], "genres": [], "directors": [], "actors": []}),
+    ],
+)
+def test_parse_subtitle_by_position(subtitle, fields):
+    result = parse_subtitle(subtitle)
+    assert {field: result[field] for field in fields} == fields
+
+
+def test_latin_names_are_merged():
+    item = {
+        "id": "36021545",
+        "title": "英文名剧集",
+        "card_subtitle": "2023 / 美国 / 剧情 / Matt Duffer Ross Duffer / 古天乐 Guillermo del Toro Robert Downey Jr.",
+        "pic": {"large": ""},
+    }
+    (result,) = parse_tv_data({"items": [item]})
+    assert result["directors"] == ["Matt Duffer", "Ross Duffer"]
+    assert result["actors"] == ["古天乐", "Guillermo del Toro", "Robert Downey Jr."]
+
+
+def test_rating_value():
+    assert parse_rating_value({"count": 386521, "max": 10, "value": 9.0}) == 9.0
+    assert parse_rating_value({"value": "8.5"}) == 8.5
+    assert parse_rating_value({"value": "暂无"}) is None
+    assert parse_rating_value({"value": 0}) is None
+    assert parse_rating_value(None) is None
+
+
+def test_empty_response():
+    assert parse_tv_data(None) == []
+    assert parse_tv_data({"items": []}) == []
+
+
+@pytest.mark.skipif(RECORDED_PAGES is None, reason=f"没有录制的接口页面 {FIXTURE_PATH}")
+def test_recorded_pages_are_parsed_consistently():
+    assert check_pages(RECORDED_PAGES) == []
+
+
+def test_recording_keeps_raw_responses(douban_server, tmp_path):
+    server = douban_server(total=60)
+    path = str(tmp_path / "recommend_pages.json")
+    config = {"api_url": server.recommend_url, "requests_per_second": 1000}
+    count = asyncio.run(record_pages(2, path, config))
+    pages = load_recorded_pages(path)
+    assert count == sum(len(page["items"]) for page in pages) > 0
+    assert all(set(page) >= {"start", "count", "total", "items"} for page in pages)
+    assert check_pages(pages) == []
+
+
+@pytest.mark.benchmark(group="parse_tv_data")
+def test_parse_tv_data_throughput(benchmark, catalogue_pages):
+    result = benchmark(lambda: [parse_tv_data(page) for page in catalogue_pages])
+    assert sum(map(len, result)) == 2000
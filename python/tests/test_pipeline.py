@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+爬取流水线：边爬边写入快照，与 merge_slices 相同的去重规则，详情补充使用独立的配置（上游为本地假豆瓣接口，MongoDB 使用 mongomock 的内存实现）
+"""
+
+import pytest
+
+from python.crawlr import pipeline
+from python.crawlr.crawl_planner import merge_slices
+from python.crawlr.douban_spider import parse_tv_data
+from python.crawlr.pipeline import crawl_to_mongo
+from python.mongodb import save_douban_hot
+from python.mongodb.save_douban_hot import CONFIG, item_subject_id
+
+ALL = {"region": "", "category": ""}
+
+
+@pytest.fixture
+def mongo(mongo_client, monkeypatch):
+    # DoubanToMongoDB.connect 新建的客户端改为共享的内存客户端
+    monkeypatch.setattr(save_douban_hot, "MongoClient", lambda uri: mongo_client)
+    monkeypatch.setattr(mongo_client, "close", lambda: None)
+    return mongo_client[CONFIG["db_name"]]
+
+
+def crawl_config(server, tmp_path, **overrides):
+    return {
+        "api_url": server.recommend_url,
+        "checkpoint_dir": str(tmp_path),
+        "requests_per_second": 1000,
+        "burst": 10,
+        "concurrency": 8,
+        "enrich_details": True,
+        **overrides,
+    }
+
+
+def test_crawl_is_written_to_the_snapshot(douban_server, tmp_path, mongo, monkeypatch):
+    server = douban_server(total=45)
+    monkeypatch.setattr(pipeline, "enrich_snapshot", lambda saver, config: None)
+    counts = crawl_to_mongo([ALL], crawl_config(server, tmp_path, batch_size=20))
+
+    assert counts["inserted"] == 45
+    header = mongo[CONFIG["collection_name"]].find_one()
+    assert (header["status"], header["data_count"]) == ("complete", 45)
+    ranked = mongo[CONFIG["items_collection_name"]].find().sort("rank", 1)
+    assert [doc["subject_id"] for doc in ranked] == [item["id"] for item in server.catalogue]
+
+
+def test_detail_crawl_does_not_inherit_the_list_crawl_config(douban_server, tmp_path, mongo, monkeypatch):
+    server = douban_server(total=5)
+    received = []
+    monkeypatch.setattr(pipeline, "enrich_snapshot", lambda saver, config: received.append(config))
+
+    crawl_to_mongo([ALL], crawl_config(server, tmp_path))
+    crawl_to_mongo([ALL], crawl_config(server, tmp_path), detail_config={"max_subjects": 3})
+    # 推荐接口的并发数和速率不会传给详情爬虫
+    assert received == [None, {"max_subjects": 3}]
+
+
+def test_merge_slices_dedupes_by_subject_id():
+    first = [{"id": "1", "title": "甲"}, {"id": "", "detail_url": "https://movie.douban.com/subject/2/", "title": "乙"}]
+    second = [{"id": "", "detail_url": "https://movie.douban.com/subject/2/", "title": "乙"}, {"id": None, "title": "丙"}]
+    merged = merge_slices({"a": first, "b": second + [{"id": "1", "title": "甲"}]})
+    assert [item_subject_id(item) for item in merged] == ["1", "https://movie.douban.com/subject/2/", "丙"]
+    assert [item["slices"] for item in merged] == [["a", "b"], ["a", "b"], ["b"]]
+
+
+def test_pipeline_merges_slices_like_merge_slices(douban_server, tmp_path, mongo, monkeypatch):
+    server = douban_server(total=30)
+    monkeypatch.setattr(pipeline, "enrich_snapshot", lambda saver, config: None)
+    plan = [dict(ALL, key="first"), dict(ALL, key="second")]
+    crawl_to_mongo(plan, crawl_config(server, tmp_path))
+
+    items = parse_tv_data({"items": server.catalogue})
+    expected = merge_slices({"first": items, "second": items})
+    docs = list(mongo[CONFIG["items_collection_name"]].find().sort("rank", 1))
+    assert [(doc["subject_id"], doc["slices"]) for doc in docs] == [
+        (item_subject_id(item), item["slices"]) for item in expected
+    ]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求重试：指数退避、Retry-After、重试失败后从断点继续（上游为本地假豆瓣接口）
+"""
+
+import asyncio
+import time
+from email.utils import formatdate
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from python.crawlr.async_spider import crawl_tv_data
+from python.crawlr.retry import CrawlError, backoff_delay, parse_retry_after
+
+ALL = {"region": "", "category": ""}
+
+
+def crawl_config(server, tmp_path, **overrides):
+    return {
+        "api_url": server.recommend_url,
+        "checkpoint_dir": str(tmp_path),
+        "requests_per_second": 1000,
+        "burst": 10,
+        "backoff_base": 0.01,
+        **overrides,
+    }
+
+
+def request_times(server, start):
+    return [t for t, path in server.requests if parse_qs(urlsplit(path).query)["start"] == [str(start)]]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(" 0 ") == 0.0
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_delay_is_capped_and_honours_retry_after():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=4.0) <= 4.0
+    assert backoff_delay(0, base=0.01, cap=60, retry_after=2.5) >= 2.5
+    # Retry-After 也不超过单次等待上限
+    assert backoff_delay(0, base=0.01, cap=5, retry_after=3600) == 5
+
+
+def test_server_errors_are_retried(douban_server, tmp_path):
+    server = douban_server(total=60, failures={20: [503, 502]})
+    items = asyncio.run(crawl_tv_data(ALL, crawl_config(server, tmp_path)))
+    assert len(items) == 60
+    assert len(request_times(server, 20)) == 3
+
+
+def test_retry_after_is_honoured(douban_server, tmp_path):
+    server = douban_server(total=20, failures={0: [429]}, retry_after="1")
+    items = asyncio.run(crawl_tv_data(ALL, crawl_config(server, tmp_path)))
+    assert len(items) == 20
+    first, second = request_times(server, 0)
+    assert second - first >= 0.9
+
+
+def test_retry_after_pauses_every_worker(douban_server, tmp_path):
+    server = douban_server(total=400, latency=0.05, failures={40: [429]}, retry_after="1")
+    items = asyncio.run(crawl_tv_data(ALL, crawl_config(server, tmp_path, concurrency=4)))
+    assert len(items) == 400
+    limited, retried = request_times(server, 40)
+    assert retried - limited >= 0.9
+    # 429 响应返回之前已经发出的请求除外，等待期间其他协程也不再发出请求
+    assert not [t for t, _ in server.requests if limited + 0.1 < t < limited + 0.9]
+
+
+def test_non_retryable_status_fails_immediately(douban_server, tmp_path):
+    server = douban_server(total=60, failures={0: [403]})
+    with pytest.raises(CrawlError):
+        asyncio.run(crawl_tv_data(ALL, crawl_config(server, tmp_path)))
+    assert len(request_times(server, 0)) == 1
+
+
+def test_failed_crawl_resumes_from_checkpoint(douban_server, tmp_path):
+    server = douban_server(total=100, failures={60: [503, 503, 503]})
+    config = crawl_config(server, tmp_path, concurrency=1, max_retries=2)
+    with pytest.raises(CrawlError):
+        asyncio.run(crawl_tv_data(ALL, config))
+    assert len(request_times(server, 0)) == 1
+
+    # 再次运行时前3页从断点重放，不再请求
+    items = asyncio.run(crawl_tv_data(ALL, config))
+    assert len(items) == 100
+    assert [item["id"] for item in items] == [item["id"] for item in server.catalogue]
+    assert len(request_times(server, 0)) == 1
+    assert len(request_times(server, 40)) == 1
+    assert len(request_times(server, 60)) == 4
+
+
+def test_checkpoint_from_another_crawl_is_not_replayed(douban_server, tmp_path):
+    server = douban_server(total=100, failures={60: [503, 503, 503]})
+    config = crawl_config(server, tmp_path, concurrency=1, max_retries=2, crawl_id="douban_hot_tv_20261016")
+    with pytest.raises(CrawlError):
+        asyncio.run(crawl_tv_data(ALL, config))
+
+    items = asyncio.run(crawl_tv_data(ALL, dict(config, crawl_id="douban_hot_tv_20261017")))
+    assert len(items) == 100
+    assert len(request_times(server, 0)) == 2
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索索引：中文二元组、英文前缀联想、导演与演员匹配、相关度排序，以及阈值算法与逐条计分结果一致
+"""
+
+import pytest
+
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.douban_search import SearchIndex, normalize_text, tokenize
+from python.mongodb.select_douban_hot import reshape_item
+from python.stubs.fake_douban_api import generate_catalogue
+
+TV_LIST = [
+    {"title": "权力的游戏 第八季", "directors": ["戴维·贝尼奥夫"], "actors": ["艾米莉亚·克拉克", "基特·哈灵顿"]},
+    {"title": "怪奇物语", "directors": ["马特·达菲"], "actors": ["米莉·博比·布朗", "大卫·哈伯"]},
+    {"title": "Stranger Things", "directors": ["Matt Duffer"], "actors": ["David Harbour"]},
+    {"title": "游戏人生", "directors": ["石塚敦子"], "actors": ["松冈祯丞"]},
+    {"title": "Strange Angel", "directors": ["David Lowery"], "actors": ["Jack Reynor"]},
+    {"title": "新闻编辑室", "directors": ["大卫·哈伯"], "actors": ["杰夫·丹尼尔斯"]},
+    {"title": "游戏的权力", "directors": [], "actors": []},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(TV_LIST)
+
+
+def titles(index, query, limit=10):
+    _, positions = index.search(query, limit)
+    return [TV_LIST[pos]["title"] for pos in positions]
+
+
+def test_tokenize():
+    assert tokenize(normalize_text("权力的游戏")) == [("权力", False), ("力的", False), ("的游", False), ("游戏", False)]
+    assert tokenize(normalize_text("剧")) == [("剧", False)]
+    assert tokenize(normalize_text("Ｓtranger Things 4")) == [("stranger", True), ("things", True), ("4", True)]
+    assert normalize_text("大卫·哈伯") == "大卫哈伯"
+
+
+def test_chinese_bigrams_must_all_match(index):
+    assert titles(index, "权力的游戏") == ["权力的游戏 第八季"]
+    # "游戏的权力" 没有 "力的"、"的游" 两个二元组
+    assert "游戏的权力" not in titles(index, "权力的游戏")
+    assert set(titles(index, "游戏")) == {"权力的游戏 第八季", "游戏人生", "游戏的权力"}
+    # 单字查询匹配一元组
+    assert titles(index, "怪") == ["怪奇物语"]
+    assert index.search("魔戒", 10) == (0, [])
+    assert index.search("  ·  ", 10) == (0, [])
+
+
+def test_latin_prefix_autocomplete(index):
+    assert index.expand_prefix("stran") == ["strange", "stranger"]
+    assert set(titles(index, "stran")) == {"Stranger Things", "Strange Angel"}
+    # 最后一个单词后面有空格时不再按前缀匹配
+    assert titles(index, "strange ") == ["Strange Angel"]
+    assert titles(index, "STRANGER th") == ["Stranger Things"]
+    assert titles(index, "Ｓｔｒａｎｇｅｒ") == ["Stranger Things"]
+    assert index.search("things x", 10) == (0, [])
+
+
+def test_directors_and_actors_match(index):
+    assert set(titles(index, "大卫·哈伯")) == {"怪奇物语", "新闻编辑室"}
+    # 不写间隔号也能匹配译名
+    assert set(titles(index, "大卫哈伯")) == {"怪奇物语", "新闻编辑室"}
+    assert titles(index, "艾米莉亚 基特") == ["权力的游戏 第八季"]
+    assert titles(index, "david har") == ["Stranger Things"]
+    assert titles(index, "duffer") == ["Stranger Things"]
+    # 标题与演员组合查询
+    assert titles(index, "怪奇 哈伯") == ["怪奇物语"]
+
+
+def test_title_matches_rank_first(index):
+    index = SearchIndex(
+        [
+            {"title": "大明王朝", "directors": [], "actors": ["王朝阳"]},
+            {"title": "北京人在纽约", "directors": [], "actors": ["王朝"]},
+            {"title": "王朝的女人", "directors": [], "actors": []},
+        ]
+    )
+    total, positions = index.search("王朝", 10)
+    assert total == 3
+    # 标题开头命中的排在最前，其次是标题中间命中，最后是只有演员命中
+    assert positions == [2, 0, 1]
+    assert index.search("王朝", 1) == (3, [2])
+
+
+@pytest.fixture(scope="module")
+def catalogue_index():
+    items = [reshape_item(item, "2024-01-01") for item in parse_tv_data({"items": generate_catalogue(3000, seed=3000)})]
+    return SearchIndex(items)
+
+
+def scored_search(index, query, limit):
+    """
+    逐条计算所有命中位置的总分后排序，作为对照
+    """
+    terms = list(dict.fromkeys(term for term, _ in tokenize(normalize_text(query))))
+    common = set.intersection(*(set(index.postings.get(term, ())) for term in terms))
+    ranked = sorted(common, key=lambda pos: (-sum(index.postings[term][pos] for term in terms), pos))
+    return len(common), ranked[:limit]
+
+
+@pytest.mark.parametrize("query", ["大卫·哈伯", "艾米莉亚·克拉克", "哈伯 剧集1", "测试 剧集", "大卫 彼得", "罗斯·达菲 马特"])
+@pytest.mark.parametrize("limit", [1, 10, 50])
+def test_top_k_matches_full_scoring(catalogue_index, query, limit):
+    # 结尾加空格，避免最后一个单词按前缀匹配
+    assert catalogue_index.search(query + " ", limit) == scored_search(catalogue_index, query, limit)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+快照写入：同一天重复保存时只改写变化的条目，名次移动只改写名次（MongoDB 使用 mongomock 的内存实现）
+"""
+
+import pytest
+
+from python.crawlr.douban_spider import parse_tv_data
+from python.mongodb.save_douban_hot import CONFIG, DoubanToMongoDB
+from python.stubs.fake_douban_api import generate_catalogue
+
+
+@pytest.fixture
+def saver(mongo_client):
+    saver = DoubanToMongoDB(CONFIG)
+    saver.client = mongo_client
+    saver.db = mongo_client[CONFIG["db_name"]]
+    saver.collection = saver.db[CONFIG["collection_name"]]
+    saver.items_collection = saver.db[CONFIG["items_collection_name"]]
+    saver.history_collection = saver.db[CONFIG["history_collection_name"]]
+    saver.stats_collection = saver.db[CONFIG["stats_collection_name"]]
+    return saver
+
+
+@pytest.fixture
+def items():
+    return parse_tv_data({"items": generate_catalogue(30, seed=30)})
+
+
+def test_repeat_save_is_unchanged(saver, items):
+    assert saver.save_snapshot(items) == {"inserted": 30, "updated": 0, "reranked": 0, "unchanged": 0, "deleted": 0}
+    assert saver.save_snapshot(items) == {"inserted": 0, "updated": 0, "reranked": 0, "unchanged": 30, "deleted": 0}
+
+
+def test_new_title_only_rewrites_ranks_below_it(saver, items):
+    saver.save_snapshot(items)
+    # 直接修改库中的文档：只改写名次的更新不会覆盖其他字段
+    saver.items_collection.update_many({}, {"$set": {"marker": True}})
+
+    new = dict(items[0], id="39999999", title="新上榜", rating=9.9)
+    counts = saver.save_snapshot([new] + items)
+    assert counts == {"inserted": 1, "updated": 0, "reranked": 30, "unchanged": 0, "deleted": 0}
+
+    docs = list(saver.items_collection.find({"subject_id": {"$ne": "39999999"}}).sort("rank", 1))
+    assert [doc["rank"] for doc in docs] == list(range(1, 31))
+    assert [doc["subject_id"] for doc in docs] == [item["id"] for item in items]
+    assert all(doc["marker"] for doc in docs)
+
+
+def test_content_changes_rewrite_the_document(saver, items):
+    saver.save_snapshot(items)
+    saver.items_collection.update_many({}, {"$set": {"marker": True}})
+
+    changed = [dict(item, rating=1.0) if i == 5 else item for i, item in enumerate(items)]
+    counts = saver.save_snapshot(changed[:10] + changed[11:])
+    assert counts == {"inserted": 0, "updated": 1, "reranked": 19, "unchanged": 9, "deleted": 1}
+
+    doc = saver.items_collection.find_one({"subject_id": items[5]["id"]})
+    assert doc["rating"] == 1.0
+    assert saver.items_collection.count_documents({}) == 29
+
+
+def test_duplicates_do_not_leave_rank_gaps(saver, items):
+    counts = saver.save_snapshot(items[:5] + items[:3] + items[5:10])
+    assert counts["inserted"] == 10
+    docs = list(saver.items_collection.find().sort("rank", 1))
+    assert [doc["rank"] for doc in docs] == list(range(10))
+
+
+def test_history_is_written_only_after_the_snapshot_is_published(saver, items):
+    writer = saver.begin_snapshot()
+    writer.write_batch(items[:20])
+    # 爬取中途放弃：快照仍为 in_progress，历史中没有任何记录
+    assert saver.collection.find_one({"_id": writer.snapshot_id})["status"] == "in_progress"
+    assert saver.history_collection.count_documents({}) == 0
+
+    writer.write_batch(items[20:])
+    writer.finish()
+    assert saver.collection.find_one({"_id": writer.snapshot_id})["status"] == "complete"
+    day = writer.today.strftime("%d")
+    points = {doc["subject_id"]: doc["points"][day] for doc in saver.history_collection.find()}
+    assert len(points) == 30
+    assert points[items[3]["id"]]["rank"] == 3
+
+    # 名次移动也记入历史，从榜单中移除的条目删除当天的记录
+    saver.save_snapshot(items[1:])
+    points = {doc["subject_id"]: doc["points"].get(day) for doc in saver.history_collection.find()}
+    assert points[items[0]["id"]] is None
+    assert points[items[3]["id"]]["rank"] == 2
@@ -1,6 +1,7 @@
 import request from '@/utils/request';
 
 export interface TVShow {
+  id: string;
   title: string;
   url: string;
   cover: string;
@@ -10,6 +11,7 @@ export interface TVShow {
   directors: string[];
   actors: string[];
   year: number;
+  slices?: string[];
   update_time: string;
 }
 
@@ -36,6 +38,40 @@ export function getHotTVShows(params?: HotTVShowsParams) {
   });
 }
 
+export interface StatItem {
+  name: string;
+  value: number;
+}
+
+export interface AllStats {
+  rate: StatItem[];
+  category: StatItem[];
+  area: StatItem[];
+  year: StatItem[];
+}
+
+// 一次性获取评分、类型、地区和年份统计
+export function getAllStats() {
+  return request({
+    url: '/api/douban/stats',
+    method: 'get'
+  });
+}
+
+export interface SearchResult {
+  total: number;
+  items: TVShow[];
+}
+
+// 按标题、导演、演员搜索电视剧（按相关度排序，用于搜索框输入联想）
+export function searchTVShows(q: string, limit = 10) {
+  return request({
+    url: '/api/douban/search',
+    method: 'get',
+    params: { q, limit }
+  });
+}
+
 // 获取电视剧评分统计
 export function getRateStats() {
   return request({
@@ -70,3 +106,11 @@ export function getTVShowDetail(url: string) {
     params: { url }
   });
 }
+
+// 根据豆瓣条目id获取电视剧详情
+export function getTVShowById(id: string) {
+  return request({
+    url: `/api/douban/tv/${encodeURIComponent(id)}`,
+    method: 'get'
+  });
+}
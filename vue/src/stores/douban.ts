@@ -1,12 +1,7 @@
 import { defineStore } from 'pinia';
 import { ref, computed } from 'vue';
-import {
-  getHotTVShows,
-  getRateStats,
-  getCategoryStats,
-  getYearStats,
-} from '@/api/douban';
-import type { TVShow } from '@/api/douban';
+import { getHotTVShows, getAllStats } from '@/api/douban';
+import type { TVShow, AllStats } from '@/api/douban';
 
 export const useDoubanStore = defineStore('douban', () => {
   // 状态
@@ -35,22 +30,19 @@ export const useDoubanStore = defineStore('douban', () => {
   async function fetchAllData() {
     loading.value = true;
     try {
-      // 先获取统计数据
-      const [rateData, categoryData, yearData] = await Promise.all([
-        getRateStats(),
-        getCategoryStats(),
-        getYearStats()
-      ]);
+      // 先获取统计数据（一次请求返回全部维度）
+      const statsResponse = await getAllStats();
+      const stats: Partial<AllStats> = statsResponse.data || {};
 
       // 正确处理统计数据，确保它们是数组类型
-      if (rateData.data && Array.isArray(rateData.data)) {
-        rateStats.value = rateData.data;
+      if (Array.isArray(stats.rate)) {
+        rateStats.value = stats.rate;
       }
-      if (categoryData.data && Array.isArray(categoryData.data)) {
-        categoryStats.value = categoryData.data;
+      if (Array.isArray(stats.category)) {
+        categoryStats.value = stats.category;
       }
-      if (yearData.data && Array.isArray(yearData.data)) {
-        yearStats.value = yearData.data;
+      if (Array.isArray(stats.year)) {
+        yearStats.value = stats.year;
       }
 
       // 获取所有电视剧数据（不使用默认分页）